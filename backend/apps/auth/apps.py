@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class AuthConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.auth"
+    label = "hsb_auth"
+    verbose_name = "Authentication"
+
+    def ready(self):
+        from apps.auth import signals  # noqa: F401
+        from apps.auth.keys import install_token_backend
+
+        install_token_backend()
@@ -0,0 +1,85 @@
+"""DRF authentication dispatching on the ``Authorization`` scheme
+
+Listing JWT, token and session authentication in
+``DEFAULT_AUTHENTICATION_CLASSES`` tries each one in turn. ``DispatchingAuthentication``
+reads the header once and runs only the authenticator its scheme names:
+``Bearer`` tokens never reach the session, and requests without credentials
+never parse a header twice. ``Token`` keys are resolved through the
+``default`` cache (Redis) rather than a join on ``authtoken_token`` per
+request.
+"""
+import hashlib
+from typing import Any, Optional, Tuple
+
+import structlog
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import BaseAuthentication, SessionAuthentication, TokenAuthentication
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPE_BYTES, JWTAuthentication
+
+logger = structlog.get_logger(__name__)
+
+CACHE_KEY_PREFIX = "authtoken"
+
+DEFAULT_TOKEN_CACHE_TTL = 300
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` caching each key's token and user
+
+    Entries are dropped when the token or its user is saved or deleted (see
+    ``apps.auth.signals``), and expire after ``TOKEN_AUTHENTICATION_CACHE_TTL``
+    seconds, which bounds staleness after bulk updates that send no signal.
+    Unknown keys are not cached. The database is queried when the cache fails.
+    """
+
+    def authenticate_credentials(self, key: str) -> Tuple[Any, Any]:
+        cache_key = token_cache_key(key)
+        try:
+            token = caches["default"].get(cache_key)
+        except Exception as e:
+            logger.warning("Token cache unavailable", error=str(e))
+            return super().authenticate_credentials(key)
+        if token is not None:
+            return token.user, token
+
+        user, token = super().authenticate_credentials(key)
+        try:
+            caches["default"].set(
+                cache_key, token, timeout=getattr(settings, "TOKEN_AUTHENTICATION_CACHE_TTL", DEFAULT_TOKEN_CACHE_TTL)
+            )
+        except Exception as e:
+            logger.warning("Token cache unavailable", error=str(e))
+        return user, token
+
+
+class DispatchingAuthentication(BaseAuthentication):
+    """Runs the one authenticator the ``Authorization`` scheme names
+
+    ``SIMPLE_JWT["AUTH_HEADER_TYPES"]`` (``Bearer``) go to ``JWTAuthentication``,
+    ``Token`` to ``CachedTokenAuthentication``, anything else to
+    ``SessionAuthentication``, the only one loading the session.
+    """
+
+    def __init__(self):
+        self.jwt = JWTAuthentication()
+        self.token = CachedTokenAuthentication()
+        self.session = SessionAuthentication()
+
+    def authenticate(self, request: Request) -> Optional[Tuple[Any, Any]]:
+        header = self.jwt.get_header(request)
+        scheme = header.split(None, 1)[0] if header else b""
+        if scheme in AUTH_HEADER_TYPE_BYTES:
+            return self.jwt.authenticate(request)
+        if scheme.lower() == self.token.keyword.lower().encode():
+            return self.token.authenticate(request)
+        return self.session.authenticate(request)
+
+    def authenticate_header(self, request: Request) -> str:
+        return self.jwt.authenticate_header(request)
+
+
+def token_cache_key(key: str) -> str:
+    """Cache key of a ``Token`` key, hashed so keys are not stored in clear"""
+    return f"{CACHE_KEY_PREFIX}:{hashlib.sha256(key.encode()).hexdigest()}"
@@ -0,0 +1,209 @@
+"""Token introspection for relying applications (RFC 7662)
+
+``TokenIntrospector`` validates tokens the way ``JWTAuthentication`` does
+(signature, expiry, token type) and caches each outcome by token hash in two
+tiers: an in-process LRU, then the ``default`` cache (Redis) shared by every
+worker. Active results are kept until the token expires but at most
+``cache_ttl`` seconds, which bounds how long a revoked token can still
+introspect as active; inactive results are kept ``negative_ttl`` seconds.
+A batch of tokens costs one shared cache read and one write.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import structlog
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+logger = structlog.get_logger(__name__)
+
+INACTIVE: Dict[str, Any] = {"active": False}
+
+CACHE_KEY_PREFIX = "introspect"
+
+# Seconds during which the shared cache is not tried again after an error
+SHARED_CACHE_RETRY_INTERVAL = 5.0
+
+Result = Dict[str, Any]
+
+
+class LocalLRU:
+    """Thread-safe LRU of results with their expiry time"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[str, Tuple[Result, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, now: float) -> Optional[Result]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, result: Result, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (result, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TokenIntrospector:
+    """Validates tokens for introspection, caching results in two tiers
+
+    Args:
+        api_keys: Bearer keys callers must present, every caller refused when empty
+        allow_anonymous: Let callers in without a key (development only)
+        cache_ttl: Longest time an active result is cached, in seconds
+        negative_ttl: Time an inactive result is cached, in seconds
+        local_cache_size: Results kept in the in-process LRU
+        max_batch: Most tokens introspected in one request
+        cache_alias: Django cache used as the shared tier
+    """
+
+    def __init__(self, api_keys: Iterable[str] = (), cache_ttl: int = 60, negative_ttl: int = 300,
+                 local_cache_size: int = 10000, max_batch: int = 100, cache_alias: str = "default",
+                 allow_anonymous: bool = False):
+        if cache_ttl < 1 or negative_ttl < 1:
+            raise ValueError("cache_ttl and negative_ttl must be at least 1 second")
+        if local_cache_size < 1 or max_batch < 1:
+            raise ValueError("local_cache_size and max_batch must be positive")
+        self.api_keys = tuple(key for key in api_keys if key)
+        self.allow_anonymous = allow_anonymous
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+        self.max_batch = max_batch
+        self.cache_alias = cache_alias
+        self.local = LocalLRU(local_cache_size)
+        self._shared_down_until = 0.0
+
+    def authorized(self, authorization: str) -> bool:
+        """Tell whether an ``Authorization`` header carries one of the API keys"""
+        if self.allow_anonymous:
+            return True
+        return any(hmac.compare_digest(authorization, f"Bearer {key}") for key in self.api_keys)
+
+    def introspect(self, tokens: Sequence[str]) -> List[Result]:
+        """Introspect tokens, in order
+
+        Returns:
+            ``{"active": True, **claims}`` per valid token, ``{"active": False}`` otherwise
+        """
+        now = time.time()
+        keys = [_cache_key(token) for token in tokens]
+        results: Dict[str, Result] = {}
+
+        missing = []
+        for key in dict.fromkeys(keys):
+            result = self.local.get(key, now)
+            if result is None:
+                missing.append(key)
+            else:
+                results[key] = result
+
+        for key, (result, expires_at) in self._shared_get(missing).items():
+            if expires_at > now:
+                results[key] = result
+                self.local.set(key, result, expires_at)
+
+        verified: Dict[str, Tuple[Result, float]] = {}
+        for key, token in zip(keys, tokens):
+            if key in results:
+                continue
+            result, ttl = self._verify(token, now)
+            results[key] = result
+            if ttl > 0:
+                verified[key] = (result, now + ttl)
+                self.local.set(key, result, now + ttl)
+        self._shared_set(verified, now)
+
+        return [results[key] for key in keys]
+
+    def _verify(self, token: str, now: float) -> Tuple[Result, float]:
+        """Validate a token, returning its result and how long it may be cached"""
+        for token_class in api_settings.AUTH_TOKEN_CLASSES:
+            try:
+                validated = token_class(token)
+            except TokenError:
+                continue
+            claims = dict(validated.payload)
+            return {"active": True, **claims}, min(self.cache_ttl, claims["exp"] - now)
+        return INACTIVE, self.negative_ttl
+
+    def _shared_get(self, keys: List[str]) -> Dict[str, Tuple[Result, float]]:
+        if not keys or time.monotonic() < self._shared_down_until:
+            return {}
+        try:
+            return caches[self.cache_alias].get_many(keys)
+        except Exception as e:
+            self._shared_failed(e)
+            return {}
+
+    def _shared_set(self, entries: Dict[str, Tuple[Result, float]], now: float) -> None:
+        if not entries or time.monotonic() < self._shared_down_until:
+            return
+        # One write for the batch: entries carry their own expiry, checked on read
+        timeout = max(expires_at for _, expires_at in entries.values()) - now
+        try:
+            caches[self.cache_alias].set_many(entries, timeout=max(1, int(timeout) + 1))
+        except Exception as e:
+            self._shared_failed(e)
+
+    def _shared_failed(self, error: Exception) -> None:
+        logger.warning("Introspection cache unavailable, using the local tier only", error=str(error))
+        self._shared_down_until = time.monotonic() + SHARED_CACHE_RETRY_INTERVAL
+
+
+def _cache_key(token: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+_introspector: Optional[TokenIntrospector] = None
+_lock = threading.Lock()
+
+
+def get_introspector() -> TokenIntrospector:
+    """Return the shared introspector configured by ``TOKEN_INTROSPECTION``
+
+    ``TOKEN_INTROSPECTION`` is a dict of ``TokenIntrospector`` arguments.
+
+    Raises:
+        ImproperlyConfigured: If ``TOKEN_INTROSPECTION`` holds invalid values
+    """
+    global _introspector
+    if _introspector is None:
+        with _lock:
+            if _introspector is None:
+                options = getattr(settings, "TOKEN_INTROSPECTION", None) or {}
+                try:
+                    _introspector = TokenIntrospector(**options)
+                except (TypeError, ValueError) as e:
+                    raise ImproperlyConfigured(f"Invalid TOKEN_INTROSPECTION: {e}") from e
+    return _introspector
+
+
+def reset_introspector() -> None:
+    """Drop the shared introspector and its local cache (settings changes, tests)"""
+    global _introspector
+    with _lock:
+        _introspector = None
@@ -0,0 +1,238 @@
+"""JWT signing keys and the JWKS document
+
+With ``JWT_SIGNING_KEYS`` configured, access and refresh tokens are signed
+with the active key of a ``KeyRing`` (RS256, ES256 or EdDSA, following the
+key type) and carry its ``kid`` header, so relying applications verify them
+locally against ``/.well-known/jwks.json`` instead of asking us. Every key of
+the ring is published and accepted; rotating means adding a key, making it
+active once consumers had time to fetch it, and dropping the old one after
+the longest token lifetime. A ring of several keys therefore needs an
+explicit active kid, so a new key never signs before it is published. Without keys, simplejwt's HS256 backend is kept.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
+from jwt import ExpiredSignatureError, InvalidAlgorithmError, InvalidTokenError
+from rest_framework_simplejwt import state
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+
+DEFAULT_JWKS_MAX_AGE = 3600
+
+_EC_ALGORITHMS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """A private key of the ring and what consumers need to verify with it"""
+
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+
+    @classmethod
+    def from_pem(cls, kid: str, pem: bytes) -> "SigningKey":
+        """Load an unencrypted PEM private key
+
+        Raises:
+            ValueError: If the PEM is invalid or its key type cannot sign JWTs
+        """
+        private_key = serialization.load_pem_private_key(pem, password=None)
+        if isinstance(private_key, rsa.RSAPrivateKey):
+            algorithm = "RS256"
+        elif isinstance(private_key, ec.EllipticCurvePrivateKey) and private_key.curve.name in _EC_ALGORITHMS:
+            algorithm = _EC_ALGORITHMS[private_key.curve.name]
+        elif isinstance(private_key, ed25519.Ed25519PrivateKey):
+            algorithm = "EdDSA"
+        else:
+            raise ValueError(f"Unsupported key type for JWT signing: {type(private_key).__name__}")
+        return cls(kid=kid, algorithm=algorithm, private_key=private_key, public_key=private_key.public_key())
+
+    def jwk(self) -> Dict[str, Any]:
+        """Public JWK of the key"""
+        jwk = jwt.get_algorithm_by_name(self.algorithm).to_jwk(self.public_key, as_dict=True)
+        return {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class KeyRing:
+    """Signing keys by kid, the active one signing new tokens
+
+    ``active_kid`` may only be omitted when the ring holds a single key.
+
+    The JWKS document and its ETag are serialized once, when the ring is
+    built, so serving them costs no work per request.
+    """
+
+    def __init__(self, keys: Sequence[SigningKey], active_kid: Optional[str] = None,
+                 max_age: int = DEFAULT_JWKS_MAX_AGE):
+        if not keys:
+            raise ValueError("A key ring needs at least one key")
+        self._keys = {key.kid: key for key in keys}
+        if active_kid is None:
+            if len(self._keys) > 1:
+                raise ValueError("active_kid is required when more than one key is loaded")
+            active_kid = keys[0].kid
+        if active_kid not in self._keys:
+            raise ValueError(f"Unknown active kid: {active_kid}")
+        self.active = self._keys[active_kid]
+        self.max_age = max_age
+        self.jwks = _serialize([key.jwk() for key in keys])
+        self.etag = _etag(self.jwks)
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """Return the key named ``kid``, None when it is not in the ring"""
+        return self._keys.get(kid) if kid else None
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """simplejwt token backend signing with a ``KeyRing``
+
+    Tokens are signed by the active key with its ``kid`` in the header and
+    verified by the key their ``kid`` names, with that key's algorithm only.
+    Tokens without a known ``kid``, HS256 ones included, are invalid.
+    """
+
+    def __init__(self, keyring: KeyRing):
+        super().__init__(
+            keyring.active.algorithm,
+            audience=api_settings.AUDIENCE,
+            issuer=api_settings.ISSUER,
+            leeway=api_settings.LEEWAY,
+            json_encoder=api_settings.JSON_ENCODER,
+        )
+        self.keyring = keyring
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        key = self.keyring.active
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+        return jwt.encode(
+            jwt_payload, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token: Any, verify: bool = True) -> Dict[str, Any]:
+        try:
+            key = self.keyring.get(jwt.get_unverified_header(token).get("kid"))
+            if key is None and verify:
+                raise TokenBackendError(_("Token is invalid"))
+            return jwt.decode(
+                token,
+                key.public_key if key else "",
+                algorithms=[key.algorithm if key else self.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={"verify_aud": self.audience is not None, "verify_signature": verify},
+            )
+        except InvalidAlgorithmError as e:
+            raise TokenBackendError(_("Invalid algorithm specified")) from e
+        except ExpiredSignatureError as e:
+            raise TokenBackendExpiredToken(_("Token is expired")) from e
+        except InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+
+
+_keyring: Optional[KeyRing] = None
+_loaded = False
+_lock = threading.Lock()
+_default_backend = state.token_backend
+
+
+def get_keyring() -> Optional[KeyRing]:
+    """Return the key ring built from ``JWT_SIGNING_KEYS``, None when no key is configured
+
+    ``JWT_SIGNING_KEYS`` names a directory of PEM private keys, each file
+    ``<kid>.pem``, and/or a ``keys`` dict of kid to PEM::
+
+        JWT_SIGNING_KEYS = {"keys_dir": "/run/secrets/jwt", "active_kid": "2026-10", "jwks_max_age": 3600}
+
+    The active key is ``active_kid``, which may only be left out when a
+    single key is loaded.
+
+    Raises:
+        ImproperlyConfigured: If a key cannot be loaded or the options are invalid
+    """
+    global _keyring, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                _keyring = _build_keyring(getattr(settings, "JWT_SIGNING_KEYS", None) or {})
+                _loaded = True
+    return _keyring
+
+
+def install_token_backend() -> None:
+    """Make simplejwt sign and verify with the key ring, or HS256 without one"""
+    keyring = get_keyring()
+    state.token_backend = KeyRingTokenBackend(keyring) if keyring else _default_backend
+
+
+def reset_keyring() -> None:
+    """Reload the keys on next use and reinstall the token backend (settings changes, tests)"""
+    global _keyring, _loaded
+    with _lock:
+        _keyring, _loaded = None, False
+    install_token_backend()
+
+
+def published_jwks() -> Tuple[bytes, str, int]:
+    """Return the serialized JWKS, its strong ETag and the seconds consumers may cache it
+
+    The JWKS is empty when no key is configured.
+    """
+    keyring = get_keyring()
+    if keyring is None:
+        return _EMPTY_JWKS, _EMPTY_ETAG, DEFAULT_JWKS_MAX_AGE
+    return keyring.jwks, keyring.etag, keyring.max_age
+
+
+def _build_keyring(options: Dict[str, Any]) -> Optional[KeyRing]:
+    pems: Dict[str, bytes] = {}
+    keys_dir = options.get("keys_dir")
+    if keys_dir:
+        path = Path(keys_dir)
+        if not path.is_dir():
+            raise ImproperlyConfigured(f"JWT_SIGNING_KEYS keys_dir is not a directory: {keys_dir}")
+        pems.update((file.stem, file.read_bytes()) for file in path.glob("*.pem"))
+    for kid, pem in (options.get("keys") or {}).items():
+        pems[kid] = pem.encode() if isinstance(pem, str) else pem
+    if not pems:
+        return None
+    keys: List[SigningKey] = []
+    try:
+        for kid in sorted(pems):
+            keys.append(SigningKey.from_pem(kid, pems[kid]))
+        return KeyRing(
+            keys, active_kid=options.get("active_kid") or None,
+            max_age=int(options.get("jwks_max_age", DEFAULT_JWKS_MAX_AGE)),
+        )
+    except (TypeError, ValueError) as e:
+        raise ImproperlyConfigured(f"Invalid JWT_SIGNING_KEYS: {e}") from e
+
+
+def _serialize(keys: List[Dict[str, Any]]) -> bytes:
+    return json.dumps({"keys": keys}, separators=(",", ":"), sort_keys=True).encode()
+
+
+def _etag(document: bytes) -> str:
+    return '"' + hashlib.sha256(document).hexdigest()[:32] + '"'
+
+
+_EMPTY_JWKS = _serialize([])
+_EMPTY_ETAG = _etag(_EMPTY_JWKS)
@@ -0,0 +1,44 @@
+import os
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+GENERATORS = {
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+class Command(BaseCommand):
+    help = "Write a new JWT signing key to the JWT_SIGNING_KEYS directory for rotation"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algorithm", choices=sorted(GENERATORS), default="ES256")
+        parser.add_argument("--kid", help="Key id, also the file name (defaults to the current UTC timestamp)")
+        parser.add_argument("--keys-dir", help="Directory to write to (defaults to JWT_SIGNING_KEYS keys_dir)")
+
+    def handle(self, *args, **options):
+        keys_dir = options["keys_dir"] or (getattr(settings, "JWT_SIGNING_KEYS", None) or {}).get("keys_dir")
+        if not keys_dir:
+            raise CommandError("No keys directory: pass --keys-dir or set JWT_SIGNING_KEYS_DIR")
+        kid = options["kid"] or timezone.now().strftime("%Y%m%d%H%M%S")
+        path = Path(keys_dir) / f"{kid}.pem"
+        if path.exists():
+            raise CommandError(f"{path} already exists")
+
+        pem = GENERATORS[options["algorithm"]]().private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as file:
+            file.write(pem)
+        self.stdout.write(
+            f"Wrote {options['algorithm']} key {kid} to {path}. Restart to publish it, then set "
+            f"JWT_ACTIVE_KID={kid} once consumers had JWT_JWKS_MAX_AGE to fetch it."
+        )
@@ -0,0 +1,49 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.auth.pruning import PRUNE_BATCH_SIZE, prune_expired_tokens
+from apps.auth.revocation import rebuild_revocation_index
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted refresh tokens in batches, then rebuild the revocation index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=PRUNE_BATCH_SIZE, help="Tokens deleted per transaction")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to wait between batches")
+        parser.add_argument("--every", type=float, help="Prune again every this many seconds until stopped")
+        parser.add_argument(
+            "--no-rebuild-index", action="store_true",
+            help="Leave the expired tokens in the revocation index until its next rebuild",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        stop = threading.Event()
+        if options["every"]:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+
+        while not stop.is_set():
+            self.prune(options, stop)
+            if not options["every"]:
+                break
+            stop.wait(options["every"])
+
+    def prune(self, options, stop):
+        result = prune_expired_tokens(batch_size=options["batch_size"], pause=options["pause"], stop=stop)
+        self.stdout.write(
+            f"Pruned {result.outstanding} outstanding and {result.blacklisted} blacklisted token(s) "
+            f"in {result.batches} batch(es), {result.seconds:.1f}s"
+        )
+        if options["no_rebuild_index"]:
+            return
+        try:
+            count = rebuild_revocation_index()
+        except Exception as e:
+            self.stderr.write(f"Could not rebuild the revocation index: {e}")
+        else:
+            self.stdout.write(f"Indexed {count} blacklisted token(s)")
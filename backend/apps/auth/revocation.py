@@ -0,0 +1,384 @@
+"""Fast path for the refresh token blacklist
+
+simplejwt checks the blacklist with a Postgres query on every refresh, verify
+and blacklist call. ``RevocationIndex`` answers from memory instead: the
+blacklisted JTIs are kept in a Redis set, and every process holds a Bloom
+filter of them, refreshed incrementally from a Redis list of recent
+revocations. Most tokens are not revoked, and the filter answers that
+without leaving the process; a filter hit is confirmed with one
+``SISMEMBER``. Postgres stays the source of truth: the index is filled by
+``rebuild_revocation_index`` and fed as tokens are blacklisted, and the
+blacklist is queried directly whenever Redis is unavailable or the index has
+not been built.
+
+Redis keys, ``<key>`` being the configured key:
+
+- ``<key>``: set of the blacklisted JTIs
+- ``<key>:log``: list of the JTIs in revocation order, the filters' feed,
+  capped to about ``log_size`` entries
+- ``<key>:log_start``: entries dropped from the head of the log, so that
+  filters keep absolute offsets into it
+- ``<key>:epoch``: bumped by each rebuild, making filters reload the set
+"""
+import hashlib
+import math
+import threading
+import time
+from typing import Any, Iterable, Iterator, List, Optional
+
+import structlog
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+logger = structlog.get_logger(__name__)
+
+# Seconds during which Redis is not tried again after an error
+REDIS_RETRY_INTERVAL = 5.0
+
+REBUILD_BATCH_SIZE = 10000
+
+# Share of log_size the log may overshoot before it is trimmed, so trims stay rare
+LOG_SLACK = 0.1
+
+
+class BloomFilter:
+    """Bloom filter of strings sized for a capacity and a false positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Double hashing: k positions out of one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+
+class RevocationIndex:
+    """Blacklisted JTIs in Redis, screened by a per-process Bloom filter
+
+    The filter is trusted to rule a JTI out only while it was refreshed less
+    than ``refresh_interval`` seconds ago, which bounds how long a token
+    revoked by another process is still accepted here.
+
+    Args:
+        key: Redis key of the JTI set, prefixing the other keys
+        capacity: JTIs the filter is first sized for, it grows past them
+        error_rate: Share of unrevoked JTIs the filter sends to Redis
+        refresh_interval: Seconds between two refreshes of the filter
+        log_size: Revocations kept in the log; a filter further behind reloads the whole set
+    """
+
+    def __init__(self, key: str = "auth:revoked_jtis", capacity: int = 100000, error_rate: float = 0.001,
+                 refresh_interval: float = 1.0, log_size: int = 100000):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        if refresh_interval <= 0:
+            raise ValueError("refresh_interval must be positive")
+        if log_size < 1:
+            raise ValueError("log_size must be positive")
+        self.key = key
+        self.log_key = f"{key}:log"
+        self.log_start_key = f"{key}:log_start"
+        self.epoch_key = f"{key}:epoch"
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.log_size = log_size
+        self._bloom: Optional[BloomFilter] = None
+        self._count = 0
+        self._epoch: Optional[bytes] = None
+        self._offset = 0
+        self._log_start = 0
+        self._refreshed_at = -math.inf
+        self._redis_down_until = 0.0
+        self._pending: List[str] = []
+        self._built: Optional[bool] = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        """Tell whether a JTI is blacklisted"""
+        bloom = self._fresh_bloom()
+        if bloom is not None:
+            if jti not in bloom:
+                return False
+            # A JTI still pending is not in the Redis set yet
+            if jti not in self._pending and time.monotonic() >= self._redis_down_until:
+                try:
+                    return bool(_get_redis_connection().sismember(self.key, jti))
+                except Exception as e:
+                    self._redis_failed(e)
+        return _blacklisted_in_db(jti)
+
+    def add(self, jti: str) -> None:
+        """Index a JTI just blacklisted in the database"""
+        self.add_many([jti])
+
+    def add_many(self, jtis: Iterable[str]) -> None:
+        """Index JTIs just blacklisted in the database, in one Redis round trip
+
+        When Redis is unavailable, the JTIs are kept and written on the next
+        successful refresh.
+        """
+        jtis = list(jtis)
+        if not jtis:
+            return
+        with self._lock:
+            if self._bloom is not None:
+                for jti in jtis:
+                    self._bloom.add(jti)
+            self._pending.extend(jtis)
+            if time.monotonic() >= self._redis_down_until:
+                try:
+                    self._flush_pending()
+                except Exception as e:
+                    self._redis_failed(e)
+
+    def remove(self, jti: str) -> None:
+        """Drop a JTI taken off the blacklist"""
+        self.remove_many([jti])
+
+    def remove_many(self, jtis: Iterable[str]) -> None:
+        """Drop JTIs taken off the blacklist
+
+        The filters keep them, so they only cost a Redis lookup until their next rebuild.
+        """
+        jtis = list(jtis)
+        if not jtis:
+            return
+        try:
+            _get_redis_connection().srem(self.key, *jtis)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def rebuild(self, jtis: Iterable[str], batch_size: int = REBUILD_BATCH_SIZE) -> int:
+        """Replace the indexed JTIs with ``jtis``, the whole blacklist
+
+        ``jtis`` is iterated after the revocation log position is noted, and
+        every JTI logged since then is kept, so revocations racing the
+        rebuild are not lost. Every filter reloads afterwards.
+
+        Returns:
+            The number of JTIs from ``jtis``
+        """
+        redis = _get_redis_connection()
+        with redis.pipeline(transaction=True) as pipe:
+            log_start, length = pipe.get(self.log_start_key).llen(self.log_key).execute()
+        position = int(log_start or 0) + length
+        staging = f"{self.key}:rebuild"
+        redis.delete(staging)
+        count = 0
+        for batch in _batches(jtis, batch_size):
+            redis.sadd(staging, *batch)
+            count += len(batch)
+
+        from redis.exceptions import WatchError
+
+        with redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.log_key, self.log_start_key)
+                    log_start = int(pipe.get(self.log_start_key) or 0)
+                    # Revocations trimmed from the log during the rebuild are only left in the current set
+                    trimmed = log_start > position
+                    index = max(position - log_start, 0)
+                    recent = pipe.lrange(self.log_key, index, -1)
+                    pipe.multi()
+                    if recent:
+                        pipe.sadd(staging, *recent)
+                    if trimmed:
+                        pipe.sunionstore(self.key, staging, self.key)
+                        pipe.delete(staging)
+                    elif count or recent:
+                        pipe.rename(staging, self.key)
+                    else:
+                        pipe.delete(self.key)
+                    pipe.ltrim(self.log_key, index, -1)
+                    pipe.incrby(self.log_start_key, index)
+                    pipe.incr(self.epoch_key)
+                    pipe.execute()
+                    return count
+                except WatchError:
+                    continue
+
+    def _fresh_bloom(self) -> Optional[BloomFilter]:
+        """Return the filter when it is fresh enough to rule JTIs out, refreshing it when due"""
+        if time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return self._bloom
+        with self._lock:
+            now = time.monotonic()
+            if now - self._refreshed_at < self.refresh_interval:
+                return self._bloom
+            if now < self._redis_down_until:
+                return None
+            try:
+                self._flush_pending()
+                self._refresh()
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+            self._refreshed_at = now
+            return self._bloom
+
+    def _refresh(self) -> None:
+        """Apply the revocations logged since the last refresh, or reload after a rebuild
+
+        The filter also reloads when the log was trimmed past its offset.
+        """
+        # Read again once when the log was trimmed since the last refresh, shifting its indexes
+        for _ in range(2):
+            if self._bloom is None or self._count > self._bloom.capacity:
+                break
+            with _get_redis_connection().pipeline(transaction=True) as pipe:
+                pipe.get(self.epoch_key).get(self.log_start_key)
+                epoch, log_start, recent = pipe.lrange(self.log_key, self._offset - self._log_start, -1).execute()
+            log_start = int(log_start or 0)
+            if epoch is None or epoch != self._epoch or log_start > self._offset:
+                break
+            if log_start != self._log_start:
+                self._log_start = log_start
+                continue
+            for jti in recent:
+                self._bloom.add(jti.decode())
+            self._count += len(recent)
+            self._offset += len(recent)
+            return
+        self._reload()
+
+    def _reload(self) -> None:
+        with _get_redis_connection().pipeline(transaction=True) as pipe:
+            pipe.get(self.epoch_key).get(self.log_start_key)
+            epoch, log_start, length, jtis = pipe.llen(self.log_key).smembers(self.key).execute()
+        if epoch is None:
+            # Never built: no filter, the blacklist is queried instead
+            if self._built is not False:
+                logger.warning("Revocation index not built, run rebuild_revocation_index", key=self.key)
+            self._bloom, self._epoch, self._built = None, None, False
+            raise _NotBuilt(self.key)
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti.decode())
+        self._log_start = int(log_start or 0)
+        self._bloom, self._count, self._epoch, self._offset = bloom, len(jtis), epoch, self._log_start + length
+        self._built = True
+
+    def _flush_pending(self) -> None:
+        if not self._pending:
+            return
+        redis = _get_redis_connection()
+        with redis.pipeline(transaction=True) as pipe:
+            _, length = pipe.sadd(self.key, *self._pending).rpush(self.log_key, *self._pending).execute()
+        self._pending.clear()
+        if length > self.log_size * (1 + LOG_SLACK):
+            self._trim_log(redis)
+
+    def _trim_log(self, redis: Any) -> None:
+        """Drop the oldest revocations from the log, down to ``log_size`` entries"""
+        from redis.exceptions import WatchError
+
+        with redis.pipeline() as pipe:
+            try:
+                pipe.watch(self.log_key)
+                excess = pipe.llen(self.log_key) - self.log_size
+                if excess <= 0:
+                    return
+                pipe.multi()
+                pipe.ltrim(self.log_key, excess, -1)
+                pipe.incrby(self.log_start_key, excess)
+                pipe.execute()
+            except WatchError:
+                pass  # the log changed meanwhile; a later flush trims it
+
+    def _redis_failed(self, error: Exception) -> None:
+        if not isinstance(error, _NotBuilt):
+            logger.warning("Revocation index unavailable, querying the blacklist", error=str(error))
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+class _NotBuilt(Exception):
+    """The index was never built, or was lost with Redis"""
+
+
+def _get_redis_connection() -> Any:
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def _blacklisted_in_db(jti: str) -> bool:
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def _batches(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_index: Optional[RevocationIndex] = None
+_lock = threading.Lock()
+
+
+def get_revocation_index() -> RevocationIndex:
+    """Return the shared index configured by ``TOKEN_REVOCATION_INDEX``
+
+    ``TOKEN_REVOCATION_INDEX`` is a dict of ``RevocationIndex`` arguments.
+
+    Raises:
+        ImproperlyConfigured: If ``TOKEN_REVOCATION_INDEX`` holds invalid values
+    """
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                options = getattr(settings, "TOKEN_REVOCATION_INDEX", None) or {}
+                try:
+                    _index = RevocationIndex(**options)
+                except (TypeError, ValueError) as e:
+                    raise ImproperlyConfigured(f"Invalid TOKEN_REVOCATION_INDEX: {e}") from e
+    return _index
+
+
+def reset_revocation_index() -> None:
+    """Drop the shared index and its filter (settings changes, tests)"""
+    global _index
+    with _lock:
+        _index = None
+
+
+def rebuild_revocation_index(batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Load the unexpired blacklisted JTIs from the database into the index
+
+    Returns:
+        The number of JTIs indexed
+    """
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    def jtis() -> Iterator[str]:
+        yield from (
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            .values_list("token__jti", flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+
+    return get_revocation_index().rebuild(jtis(), batch_size=batch_size)
@@ -0,0 +1,34 @@
+"""simplejwt serializers checking the blacklist through the revocation index
+
+Selected by the ``TOKEN_*_SERIALIZER`` settings of ``SIMPLE_JWT``.
+"""
+from typing import Any, Dict
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+
+from apps.auth.revocation import get_revocation_index
+from apps.auth.tokens import RefreshToken
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+class TokenBlacklistSerializer(jwt_serializers.TokenBlacklistSerializer):
+    token_class = RefreshToken
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        jti = UntypedToken(attrs["token"]).get(api_settings.JTI_CLAIM)
+        if api_settings.BLACKLIST_AFTER_ROTATION and jti and get_revocation_index().is_revoked(jti):
+            raise serializers.ValidationError(_("Token is blacklisted"))
+        return {}
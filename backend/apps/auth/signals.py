@@ -0,0 +1,134 @@
+import threading
+import weakref
+
+import structlog
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.auth.authentication import token_cache_key
+from apps.auth.introspection import reset_introspector
+from apps.auth.keys import reset_keyring
+from apps.auth.revocation import get_revocation_index, reset_revocation_index
+
+logger = structlog.get_logger(__name__)
+
+
+@receiver(setting_changed)
+def reload_auth_settings(setting, **kwargs):
+    """Reload the JWT key ring, introspection cache and revocation index when their settings change
+    (override_settings, reloads)"""
+    if setting == "JWT_SIGNING_KEYS":
+        reset_keyring()
+        reset_introspector()
+    elif setting == "TOKEN_INTROSPECTION":
+        reset_introspector()
+    elif setting == "TOKEN_REVOCATION_INDEX":
+        reset_revocation_index()
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def index_blacklisted_token(instance, created, using, **kwargs):
+    """Add a newly blacklisted token to the revocation index once it is committed"""
+    if created:
+        _revocation_batch(using).record(instance, revoked=True)
+
+
+@receiver(post_delete, sender=BlacklistedToken)
+def unindex_blacklisted_token(instance, using, **kwargs):
+    """Remove a token taken off the blacklist from the revocation index once it is committed"""
+    _revocation_batch(using).record(instance, revoked=False)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def uncache_token(instance, **kwargs):
+    """Drop a changed or deleted API token from the authentication cache"""
+    transaction.on_commit(lambda: _uncache_tokens([instance.key]))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def uncache_user_tokens(instance, created=False, update_fields=None, **kwargs):
+    """Drop the API tokens of a changed or deleted user from the authentication cache
+
+    Logins, which only update ``last_login``, keep them.
+    """
+    if created or (update_fields is not None and set(update_fields) == {"last_login"}):
+        return
+    keys = list(Token.objects.filter(user_id=instance.pk).values_list("key", flat=True))
+    if keys:
+        transaction.on_commit(lambda: _uncache_tokens(keys))
+
+
+class _RevocationBatch:
+    """Blacklist changes of a transaction, applied to the revocation index at once on commit
+
+    JTIs are read from tokens already loaded, the others with one query on
+    commit, so blacklisting or unblacklisting in bulk costs no query per row.
+    """
+
+    def __init__(self, using, autocommit):
+        self.using = using
+        self.autocommit = autocommit
+        self.changes = {}  # token id -> (revoked, jti when loaded)
+        self.flushed = False
+
+    def record(self, instance, revoked):
+        jti = instance.token.jti if BlacklistedToken.token.is_cached(instance) else None
+        self.changes[instance.token_id] = (revoked, jti)
+        if self.autocommit:
+            self.flush()
+
+    def flush(self):
+        self.flushed = True
+        unknown = [token_id for token_id, (_, jti) in self.changes.items() if jti is None]
+        loaded = {}
+        if unknown:
+            loaded = dict(OutstandingToken.objects.using(self.using).filter(pk__in=unknown).values_list("pk", "jti"))
+        revoked, unrevoked = [], []
+        for token_id, (is_revoked, jti) in self.changes.items():
+            # A token deleted along with its blacklist entry stays indexed until the next rebuild
+            jti = jti or loaded.get(token_id)
+            if jti:
+                (revoked if is_revoked else unrevoked).append(jti)
+        self.changes.clear()
+        index = get_revocation_index()
+        index.add_many(revoked)
+        index.remove_many(unrevoked)
+
+
+_revocation_batches = threading.local()
+
+
+def _revocation_batch(using):
+    """Return the batch of the current transaction and savepoint, registering its commit hook once
+
+    A batch is only referenced by its on_commit hook, so rolling back the
+    transaction or savepoint drops it with the hook. Outside a transaction,
+    rows are already committed and every change is applied at once.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        return _RevocationBatch(using, autocommit=True)
+    batches = getattr(_revocation_batches, "batches", None)
+    if batches is None:
+        batches = _revocation_batches.batches = weakref.WeakValueDictionary()
+    key = (using, tuple(connection.savepoint_ids))
+    batch = batches.get(key)
+    if batch is None or batch.flushed:
+        batch = batches[key] = _RevocationBatch(using, autocommit=False)
+        transaction.on_commit(batch.flush, using=using)
+    return batch
+
+
+def _uncache_tokens(keys):
+    try:
+        caches["default"].delete_many([token_cache_key(key) for key in keys])
+    except Exception as e:
+        logger.warning("Token cache unavailable, cached tokens expire on their own", error=str(e))
@@ -0,0 +1,170 @@
+from unittest.mock import patch
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+
+def _pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+@pytest.fixture(scope="session")
+def signing_pems():
+    """PEM private keys of every supported type, generated once"""
+    return {
+        "rsa": _pem(rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        "ec": _pem(ec.generate_private_key(ec.SECP256R1())),
+        "ed25519": _pem(ed25519.Ed25519PrivateKey.generate()),
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_state():
+    """Make sure no key ring or cached introspection leaks from one test into another"""
+    from django.core.cache import cache
+
+    from apps.auth.introspection import reset_introspector
+    from apps.auth.keys import reset_keyring
+    from apps.auth.revocation import reset_revocation_index
+
+    reset_keyring()
+    reset_introspector()
+    reset_revocation_index()
+    cache.clear()
+    yield
+    reset_keyring()
+    reset_introspector()
+    reset_revocation_index()
+    cache.clear()
+
+
+@pytest.fixture
+def access_token():
+    """Build a signed access token for a user id, optionally with a lifetime"""
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    def build(user_id=1, lifetime=None) -> str:
+        token = AccessToken()
+        token["user_id"] = user_id
+        if lifetime is not None:
+            token.set_exp(lifetime=lifetime)
+        return str(token)
+
+    return build
+
+
+class FakeRedis:
+    """Tiny in-memory stand-in for the redis-py commands of the revocation index"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        return self.incrby(key, 1)
+
+    def incrby(self, key, amount):
+        value = int(self.data.get(key, b"0")) + amount
+        self.data[key] = str(value).encode()
+        return value
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def rename(self, source, destination):
+        self.data[destination] = self.data.pop(source)
+        return True
+
+    def sadd(self, key, *members):
+        values = self.data.setdefault(key, set())
+        added = {_bytes(member) for member in members} - values
+        values.update(added)
+        return len(added)
+
+    def srem(self, key, *members):
+        values = self.data.get(key, set())
+        removed = {_bytes(member) for member in members} & values
+        values.difference_update(removed)
+        return len(removed)
+
+    def sismember(self, key, member):
+        return _bytes(member) in self.data.get(key, set())
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def sunionstore(self, destination, *keys):
+        self.data[destination] = set().union(*(self.data.get(key, set()) for key in keys))
+        return len(self.data[destination])
+
+    def rpush(self, key, *values):
+        entries = self.data.setdefault(key, [])
+        entries.extend(_bytes(value) for value in values)
+        return len(entries)
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def lrange(self, key, start, end):
+        entries = self.data.get(key, [])
+        return entries[start:] if end == -1 else entries[start:end + 1]
+
+    def ltrim(self, key, start, end):
+        self.data[key] = self.lrange(key, start, end)
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _bytes(value):
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakePipeline:
+    """Queues FakeRedis commands until execute(), running them at once after watch() like redis-py"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+        self.immediate = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.commands = []
+
+    def watch(self, *keys):
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        if self.immediate:
+            return command
+
+        def queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    """FakeRedis serving the revocation index"""
+    redis = FakeRedis()
+    with patch("apps.auth.revocation._get_redis_connection", return_value=redis):
+        yield redis
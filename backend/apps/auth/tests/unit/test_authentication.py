@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.auth.authentication import DispatchingAuthentication
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create(username="alice")
+
+
+def _authenticate(authorization=None):
+    headers = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+    return DispatchingAuthentication().authenticate(Request(APIRequestFactory().get("/", **headers)))
+
+
+@pytest.fixture
+def session():
+    with patch("rest_framework.authentication.SessionAuthentication.authenticate", return_value=None) as session:
+        yield session
+
+
+def test_bearer_uses_jwt_only(user, session):
+    """Test that a Bearer token is authenticated as a JWT without touching tokens or the session"""
+    with patch("apps.auth.authentication.CachedTokenAuthentication.authenticate") as token:
+        authenticated, validated = _authenticate(f"Bearer {AccessToken.for_user(user)}")
+
+    assert authenticated == user
+    assert validated["user_id"] == str(user.pk)
+    token.assert_not_called()
+    session.assert_not_called()
+
+
+def test_invalid_bearer_fails(db, session):
+    """Test that a bad Bearer token is refused rather than tried against other schemes"""
+    with pytest.raises(AuthenticationFailed):
+        _authenticate("Bearer not-a-token")
+    session.assert_not_called()
+
+
+def test_token_lookups_are_cached(user, session):
+    """Test that a Token key is looked up once, then served from the cache"""
+    token = Token.objects.create(user=user)
+
+    assert _authenticate(f"Token {token.key}") == (user, token)
+    with CaptureQueriesContext(connection) as queries:
+        assert _authenticate(f"Token {token.key}")[0] == user
+
+    assert len(queries) == 0
+    session.assert_not_called()
+
+
+def test_deleted_token_is_uncached(user):
+    """Test that a deleted Token stops authenticating at once"""
+    token = Token.objects.create(user=user)
+    _authenticate(f"Token {token.key}")
+
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        token.delete()
+
+    with pytest.raises(AuthenticationFailed):
+        _authenticate(f"Token {token.key}")
+
+
+def test_deactivated_user_is_uncached(user):
+    """Test that a user's cached tokens are dropped when the user changes, not on login"""
+    token = Token.objects.create(user=user)
+    _authenticate(f"Token {token.key}")
+
+    with TestCase.captureOnCommitCallbacks(execute=True) as callbacks:
+        user.save(update_fields=["last_login"])
+    assert callbacks == []
+
+    user.is_active = False
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        user.save()
+
+    with pytest.raises(AuthenticationFailed, match="inactive"):
+        _authenticate(f"Token {token.key}")
+
+
+def test_other_requests_use_the_session(session):
+    """Test that requests without a known scheme fall back to the session"""
+    _authenticate()
+    _authenticate("Basic YWxpY2U6c2VjcmV0")
+
+    assert session.call_count == 2
+    assert DispatchingAuthentication().authenticate_header(None) == 'Bearer realm="api"'
@@ -0,0 +1,31 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from apps.auth.keys import get_keyring
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+def test_jwt_generate_key(tmp_path, algorithm):
+    """Test that a generated key is private to its owner and loads into the ring"""
+    out = StringIO()
+    call_command("jwt_generate_key", "--algorithm", algorithm, "--kid", "2026-10", "--keys-dir", str(tmp_path),
+                 stdout=out)
+
+    path = tmp_path / "2026-10.pem"
+    assert path.stat().st_mode & 0o777 == 0o600
+    with override_settings(JWT_SIGNING_KEYS={"keys_dir": str(tmp_path)}):
+        assert get_keyring().active.algorithm == algorithm
+    assert "2026-10" in out.getvalue()
+
+
+def test_jwt_generate_key_never_overwrites(tmp_path):
+    """Test that an existing key file is kept"""
+    (tmp_path / "k1.pem").write_text("existing")
+
+    with pytest.raises(CommandError):
+        call_command("jwt_generate_key", "--kid", "k1", "--keys-dir", str(tmp_path))
+
+    assert (tmp_path / "k1.pem").read_text() == "existing"
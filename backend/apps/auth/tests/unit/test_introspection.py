@@ -0,0 +1,117 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from apps.auth.introspection import INACTIVE, LocalLRU, TokenIntrospector, get_introspector
+
+
+def _verifications(introspector):
+    return patch.object(introspector, "_verify", wraps=introspector._verify)
+
+
+def test_valid_and_invalid_tokens(access_token):
+    """Test that valid tokens are active with their claims and others inactive"""
+    results = TokenIntrospector().introspect([
+        access_token(user_id=7), access_token(lifetime=timedelta(seconds=-1)), "not-a-token",
+    ])
+
+    assert results[0]["active"] is True
+    assert results[0]["user_id"] == 7
+    assert results[0]["token_type"] == "access"
+    assert results[1:] == [INACTIVE, INACTIVE]
+
+
+def test_results_are_cached_locally(access_token):
+    """Test that a token is verified once, positive or negative"""
+    introspector = TokenIntrospector()
+    tokens = [access_token(), "not-a-token"]
+
+    with _verifications(introspector) as verify:
+        first = introspector.introspect(tokens)
+        assert introspector.introspect(tokens) == first
+
+    assert verify.call_count == 2
+
+
+def test_shared_tier_serves_other_workers(access_token):
+    """Test that a result verified by one process is read from the shared cache by another"""
+    token = access_token()
+    TokenIntrospector().introspect([token])
+    other = TokenIntrospector()
+
+    with _verifications(other) as verify:
+        assert other.introspect([token])[0]["active"] is True
+
+    verify.assert_not_called()
+    assert len(other.local) == 1
+
+
+def test_active_results_expire_with_the_token(access_token):
+    """Test that an active result is never cached past the token expiry nor cache_ttl"""
+    introspector = TokenIntrospector(cache_ttl=60)
+    now = time.time()
+
+    short, long = access_token(lifetime=timedelta(seconds=5)), access_token(lifetime=timedelta(hours=1))
+    introspector.introspect([short, long])
+
+    expiries = sorted(expires_at for _, expires_at in introspector.local._entries.values())
+    assert expiries[0] <= now + 6
+    assert expiries[1] <= now + 61
+
+
+def test_batch_keeps_order_and_duplicates(access_token):
+    """Test that a batch is answered in order, duplicates verified once"""
+    introspector = TokenIntrospector()
+    first, second = access_token(user_id=1), access_token(user_id=2)
+
+    with _verifications(introspector) as verify:
+        results = introspector.introspect([second, first, second])
+
+    assert [result["user_id"] for result in results] == [2, 1, 2]
+    assert verify.call_count == 2
+
+
+def test_shared_cache_errors_fall_back_to_local(access_token):
+    """Test that a failing shared cache is skipped instead of failing introspection"""
+    introspector = TokenIntrospector()
+
+    with patch.object(cache, "get_many", side_effect=ConnectionError("down")) as get_many:
+        assert introspector.introspect([access_token()])[0]["active"] is True
+        assert introspector.introspect([access_token(user_id=2)])[0]["active"] is True
+
+    get_many.assert_called_once()
+
+
+def test_lru_evicts_the_least_recently_used():
+    """Test that the local tier drops the least recently read entry and expired ones"""
+    lru = LocalLRU(2)
+    now = time.time()
+    lru.set("a", {"n": 1}, now + 60)
+    lru.set("b", {"n": 2}, now + 60)
+    lru.get("a", now)
+    lru.set("c", {"n": 3}, now + 60)
+
+    assert lru.get("b", now) is None
+    assert lru.get("a", now) == {"n": 1}
+    assert lru.get("c", now + 61) is None
+
+
+@override_settings(TOKEN_INTROSPECTION={"cache_ttl": 30, "max_batch": 10, "api_keys": ["k1", ""]})
+def test_get_introspector_reads_settings():
+    """Test that the shared introspector follows TOKEN_INTROSPECTION"""
+    introspector = get_introspector()
+
+    assert introspector is get_introspector()
+    assert (introspector.cache_ttl, introspector.max_batch, introspector.api_keys) == (30, 10, ("k1",))
+
+
+@override_settings(TOKEN_INTROSPECTION={"cache_ttl": 0})
+def test_get_introspector_invalid_settings():
+    """Test that bad TOKEN_INTROSPECTION raise ImproperlyConfigured"""
+    with pytest.raises(ImproperlyConfigured):
+        get_introspector()
@@ -0,0 +1,117 @@
+import json
+
+import jwt
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from rest_framework_simplejwt import state
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.auth.keys import KeyRingTokenBackend, get_keyring, published_jwks
+
+
+def _token(user_id=1) -> str:
+    token = AccessToken()
+    token["user_id"] = user_id
+    return str(token)
+
+
+def _verify_locally(token: str) -> dict:
+    """Verify a token the way a relying application does, with the published JWKS only"""
+    document, _, _ = published_jwks()
+    key = jwt.PyJWKSet.from_json(document.decode())[jwt.get_unverified_header(token)["kid"]]
+    return jwt.decode(token, key.key, algorithms=[key.algorithm_name])
+
+
+def test_tokens_are_signed_with_the_active_key(signing_pems):
+    """Test that tokens carry the kid of the active key and verify against the JWKS"""
+    keys = {"2026-01": signing_pems["rsa"], "2026-02": signing_pems["ec"]}
+    with override_settings(JWT_SIGNING_KEYS={"keys": keys, "active_kid": "2026-02"}):
+        token = _token()
+
+        assert isinstance(state.token_backend, KeyRingTokenBackend)
+        assert jwt.get_unverified_header(token) == {"alg": "ES256", "kid": "2026-02", "typ": "JWT"}
+        assert _verify_locally(token)["user_id"] == 1
+        assert AccessToken(token)["user_id"] == 1
+
+
+@pytest.mark.parametrize("key_type, algorithm", [("rsa", "RS256"), ("ec", "ES256"), ("ed25519", "EdDSA")])
+def test_key_types(signing_pems, key_type, algorithm):
+    """Test that the algorithm follows the key type"""
+    with override_settings(JWT_SIGNING_KEYS={"keys": {"k1": signing_pems[key_type]}}):
+        token = _token()
+
+        assert jwt.get_unverified_header(token)["alg"] == algorithm
+        assert _verify_locally(token)["user_id"] == 1
+
+
+def test_rotation(signing_pems):
+    """Test that tokens of a retired active key stay valid while the key is published"""
+    keys = {"old": signing_pems["rsa"], "new": signing_pems["ec"]}
+    with override_settings(JWT_SIGNING_KEYS={"keys": keys, "active_kid": "old"}):
+        token = _token()
+
+    with override_settings(JWT_SIGNING_KEYS={"keys": keys, "active_kid": "new"}):
+        assert jwt.get_unverified_header(_token())["kid"] == "new"
+        assert AccessToken(token)["user_id"] == 1
+
+    with override_settings(JWT_SIGNING_KEYS={"keys": {"new": signing_pems["ec"]}}):
+        with pytest.raises(TokenError):
+            AccessToken(token)
+
+
+def test_tokens_without_a_known_kid_are_refused(signing_pems):
+    """Test that HS256 tokens signed with the secret key are refused once keys are configured"""
+    hs256 = _token()
+
+    with override_settings(JWT_SIGNING_KEYS={"keys": {"k1": signing_pems["ec"]}}):
+        with pytest.raises(TokenError):
+            AccessToken(hs256)
+
+
+def test_without_keys_hs256_is_kept():
+    """Test that simplejwt's own backend is used and the JWKS is empty without keys"""
+    assert get_keyring() is None
+    assert jwt.get_unverified_header(_token())["alg"] == "HS256"
+    assert published_jwks()[0] == b'{"keys":[]}'
+
+
+def test_keys_dir(tmp_path, signing_pems):
+    """Test that every PEM of keys_dir is loaded, named after its file"""
+    (tmp_path / "a.pem").write_text(signing_pems["rsa"])
+    (tmp_path / "b.pem").write_text(signing_pems["ed25519"])
+
+    with override_settings(JWT_SIGNING_KEYS={"keys_dir": str(tmp_path), "active_kid": "b", "jwks_max_age": 600}):
+        keyring = get_keyring()
+        document, _, max_age = published_jwks()
+
+    assert keyring.active.kid == "b"
+    assert [key["kid"] for key in json.loads(document)["keys"]] == ["a", "b"]
+    assert max_age == 600
+
+
+@pytest.mark.parametrize("options", [
+    {"keys": {"k1": "not a pem"}},
+    {"keys_dir": "/nonexistent"},
+])
+def test_invalid_keys(options):
+    """Test that unusable key settings raise ImproperlyConfigured"""
+    with pytest.raises(ImproperlyConfigured):
+        with override_settings(JWT_SIGNING_KEYS=options):
+            get_keyring()
+
+
+def test_active_kid_is_required_with_several_keys(signing_pems):
+    """Test that a second key never starts signing until it is made active"""
+    keys = {"2026-01": signing_pems["ec"], "2026-02": signing_pems["rsa"]}
+    with pytest.raises(ImproperlyConfigured):
+        with override_settings(JWT_SIGNING_KEYS={"keys": keys}):
+            get_keyring()
+
+
+def test_unknown_active_kid(signing_pems):
+    """Test that an active kid missing from the ring is refused"""
+    with pytest.raises(ImproperlyConfigured):
+        with override_settings(JWT_SIGNING_KEYS={"keys": {"k1": signing_pems["ec"]}, "active_kid": "k2"}):
+            get_keyring()
@@ -0,0 +1,55 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.auth.pruning import prune_expired_tokens
+
+
+def _token(jti, expires_in, blacklisted=False):
+    token = OutstandingToken.objects.create(jti=jti, token=jti, expires_at=timezone.now() + expires_in)
+    if blacklisted:
+        BlacklistedToken.objects.create(token=token)
+    return token
+
+
+@pytest.fixture
+def tokens(db):
+    """Five expired tokens, three of them blacklisted, and two live ones"""
+    for i in range(5):
+        _token(f"expired-{i}", timedelta(hours=-1), blacklisted=i % 2 == 0)
+    _token("live", timedelta(hours=1))
+    _token("live-blacklisted", timedelta(hours=1), blacklisted=True)
+
+
+def test_prunes_expired_tokens_in_batches(tokens):
+    """Test that expired tokens and their blacklist entries go, batch by batch, and live ones stay"""
+    result = prune_expired_tokens(batch_size=2)
+
+    assert (result.outstanding, result.blacklisted, result.batches) == (5, 3, 3)
+    assert set(OutstandingToken.objects.values_list("jti", flat=True)) == {"live", "live-blacklisted"}
+    assert list(BlacklistedToken.objects.values_list("token__jti", flat=True)) == ["live-blacklisted"]
+    assert prune_expired_tokens().outstanding == 0
+
+
+def test_stop_ends_the_run(tokens):
+    """Test that a set stop event ends the run before the next batch"""
+    stop = threading.Event()
+    stop.set()
+
+    assert prune_expired_tokens(stop=stop).batches == 0
+    assert OutstandingToken.objects.count() == 7
+
+
+def test_prune_command(tokens, fake_redis):
+    """Test that the command reports what it pruned and reindexes the live blacklist"""
+    out = StringIO()
+    call_command("prune_tokens", "--batch-size", "10", stdout=out)
+
+    assert "Pruned 5 outstanding and 3 blacklisted token(s) in 1 batch(es)" in out.getvalue()
+    assert "Indexed 1 blacklisted token(s)" in out.getvalue()
+    assert fake_redis.smembers("auth:revoked_jtis") == {b"live-blacklisted"}
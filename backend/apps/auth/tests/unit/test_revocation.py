@@ -0,0 +1,240 @@
+import time
+from io import StringIO
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.auth.revocation import BloomFilter, RevocationIndex, get_revocation_index
+from apps.auth.serializers import TokenVerifySerializer
+from apps.auth.tokens import RefreshToken
+
+
+def _blacklist(jti, expires_in=timedelta(days=1)):
+    token = OutstandingToken.objects.create(jti=jti, token=jti, expires_at=timezone.now() + expires_in)
+    return BlacklistedToken.objects.create(token=token)
+
+
+def test_bloom_filter():
+    """Test that the filter has no false negatives and about its false positive rate"""
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"revoked-{i}")
+
+    assert all(f"revoked-{i}" in bloom for i in range(1000))
+    assert sum(f"other-{i}" in bloom for i in range(10000)) < 300
+
+
+def test_unrevoked_tokens_are_ruled_out_in_process(fake_redis):
+    """Test that a built index answers misses from the filter and hits from the Redis set"""
+    index = RevocationIndex()
+    index.rebuild(["a", "b"])
+
+    with patch.object(fake_redis, "sismember", wraps=fake_redis.sismember) as sismember, \
+            patch("apps.auth.revocation._blacklisted_in_db") as in_db:
+        assert index.is_revoked("a") is True
+        assert not any(index.is_revoked(f"other-{i}") for i in range(100))
+
+    assert sismember.call_count < 5
+    in_db.assert_not_called()
+
+
+def test_unbuilt_index_queries_the_blacklist(fake_redis, db):
+    """Test that the database answers until the index is built"""
+    _blacklist("a")
+    index = RevocationIndex()
+
+    with CaptureQueriesContext(connection) as queries:
+        assert index.is_revoked("a") is True
+        assert index.is_revoked("b") is False
+
+    assert len(queries) == 2
+
+
+def test_redis_down_queries_the_blacklist(fake_redis, db):
+    """Test that the database answers while Redis fails, and missed revocations are written back"""
+    _blacklist("a")
+    index = RevocationIndex()
+    index.rebuild([])
+
+    with patch.object(fake_redis, "pipeline", side_effect=ConnectionError("down")):
+        index.add("b")
+        assert index.is_revoked("a") is True
+
+    index._redis_down_until = 0
+    assert index.is_revoked("b") is True
+    assert fake_redis.sismember("auth:revoked_jtis", "b")
+
+
+def test_pending_revocations_query_the_blacklist(fake_redis, db):
+    """Test that a revocation Redis missed is answered by the database until it is written"""
+    index = RevocationIndex(refresh_interval=60)
+    index.rebuild([])
+    index.is_revoked("x")
+    _blacklist("b")
+
+    with patch.object(fake_redis, "pipeline", side_effect=ConnectionError("down")):
+        index.add("b")
+    index._redis_down_until = 0
+
+    assert not fake_redis.sismember("auth:revoked_jtis", "b")
+    assert index.is_revoked("b") is True
+
+
+def test_revocations_reach_other_processes(fake_redis):
+    """Test that a filter picks up other processes' revocations on its next refresh"""
+    revoking, checking = RevocationIndex(refresh_interval=0.05), RevocationIndex(refresh_interval=0.05)
+    revoking.rebuild([])
+    assert checking.is_revoked("a") is False
+
+    revoking.add("a")
+    assert revoking.is_revoked("a") is True
+    time.sleep(0.05)
+    assert checking.is_revoked("a") is True
+
+
+def test_filter_grows_past_its_capacity(fake_redis):
+    """Test that a full filter is reloaded larger"""
+    index = RevocationIndex(capacity=10, refresh_interval=0.01)
+    index.rebuild([])
+    index.is_revoked("x")
+    for i in range(30):
+        index.add(f"jti-{i}")
+    time.sleep(0.01)
+    index.is_revoked("x")
+    time.sleep(0.01)
+
+    assert index.is_revoked("jti-29") is True
+    assert index._bloom.capacity == 60
+
+
+def test_log_is_capped(fake_redis):
+    """Test that the log is trimmed to log_size, filters behind the trim reloading the set"""
+    revoking, checking, lagging = (RevocationIndex(refresh_interval=0.01, log_size=10) for _ in range(3))
+    revoking.rebuild([])
+    checking.is_revoked("x")
+    lagging.is_revoked("x")
+    for i in range(5):
+        revoking.add(f"jti-{i}")
+    time.sleep(0.01)
+    checking.is_revoked("x")
+    for i in range(5, 12):
+        revoking.add(f"jti-{i}")
+    time.sleep(0.01)
+
+    assert fake_redis.llen("auth:revoked_jtis:log") == 10
+    assert fake_redis.get("auth:revoked_jtis:log_start") == b"2"
+    assert all(checking.is_revoked(f"jti-{i}") for i in range(12))
+    assert all(lagging.is_revoked(f"jti-{i}") for i in range(12))
+    assert checking._offset == lagging._offset == 12
+
+
+def test_rebuild_keeps_racing_revocations(fake_redis):
+    """Test that revocations logged while the blacklist is read survive the rebuild"""
+    index = RevocationIndex()
+    index.add("stale")
+
+    def jtis():
+        yield "a"
+        index.add("racing")
+
+    assert index.rebuild(jtis()) == 1
+    assert fake_redis.smembers("auth:revoked_jtis") == {b"a", b"racing"}
+    assert fake_redis.get("auth:revoked_jtis:epoch") == b"1"
+    assert fake_redis.lrange("auth:revoked_jtis:log", 0, -1) == [b"racing"]
+
+
+def test_rebuild_keeps_revocations_trimmed_meanwhile(fake_redis):
+    """Test that revocations trimmed from the log during a rebuild are kept from the current set"""
+    index = RevocationIndex(log_size=2)
+    index.add("stale")
+
+    def jtis():
+        yield "a"
+        for i in range(3):
+            index.add(f"racing-{i}")
+
+    index.rebuild(jtis())
+
+    assert {b"a", b"racing-0", b"racing-1", b"racing-2"} <= fake_redis.smembers("auth:revoked_jtis")
+    assert not fake_redis.get("auth:revoked_jtis:rebuild")
+
+
+def test_blacklisted_refresh_token_is_rejected(fake_redis, db):
+    """Test that blacklisting a refresh token indexes it on commit and the token is refused afterwards"""
+    user = get_user_model().objects.create(username="alice")
+    index = get_revocation_index()
+    index.rebuild([])
+    token = RefreshToken.for_user(user)
+
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        token.blacklist()
+
+    assert fake_redis.sismember("auth:revoked_jtis", token["jti"])
+    with CaptureQueriesContext(connection) as queries, pytest.raises(TokenError, match="blacklisted"):
+        RefreshToken(str(token))
+    assert len(queries) == 0
+    with patch("apps.auth.serializers.api_settings.BLACKLIST_AFTER_ROTATION", True):
+        assert not TokenVerifySerializer(data={"token": str(token)}).is_valid()
+        assert TokenVerifySerializer(data={"token": str(RefreshToken.for_user(user))}).is_valid()
+
+
+def test_blacklist_changes_are_indexed_in_one_batch(fake_redis, db):
+    """Test that bulk blacklisting and unblacklisting cost no query per row and reach the index on commit"""
+    get_revocation_index().rebuild([])
+    expires_at = timezone.now() + timedelta(days=1)
+    tokens = [OutstandingToken.objects.create(jti=f"bulk-{i}", token=f"bulk-{i}", expires_at=expires_at)
+              for i in range(5)]
+
+    with CaptureQueriesContext(connection) as queries, TestCase.captureOnCommitCallbacks(execute=True):
+        for token in tokens:
+            BlacklistedToken.objects.create(token_id=token.pk)
+
+    assert len(queries) == len(tokens) + 1  # the inserts, then the JTIs on commit
+    assert fake_redis.smembers("auth:revoked_jtis") == {f"bulk-{i}".encode() for i in range(5)}
+
+    with CaptureQueriesContext(connection) as queries, TestCase.captureOnCommitCallbacks(execute=True):
+        BlacklistedToken.objects.filter(token__jti__in=["bulk-0", "bulk-1"]).delete()
+
+    assert len(queries) == 3  # the rows, their deletion, then the JTIs on commit
+    assert fake_redis.smembers("auth:revoked_jtis") == {f"bulk-{i}".encode() for i in range(2, 5)}
+
+
+def test_rolled_back_blacklisting_is_not_indexed(fake_redis, db):
+    """Test that blacklist changes of a rolled back savepoint never reach the index"""
+    get_revocation_index().rebuild([])
+
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        _blacklist("kept")
+        with pytest.raises(RuntimeError), transaction.atomic():
+            _blacklist("rolled-back")
+            raise RuntimeError
+
+    assert fake_redis.smembers("auth:revoked_jtis") == {b"kept"}
+
+
+def test_rebuild_command(fake_redis, db):
+    """Test that the command indexes the unexpired blacklisted tokens only"""
+    _blacklist("a")
+    _blacklist("expired", expires_in=timedelta(seconds=-1))
+
+    out = StringIO()
+    call_command("rebuild_revocation_index", "--batch-size", "1", stdout=out)
+
+    assert fake_redis.smembers("auth:revoked_jtis") == {b"a"}
+    assert "Indexed 1 blacklisted token(s)" in out.getvalue()
+
+
+def test_invalid_settings():
+    """Test that invalid TOKEN_REVOCATION_INDEX values are reported as configuration errors"""
+    with override_settings(TOKEN_REVOCATION_INDEX={"error_rate": 2}), pytest.raises(ImproperlyConfigured):
+        get_revocation_index()
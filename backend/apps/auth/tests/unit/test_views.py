@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from django.test import RequestFactory, override_settings
+
+from apps.auth.views import introspect_view, jwks_view
+
+
+@pytest.fixture
+def rf():
+    return RequestFactory()
+
+
+def test_jwks_view_serves_the_public_keys(rf, signing_pems):
+    """Test that the JWKS lists public keys only, with strong caching headers"""
+    with override_settings(JWT_SIGNING_KEYS={"keys": {"k1": signing_pems["ec"]}, "jwks_max_age": 600}):
+        response = jwks_view(rf.get("/.well-known/jwks.json"))
+
+    keys = json.loads(response.content)["keys"]
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    assert response["Cache-Control"] == "public, max-age=600, stale-while-revalidate=600"
+    assert response["ETag"].startswith('"')
+    assert [(key["kid"], key["alg"], key["use"]) for key in keys] == [("k1", "ES256", "sig")]
+    assert "d" not in keys[0]
+
+
+def test_jwks_view_revalidation(rf, signing_pems):
+    """Test that a matching If-None-Match gets a bodiless 304, a stale one the document"""
+    with override_settings(JWT_SIGNING_KEYS={"keys": {"k1": signing_pems["rsa"]}}):
+        etag = jwks_view(rf.get("/.well-known/jwks.json"))["ETag"]
+        not_modified = jwks_view(rf.get("/.well-known/jwks.json", HTTP_IF_NONE_MATCH=etag))
+        stale = jwks_view(rf.get("/.well-known/jwks.json", HTTP_IF_NONE_MATCH='"other"'))
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified["ETag"] == etag
+    assert stale.status_code == 200
+
+
+def test_jwks_view_without_keys(rf):
+    """Test that an HS256-only server publishes an empty key set"""
+    response = jwks_view(rf.get("/.well-known/jwks.json"))
+
+    assert json.loads(response.content) == {"keys": []}
+
+
+def test_jwks_view_is_get_only(rf):
+    """Test that other methods are refused"""
+    assert jwks_view(rf.post("/.well-known/jwks.json")).status_code == 405
+
+
+@pytest.fixture
+def api_key():
+    with override_settings(TOKEN_INTROSPECTION={"api_keys": ["s3cret"]}):
+        yield "s3cret"
+
+
+def _introspect(rf, data, content_type="application/json", **headers):
+    body = json.dumps(data) if content_type == "application/json" else data
+    headers.setdefault("HTTP_AUTHORIZATION", "Bearer s3cret")
+    return introspect_view(rf.post("/api/auth/token/introspect/", body, content_type=content_type, **headers))
+
+
+def test_introspect_view_single_token(rf, access_token, api_key):
+    """Test that a JSON or form token is answered with its introspection"""
+    token = access_token(user_id=3)
+
+    as_json = json.loads(_introspect(rf, {"token": token}).content)
+    as_form = json.loads(introspect_view(
+        rf.post("/api/auth/token/introspect/", {"token": token}, HTTP_AUTHORIZATION=f"Bearer {api_key}")
+    ).content)
+
+    assert as_json["active"] is True
+    assert as_json["user_id"] == 3
+    assert as_form == as_json
+
+
+def test_introspect_view_batch(rf, access_token, api_key):
+    """Test that a batch is answered in order"""
+    response = _introspect(rf, {"tokens": [access_token(), "nope"]})
+
+    results = json.loads(response.content)["results"]
+    assert [result["active"] for result in results] == [True, False]
+
+
+@pytest.mark.parametrize("data", [{}, {"token": ""}, {"tokens": []}, {"tokens": ["a"] * 101}, {"tokens": [1]}, []])
+def test_introspect_view_bad_requests(rf, data, api_key):
+    """Test that missing, empty or oversized requests are refused"""
+    assert _introspect(rf, data).status_code == 400
+
+
+def test_introspect_view_requires_an_api_key(rf, access_token, api_key):
+    """Test that configured API keys must be sent as bearer tokens"""
+    token = access_token()
+
+    assert _introspect(rf, {"token": token}, HTTP_AUTHORIZATION="").status_code == 401
+    assert _introspect(rf, {"token": token}, HTTP_AUTHORIZATION="Bearer nope").status_code == 401
+    assert _introspect(rf, {"token": token}, HTTP_AUTHORIZATION="Bearer s3cret").status_code == 200
+
+
+@pytest.mark.parametrize("options, status", [({}, 401), ({"allow_anonymous": True}, 200)])
+def test_introspect_view_without_api_keys(rf, access_token, options, status):
+    """Test that introspection is closed when no API key is configured, unless anonymous calls are allowed"""
+    with override_settings(TOKEN_INTROSPECTION=options):
+        assert _introspect(rf, {"token": access_token()}, HTTP_AUTHORIZATION="").status_code == status
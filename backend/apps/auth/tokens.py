@@ -0,0 +1,14 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from apps.auth.revocation import get_revocation_index
+
+
+class RefreshToken(BaseRefreshToken):
+    """Refresh token checked against the revocation index instead of a blacklist query"""
+
+    def check_blacklist(self) -> None:
+        if get_revocation_index().is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
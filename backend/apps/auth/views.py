@@ -0,0 +1,74 @@
+import json
+from typing import Any, Dict, Optional
+
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from apps.auth.introspection import get_introspector
+from apps.auth.keys import published_jwks
+
+
+@transaction.non_atomic_requests
+@require_GET
+def jwks_view(request: HttpRequest) -> HttpResponse:
+    """Public keys of our JWT signing keys (``/.well-known/jwks.json``)
+
+    Relying applications verify tokens locally with these keys. The document
+    is prebuilt in memory and served with a strong ETag and public caching,
+    revalidated in the background, so consumers and CDNs rarely come back and
+    a conditional request is answered with a bodiless 304.
+    """
+    document, etag, max_age = published_jwks()
+    matches = parse_etags(request.headers.get("If-None-Match", ""))
+    if etag in matches or matches == ["*"]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(document, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=max_age, stale_while_revalidate=max_age)
+    return response
+
+
+@transaction.non_atomic_requests
+@csrf_exempt
+@require_POST
+def introspect_view(request: HttpRequest) -> HttpResponse:
+    """Token introspection (RFC 7662) for relying applications
+
+    Takes ``token`` as a form field or JSON, or ``{"tokens": [...]}`` to
+    introspect a batch, answered as ``{"results": [...]}`` in the same order.
+    A plain Django view on purpose: this is the hottest endpoint, and DRF's
+    authentication, permission and throttling stack would run for nothing.
+    Callers send one of the ``TOKEN_INTROSPECTION`` API keys as a bearer
+    token; without keys configured every caller is refused, unless
+    ``allow_anonymous`` is set.
+    """
+    introspector = get_introspector()
+    if not introspector.authorized(request.headers.get("Authorization", "")):
+        return JsonResponse({"error": "invalid_client"}, status=401)
+    params = _params(request)
+    tokens = params.get("tokens") if params is not None else None
+    if tokens is not None:
+        valid = isinstance(tokens, list) and 0 < len(tokens) <= introspector.max_batch
+        if not (valid and all(isinstance(token, str) and token for token in tokens)):
+            return JsonResponse({"error": "invalid_request"}, status=400)
+        return JsonResponse({"results": introspector.introspect(tokens)})
+    token = params.get("token") if params is not None else None
+    if not isinstance(token, str) or not token:
+        return JsonResponse({"error": "invalid_request"}, status=400)
+    return JsonResponse(introspector.introspect([token])[0])
+
+
+def _params(request: HttpRequest) -> Optional[Dict[str, Any]]:
+    """Form fields, or the JSON object of a JSON request (None when it is not one)"""
+    if request.content_type != "application/json":
+        return request.POST.dict()
+    try:
+        params = json.loads(request.body)
+    except ValueError:
+        return None
+    return params if isinstance(params, dict) else None
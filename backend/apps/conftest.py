@@ -0,0 +1,47 @@
+import django
+import pytest
+from django.conf import settings
+
+
+def pytest_configure():
+    """Minimal settings so the apps load without the project's services"""
+    if not settings.configured:
+        settings.configure(
+            SECRET_KEY="test-secret-key-of-at-least-32-bytes",
+            INSTALLED_APPS=[
+                "django.contrib.contenttypes",
+                "django.contrib.auth",
+                "rest_framework",
+                "rest_framework.authtoken",
+                "rest_framework_simplejwt",
+                "rest_framework_simplejwt.token_blacklist",
+                "apps.auth",
+                "apps.twilio",
+            ],
+            DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+            ALLOWED_HOSTS=["testserver"],
+            TWILIO_SMS_CONFIG={
+                "account_sid": "AC123456789",
+                "auth_token": "auth_token_123",
+                "from_number": "+1234567890",
+            },
+        )
+        django.setup()
+
+
+@pytest.fixture(scope="session")
+def migrated_tables():
+    """Create the tables of the installed apps in the in-memory database, once, from their migrations"""
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+@pytest.fixture
+def db(migrated_tables):
+    """Roll back what a test writes to the database"""
+    from django.db import transaction
+
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class TwilioConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.twilio"
+    label = "hsb_twilio"
+    verbose_name = "Twilio"
+
+    def ready(self):
+        from apps.twilio import signals  # noqa: F401
+        from apps.twilio.services import configure_twilio_logging, load_twilio_configs
+
+        configure_twilio_logging()
+        load_twilio_configs()
@@ -0,0 +1,262 @@
+"""Batched persistence of Twilio status callbacks
+
+Twilio posts every status change of a message (queued, sent, delivered, ...)
+to the ``status_callback`` URL of its config. Writing each callback in its own
+transaction makes delivery tracking cost one database round trip per status
+change, so ``status_callback_view`` only validates the callback and hands it
+to the process-wide ``DeliveryStatusBuffer``. A background thread flushes the
+buffer every ``flush_interval`` seconds, or as soon as it holds
+``batch_size`` messages, with one multi-row upsert keyed by message SID.
+
+Statuses are ranked along the message lifecycle, both when callbacks are
+merged in the buffer and in the upsert, so callbacks arriving out of order or
+through different workers never move a message back from ``delivered`` to
+``sent``. Callbacks still buffered when a worker is killed without a clean
+shutdown are lost; the next status change of the message repairs its row.
+"""
+import atexit
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from apps.twilio.models import SMSDeliveryStatus
+from libs.twilio.sms.log import get_logger
+
+logger = get_logger()
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 2.0
+# Pending messages kept across failed flushes, in batches
+MAX_PENDING_BATCHES = 20
+
+# Position of each status in the message lifecycle; final statuses share a rank
+STATUS_RANKS = {
+    "accepted": 0,
+    "scheduled": 0,
+    "queued": 1,
+    "sending": 2,
+    "sent": 3,
+    "delivered": 4,
+    "undelivered": 4,
+    "failed": 4,
+    "canceled": 4,
+    "read": 5,
+}
+
+_UPSERT_COLUMNS = ("message_sid", "account_sid", "status", "status_rank", "error_code", "updated_at")
+
+
+@dataclass(frozen=True)
+class DeliveryUpdate:
+    """One status callback, as buffered before it is written"""
+
+    message_sid: str
+    account_sid: str
+    status: str
+    error_code: str
+    received_at: datetime
+
+    @property
+    def rank(self) -> int:
+        return STATUS_RANKS.get(self.status, 0)
+
+    @classmethod
+    def from_callback(cls, params: Dict[str, str]) -> "DeliveryUpdate":
+        """Build an update from the form fields of a status callback
+
+        Raises:
+            ValueError: If ``MessageSid`` or ``MessageStatus`` is missing
+        """
+        message_sid = params.get("MessageSid") or params.get("SmsSid")
+        status = params.get("MessageStatus") or params.get("SmsStatus")
+        if not message_sid or not status:
+            raise ValueError("MessageSid and MessageStatus are required")
+        return cls(
+            message_sid=message_sid,
+            account_sid=params.get("AccountSid", ""),
+            status=status.lower(),
+            error_code=params.get("ErrorCode") or "",
+            received_at=timezone.now(),
+        )
+
+
+class DeliveryStatusBuffer:
+    """In-memory buffer of status callbacks flushed to the database in batches
+
+    Only the most advanced status of each message is kept, so a batch holds at
+    most one row per message SID. The flusher thread is started on the first
+    ``add`` of each process (gunicorn workers fork after the app loads) and the
+    buffer is flushed once more at interpreter exit.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, DeliveryUpdate] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def add(self, update: DeliveryUpdate) -> None:
+        """Buffer a callback, waking the flusher once a batch is full"""
+        with self._lock:
+            _merge(self._pending, update)
+            full = len(self._pending) >= self.batch_size
+        self._ensure_flusher()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write every buffered callback now
+
+        Failed batches are put back in the buffer, up to
+        ``MAX_PENDING_BATCHES`` batches, and retried at the next flush.
+
+        Returns:
+            Number of messages written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                write_delivery_statuses(batch.values(), self.batch_size)
+            except Exception as e:
+                self._requeue(batch)
+                logger.error("Error writing SMS delivery statuses", count=len(batch), error=str(e))
+                return 0
+            logger.debug("SMS delivery statuses written", count=len(batch))
+            return len(batch)
+
+    def pending(self) -> int:
+        """Number of messages waiting to be written"""
+        return len(self._pending)
+
+    def close(self) -> None:
+        """Stop the flusher thread and write what is left"""
+        self._stop.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(self.flush_interval)
+        self.flush()
+
+    def _requeue(self, batch: Dict[str, DeliveryUpdate]) -> None:
+        with self._lock:
+            room = self.batch_size * MAX_PENDING_BATCHES - len(self._pending)
+            dropped = max(len(batch) - room, 0)
+            for update in list(batch.values())[dropped:]:
+                _merge(self._pending, update)
+        if dropped:
+            logger.error("Dropped SMS delivery statuses", count=dropped)
+
+    def _ensure_flusher(self) -> None:
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="twilio-delivery-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+def write_delivery_statuses(updates: Iterable[DeliveryUpdate], batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    """Upsert delivery statuses by message SID, one statement per ``batch_size`` rows
+
+    A row is only updated by a status of the same or a later rank.
+    """
+    updates = list(updates)
+    table = connection.ops.quote_name(SMSDeliveryStatus._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(column) for column in _UPSERT_COLUMNS)
+    assignments = ", ".join(
+        f"{name} = EXCLUDED.{name}"
+        for name in (connection.ops.quote_name(column) for column in _UPSERT_COLUMNS[1:])
+    )
+    rank = connection.ops.quote_name("status_rank")
+    row = "(" + ", ".join(["%s"] * len(_UPSERT_COLUMNS)) + ")"
+    with connection.cursor() as cursor:
+        for start in range(0, len(updates), batch_size):
+            chunk = updates[start:start + batch_size]
+            params: List[object] = []
+            for update in chunk:
+                params += [
+                    update.message_sid,
+                    update.account_sid,
+                    update.status,
+                    update.rank,
+                    update.error_code,
+                    connection.ops.adapt_datetimefield_value(update.received_at),
+                ]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([row] * len(chunk))} "
+                f"ON CONFLICT ({connection.ops.quote_name('message_sid')}) DO UPDATE SET {assignments} "
+                f"WHERE {table}.{rank} <= EXCLUDED.{rank}",
+                params,
+            )
+
+
+_buffer: Optional[DeliveryStatusBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_delivery_buffer() -> DeliveryStatusBuffer:
+    """Return the process-wide buffer configured by ``TWILIO_STATUS_CALLBACKS``
+
+    ``TWILIO_STATUS_CALLBACKS`` is an optional dict with ``batch_size`` and
+    ``flush_interval`` (seconds).
+
+    Raises:
+        ImproperlyConfigured: If ``TWILIO_STATUS_CALLBACKS`` is invalid
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                options = getattr(settings, "TWILIO_STATUS_CALLBACKS", None) or {}
+                try:
+                    _buffer = DeliveryStatusBuffer(**options)
+                except (TypeError, ValueError) as e:
+                    raise ImproperlyConfigured(f"Invalid TWILIO_STATUS_CALLBACKS: {e}") from e
+    return _buffer
+
+
+def reset_delivery_buffer() -> None:
+    """Flush and drop the process-wide buffer so it is rebuilt from settings"""
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.close()
+
+
+def _merge(pending: Dict[str, DeliveryUpdate], update: DeliveryUpdate) -> None:
+    current = pending.get(update.message_sid)
+    if current is None or update.rank >= current.rank:
+        pending[update.message_sid] = update
+
+
+atexit.register(reset_delivery_buffer)
@@ -0,0 +1,41 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from apps.twilio.services import get_twilio_config
+from libs.twilio.sms.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = "Send the SMS messages queued with send_sms(enqueue=True)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--account",
+            help="Named account of TWILIO_SMS_ACCOUNTS to send with (defaults to TWILIO_SMS_CONFIG)",
+        )
+        parser.add_argument(
+            "--consumer",
+            help="Consumer name within the outbox group (defaults to host-pid)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process a single batch without waiting for messages, then exit",
+        )
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(get_twilio_config(options["account"]), consumer=options["consumer"])
+        if options["once"]:
+            try:
+                sent = worker.process_batch(block=0)
+            finally:
+                worker.close()
+            self.stdout.write(f"Processed {sent} message(s)")
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        worker.run(stop)
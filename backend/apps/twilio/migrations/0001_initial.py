@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SMSDeliveryStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_sid', models.CharField(max_length=34, unique=True)),
+                ('account_sid', models.CharField(max_length=34)),
+                ('status', models.CharField(max_length=16)),
+                ('status_rank', models.PositiveSmallIntegerField()),
+                ('error_code', models.CharField(blank=True, default='', max_length=8)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'SMS delivery status',
+                'verbose_name_plural': 'SMS delivery statuses',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class SMSDeliveryStatus(models.Model):
+    """Latest delivery status Twilio reported for a sent message
+
+    Written in batches by ``apps.twilio.delivery`` from status callbacks.
+    ``status_rank`` orders the statuses along the message lifecycle so a late
+    ``sent`` callback never overwrites ``delivered``.
+    """
+
+    message_sid = models.CharField(max_length=34, unique=True)
+    account_sid = models.CharField(max_length=34)
+    status = models.CharField(max_length=16)
+    status_rank = models.PositiveSmallIntegerField()
+    error_code = models.CharField(max_length=8, blank=True, default="")
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "SMS delivery status"
+        verbose_name_plural = "SMS delivery statuses"
+
+    def __str__(self):
+        return f"{self.message_sid}: {self.status}"
@@ -0,0 +1,118 @@
+import threading
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from pydantic import ValidationError
+
+from libs.twilio.sms.client import TwilioClient, get_client, reset_clients
+from libs.twilio.sms.config import TwilioConfig
+from libs.twilio.sms.log import configure_logging
+
+DEFAULT_ACCOUNT = "default"
+
+_configs: Dict[str, TwilioConfig] = {}
+_lock = threading.Lock()
+
+
+def get_twilio_config(name: Optional[str] = None) -> TwilioConfig:
+    """Return the validated TwilioConfig of a configured account
+
+    Configs are built from settings once and cached until the Twilio
+    settings change, so request handlers never pay for pydantic validation.
+    The default account comes from ``TWILIO_SMS_CONFIG``, a dict of
+    ``TwilioConfig`` fields; more accounts (e.g. one per realm) can be named
+    in ``TWILIO_SMS_ACCOUNTS``::
+
+        TWILIO_SMS_CONFIG = {"account_sid": "AC...", "auth_token": "...", "from_number": "+1..."}
+        TWILIO_SMS_ACCOUNTS = {"partners": {"account_sid": "AC...", ...}}
+
+    Args:
+        name: Account name, the default account when omitted
+
+    Returns:
+        Shared TwilioConfig instance
+
+    Raises:
+        ImproperlyConfigured: If the account is unknown or its settings are invalid
+    """
+    name = name or DEFAULT_ACCOUNT
+    config = _configs.get(name)
+    if config is None:
+        with _lock:
+            config = _configs.get(name)
+            if config is None:
+                config = _configs[name] = _build_config(name)
+    return config
+
+
+def get_twilio_client(name: Optional[str] = None) -> TwilioClient:
+    """Return the pooled TwilioClient of a configured account
+
+    Args:
+        name: Account name, the default account when omitted
+
+    Clients are kept by the library's ``get_client``, which shares one per
+    config and drops them in forked workers.
+
+    Returns:
+        Shared TwilioClient instance
+    """
+    return get_client(get_twilio_config(name))
+
+
+def find_twilio_config(account_sid: str) -> Optional[TwilioConfig]:
+    """Return the config of the configured account with this SID, if any
+
+    Used to pick the auth token signing a webhook from its ``AccountSid``.
+    Accounts left without a SID or auth token never match: an empty token
+    would accept signatures anyone can compute.
+    """
+    if not account_sid:
+        return None
+    for name in _account_settings():
+        config = get_twilio_config(name)
+        if config.account_sid == account_sid and config.auth_token:
+            return config
+    return None
+
+
+def load_twilio_configs() -> None:
+    """Validate every configured account, failing fast on bad settings"""
+    for name in _account_settings():
+        get_twilio_config(name)
+
+
+def configure_twilio_logging() -> None:
+    """Apply ``TWILIO_SMS_LOGGING`` (``level``, ``success_sample_rate``) to the library"""
+    try:
+        configure_logging(**(getattr(settings, "TWILIO_SMS_LOGGING", None) or {}))
+    except (TypeError, ValueError) as e:
+        raise ImproperlyConfigured(f"Invalid TWILIO_SMS_LOGGING: {e}") from e
+
+
+def clear_twilio_configs() -> None:
+    """Forget cached configs and clients so they are rebuilt from settings"""
+    with _lock:
+        _configs.clear()
+    reset_clients()
+
+
+def _account_settings() -> Dict[str, dict]:
+    """Map every account name to its settings dict"""
+    accounts = dict(getattr(settings, "TWILIO_SMS_ACCOUNTS", None) or {})
+    default = getattr(settings, "TWILIO_SMS_CONFIG", None)
+    if default:
+        accounts[DEFAULT_ACCOUNT] = default
+    return accounts
+
+
+def _build_config(name: str) -> TwilioConfig:
+    try:
+        fields = _account_settings()[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown Twilio account '{name}'") from None
+    try:
+        return TwilioConfig(**fields)
+    except ValidationError as e:
+        raise ImproperlyConfigured(f"Invalid settings for Twilio account '{name}': {e}") from e
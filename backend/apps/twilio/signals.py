@@ -0,0 +1,18 @@
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from apps.twilio.delivery import reset_delivery_buffer
+from apps.twilio.services import clear_twilio_configs, configure_twilio_logging
+
+TWILIO_SETTINGS = {"TWILIO_SMS_CONFIG", "TWILIO_SMS_ACCOUNTS"}
+
+
+@receiver(setting_changed)
+def reload_twilio_configs(setting, **kwargs):
+    """Rebuild Twilio configs, logging and buffers when their settings change (override_settings, reloads)"""
+    if setting in TWILIO_SETTINGS:
+        clear_twilio_configs()
+    elif setting == "TWILIO_SMS_LOGGING":
+        configure_twilio_logging()
+    elif setting == "TWILIO_STATUS_CALLBACKS":
+        reset_delivery_buffer()
@@ -0,0 +1,17 @@
+import pytest
+
+from libs.twilio.sms.storage import reset_redis_state
+
+
+@pytest.fixture(autouse=True)
+def reset_twilio_clients():
+    """Make sure no cached config, pooled client, buffer or Redis state leaks between tests"""
+    from apps.twilio.delivery import reset_delivery_buffer
+    from apps.twilio.services import clear_twilio_configs
+
+    clear_twilio_configs()
+    reset_redis_state()
+    yield
+    reset_delivery_buffer()
+    clear_twilio_configs()
+    reset_redis_state()
@@ -0,0 +1,29 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from apps.twilio.services import get_twilio_config
+
+
+def test_outbox_worker_once():
+    """Test that --once processes one batch and releases the worker"""
+    out = StringIO()
+    with patch('apps.twilio.management.commands.twilio_outbox_worker.OutboxWorker') as mock_worker:
+        mock_worker.return_value.process_batch.return_value = 3
+        call_command("twilio_outbox_worker", "--once", "--consumer", "worker-1", stdout=out)
+
+    mock_worker.assert_called_once_with(get_twilio_config(), consumer="worker-1")
+    mock_worker.return_value.process_batch.assert_called_once_with(block=0)
+    mock_worker.return_value.close.assert_called_once()
+    assert "Processed 3 message(s)" in out.getvalue()
+
+
+def test_outbox_worker_runs_until_stopped():
+    """Test that the worker loop is started with a stop event"""
+    with patch('apps.twilio.management.commands.twilio_outbox_worker.OutboxWorker') as mock_worker, \
+            patch('apps.twilio.management.commands.twilio_outbox_worker.signal.signal'):
+        call_command("twilio_outbox_worker")
+
+    stop = mock_worker.return_value.run.call_args.args[0]
+    assert not stop.is_set()
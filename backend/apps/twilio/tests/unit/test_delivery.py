@@ -0,0 +1,141 @@
+from dataclasses import replace
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.twilio.delivery import (
+    MAX_PENDING_BATCHES, DeliveryStatusBuffer, DeliveryUpdate, get_delivery_buffer, write_delivery_statuses,
+)
+from apps.twilio.models import SMSDeliveryStatus
+
+ACCOUNT = "AC123456789"
+
+
+def _update(sid, status, error_code=""):
+    return DeliveryUpdate(
+        message_sid=sid, account_sid=ACCOUNT, status=status, error_code=error_code, received_at=timezone.now()
+    )
+
+
+def _statuses():
+    return dict(SMSDeliveryStatus.objects.values_list("message_sid", "status"))
+
+
+def test_from_callback():
+    """Test that callback form fields are mapped, and incomplete callbacks refused"""
+    update = DeliveryUpdate.from_callback(
+        {"MessageSid": "SM1", "MessageStatus": "undelivered", "AccountSid": ACCOUNT, "ErrorCode": "30003"}
+    )
+
+    assert (update.message_sid, update.status, update.error_code, update.rank) == ("SM1", "undelivered", "30003", 4)
+    with pytest.raises(ValueError):
+        DeliveryUpdate.from_callback({"MessageSid": "SM1"})
+
+
+def test_write_upserts_by_message_sid(db):
+    """Test that statuses are inserted, then updated in place"""
+    write_delivery_statuses([_update("SM1", "sent"), _update("SM2", "queued")])
+    write_delivery_statuses([_update("SM1", "delivered"), _update("SM3", "failed", "30005")])
+
+    assert _statuses() == {"SM1": "delivered", "SM2": "queued", "SM3": "failed"}
+    assert SMSDeliveryStatus.objects.get(message_sid="SM3").error_code == "30005"
+
+
+def test_write_never_moves_a_message_back(db):
+    """Test that a late callback of an earlier status does not overwrite a later one"""
+    write_delivery_statuses([_update("SM1", "delivered")])
+    write_delivery_statuses([_update("SM1", "sent")])
+
+    assert _statuses() == {"SM1": "delivered"}
+
+
+def test_write_chunks_by_batch_size(db):
+    """Test that large writes are split into several statements"""
+    with CaptureQueriesContext(connection) as queries:
+        write_delivery_statuses([_update(f"SM{i}", "sent") for i in range(25)], batch_size=10)
+
+    assert len(queries) == 3
+    assert SMSDeliveryStatus.objects.count() == 25
+
+
+def test_buffer_keeps_the_latest_status(db):
+    """Test that a batch holds one row per message, the most advanced status winning"""
+    buffer = DeliveryStatusBuffer(batch_size=10)
+    with patch.object(buffer, "_ensure_flusher"):
+        buffer.add(_update("SM1", "sent"))
+        buffer.add(_update("SM1", "delivered"))
+        buffer.add(_update("SM1", "sending"))
+        buffer.add(_update("SM2", "queued"))
+
+    assert buffer.pending() == 2
+    assert buffer.flush() == 2
+    assert buffer.pending() == 0
+    assert _statuses() == {"SM1": "delivered", "SM2": "queued"}
+
+
+def test_buffer_wakes_the_flusher_when_full():
+    """Test that a full batch triggers a flush without waiting for the interval"""
+    buffer = DeliveryStatusBuffer(batch_size=2, flush_interval=60)
+    with patch("apps.twilio.delivery.write_delivery_statuses") as write:
+        buffer.add(_update("SM1", "sent"))
+        buffer.add(_update("SM2", "sent"))
+        for _ in range(100):
+            if write.called:
+                break
+            buffer._thread.join(0.01)
+        buffer.close()
+
+    assert write.call_count == 1
+    assert {update.message_sid for update in write.call_args.args[0]} == {"SM1", "SM2"}
+
+
+def test_buffer_requeues_failed_batches():
+    """Test that a failed flush keeps the statuses for the next one, within the cap"""
+    buffer = DeliveryStatusBuffer(batch_size=1)
+    with patch.object(buffer, "_ensure_flusher"):
+        for i in range(MAX_PENDING_BATCHES + 5):
+            buffer.add(_update(f"SM{i}", "sent"))
+
+    with patch("apps.twilio.delivery.write_delivery_statuses", side_effect=Exception("db down")):
+        assert buffer.flush() == 0
+
+    assert buffer.pending() == MAX_PENDING_BATCHES
+
+
+def test_buffer_validation():
+    """Test that nonsensical batching options are refused"""
+    with pytest.raises(ValueError):
+        DeliveryStatusBuffer(batch_size=0)
+    with pytest.raises(ValueError):
+        DeliveryStatusBuffer(flush_interval=0)
+
+
+@override_settings(TWILIO_STATUS_CALLBACKS={"batch_size": 50, "flush_interval": 0.5})
+def test_get_delivery_buffer_reads_settings():
+    """Test that the shared buffer follows TWILIO_STATUS_CALLBACKS"""
+    buffer = get_delivery_buffer()
+
+    assert buffer is get_delivery_buffer()
+    assert (buffer.batch_size, buffer.flush_interval) == (50, 0.5)
+
+
+@override_settings(TWILIO_STATUS_CALLBACKS={"batch_size": 0})
+def test_get_delivery_buffer_invalid_settings():
+    """Test that bad TWILIO_STATUS_CALLBACKS raise ImproperlyConfigured"""
+    with pytest.raises(ImproperlyConfigured):
+        get_delivery_buffer()
+
+
+def test_received_at_is_the_update_time(db):
+    """Test that updated_at records when the callback arrived, not when it was flushed"""
+    update = replace(_update("SM1", "sent"), received_at=timezone.now() - timedelta(minutes=5))
+
+    write_delivery_statuses([update])
+
+    assert SMSDeliveryStatus.objects.get().updated_at == update.received_at
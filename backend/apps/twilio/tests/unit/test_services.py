@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from apps.twilio.services import get_twilio_client, get_twilio_config, load_twilio_configs
+
+PARTNER_ACCOUNT = {
+    "account_sid": "AC987654321",
+    "auth_token": "auth_token_456",
+    "from_number": "+1987654321",
+}
+
+
+def test_get_twilio_config_reads_settings():
+    """Test that the default account is built from TWILIO_SMS_CONFIG"""
+    config = get_twilio_config()
+
+    assert config.account_sid == "AC123456789"
+    assert config.from_number == "+1234567890"
+
+
+def test_get_twilio_config_is_cached():
+    """Test that settings are validated once, not on every call"""
+    get_twilio_config()
+    with patch('apps.twilio.services.TwilioConfig') as mock_config:
+        assert get_twilio_config() is get_twilio_config()
+
+    mock_config.assert_not_called()
+
+
+@override_settings(TWILIO_SMS_ACCOUNTS={"partners": PARTNER_ACCOUNT})
+def test_named_accounts():
+    """Test that named accounts get their own config and client"""
+    partners = get_twilio_config("partners")
+
+    assert partners.account_sid == "AC987654321"
+    assert get_twilio_config().account_sid == "AC123456789"
+    with patch('libs.twilio.sms.client.twilio.rest.Client'):
+        assert get_twilio_client("partners") is get_twilio_client("partners")
+        assert get_twilio_client("partners") is not get_twilio_client()
+
+
+def test_unknown_account():
+    """Test that unknown account names are reported as misconfiguration"""
+    with pytest.raises(ImproperlyConfigured):
+        get_twilio_config("missing")
+
+
+def test_settings_change_invalidates_cache():
+    """Test that changed settings are picked up"""
+    before = get_twilio_config()
+
+    with override_settings(TWILIO_SMS_CONFIG={**PARTNER_ACCOUNT}):
+        assert get_twilio_config().account_sid == "AC987654321"
+
+    assert get_twilio_config() == before
+    assert get_twilio_config() is not before
+
+
+@override_settings(TWILIO_SMS_ACCOUNTS={"broken": {**PARTNER_ACCOUNT, "from_number": "1987654321"}})
+def test_load_twilio_configs_fails_fast():
+    """Test that invalid settings are rejected when configs are loaded"""
+    with pytest.raises(ImproperlyConfigured, match="broken"):
+        load_twilio_configs()
+
+
+def test_logging_settings_are_applied():
+    """Test that TWILIO_SMS_LOGGING configures the library logging policy"""
+    with patch('apps.twilio.services.configure_logging') as configure_logging:
+        with override_settings(TWILIO_SMS_LOGGING={"level": "WARNING", "success_sample_rate": 0.1}):
+            configure_logging.assert_called_with(level="WARNING", success_sample_rate=0.1)
+
+
+def test_invalid_logging_settings():
+    """Test that a bad TWILIO_SMS_LOGGING is reported as ImproperlyConfigured"""
+    with pytest.raises(ImproperlyConfigured):
+        with override_settings(TWILIO_SMS_LOGGING={"level": "LOUD"}):
+            pass
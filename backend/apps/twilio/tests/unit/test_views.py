@@ -0,0 +1,127 @@
+from unittest.mock import patch
+
+import pytest
+from django.test import RequestFactory, override_settings
+from twilio.request_validator import RequestValidator
+
+from apps.twilio.views import metrics_view, status_callback_view
+
+CALLBACK_URL = "https://auth.example.com/twilio/status-callback"
+CALLBACK = {"AccountSid": "AC123456789", "MessageSid": "SM1", "MessageStatus": "delivered"}
+
+
+@pytest.fixture
+def rf():
+    return RequestFactory()
+
+
+@override_settings(METRICS_TOKEN=None, DEBUG=True)
+def test_metrics_view_renders_metrics(rf):
+    """Test that /metrics serves the Prometheus exposition of the library"""
+    with patch('apps.twilio.views.metrics.collect', return_value=(b"twilio_requests_total 1\n", "text/plain")):
+        response = metrics_view(rf.get("/metrics"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/plain"
+    assert response.content == b"twilio_requests_total 1\n"
+
+
+@override_settings(METRICS_TOKEN="s3cret")
+def test_metrics_view_requires_the_token(rf):
+    """Test that a configured METRICS_TOKEN must be sent as a bearer token"""
+    with patch('apps.twilio.views.metrics.collect', return_value=(b"", "text/plain")):
+        assert metrics_view(rf.get("/metrics")).status_code == 401
+        assert metrics_view(rf.get("/metrics", HTTP_AUTHORIZATION="Bearer nope")).status_code == 401
+        assert metrics_view(rf.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")).status_code == 200
+
+
+@override_settings(METRICS_TOKEN=None, DEBUG=False)
+def test_metrics_view_is_closed_without_a_token(rf):
+    """Test that /metrics is refused outside DEBUG when no METRICS_TOKEN is configured"""
+    with patch('apps.twilio.views.metrics.collect', return_value=(b"", "text/plain")) as collect:
+        assert metrics_view(rf.get("/metrics")).status_code == 403
+
+    collect.assert_not_called()
+
+
+@override_settings(METRICS_TOKEN="s3cret")
+def test_metrics_view_without_prometheus_client(rf):
+    """Test that the endpoint reports a missing prometheus_client instead of failing"""
+    with patch('apps.twilio.views.metrics.enabled', return_value=False):
+        assert metrics_view(rf.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")).status_code == 501
+
+
+def test_metrics_view_only_answers_get(rf):
+    """Test that other methods are refused"""
+    assert metrics_view(rf.post("/metrics")).status_code == 405
+
+
+def _signed(rf, params, url="http://testserver/twilio/status-callback", token="auth_token_123"):
+    signature = RequestValidator(token).compute_signature(url, params)
+    return rf.post("/twilio/status-callback", params, HTTP_X_TWILIO_SIGNATURE=signature)
+
+
+def test_status_callback_is_buffered(rf):
+    """Test that a signed callback is handed to the delivery buffer"""
+    with patch('apps.twilio.views.get_delivery_buffer') as buffer:
+        response = status_callback_view(_signed(rf, CALLBACK))
+
+    assert response.status_code == 204
+    update = buffer.return_value.add.call_args.args[0]
+    assert (update.message_sid, update.status) == ("SM1", "delivered")
+
+
+@override_settings(TWILIO_SMS_CONFIG={
+    "account_sid": "AC123456789", "auth_token": "auth_token_123", "from_number": "+1234567890",
+    "status_callback": CALLBACK_URL,
+})
+def test_status_callback_signature_uses_the_configured_url(rf):
+    """Test that signatures are checked against config.status_callback, as Twilio signs it"""
+    with patch('apps.twilio.views.get_delivery_buffer'):
+        assert status_callback_view(_signed(rf, CALLBACK, url=CALLBACK_URL)).status_code == 204
+        assert status_callback_view(_signed(rf, CALLBACK)).status_code == 403
+
+
+def test_status_callback_rejects_bad_signatures(rf):
+    """Test that unsigned, badly signed or unknown-account callbacks are refused"""
+    with patch('apps.twilio.views.get_delivery_buffer') as buffer:
+        assert status_callback_view(rf.post("/twilio/status-callback", CALLBACK)).status_code == 403
+        assert status_callback_view(_signed(rf, CALLBACK, token="wrong")).status_code == 403
+        assert status_callback_view(_signed(rf, {**CALLBACK, "AccountSid": "ACother"})).status_code == 403
+
+    buffer.return_value.add.assert_not_called()
+
+
+@override_settings(TWILIO_SMS_CONFIG={"account_sid": "", "auth_token": "", "from_number": "+1234567890"})
+def test_status_callback_refuses_unconfigured_accounts(rf):
+    """Test that a missing AccountSid or an empty auth token never validates a signature"""
+    no_account = {k: v for k, v in CALLBACK.items() if k != "AccountSid"}
+    with patch('apps.twilio.views.get_delivery_buffer') as buffer:
+        assert status_callback_view(_signed(rf, no_account, token="")).status_code == 403
+        assert status_callback_view(_signed(rf, {**no_account, "AccountSid": ""}, token="")).status_code == 403
+
+    buffer.return_value.add.assert_not_called()
+
+
+@override_settings(TWILIO_SMS_ACCOUNTS={
+    "partners": {"account_sid": "ACpartners", "auth_token": "", "from_number": "+1234567890"},
+})
+def test_status_callback_refuses_accounts_without_a_token(rf):
+    """Test that an account configured without an auth token cannot sign callbacks"""
+    params = {**CALLBACK, "AccountSid": "ACpartners"}
+    with patch('apps.twilio.views.get_delivery_buffer') as buffer:
+        assert status_callback_view(_signed(rf, params, token="")).status_code == 403
+
+    buffer.return_value.add.assert_not_called()
+
+
+def test_status_callback_requires_a_status(rf):
+    """Test that signed but incomplete callbacks are answered with 400"""
+    params = {"AccountSid": "AC123456789", "MessageSid": "SM1"}
+    assert status_callback_view(_signed(rf, params)).status_code == 400
+
+
+def test_status_callback_is_not_atomic():
+    """Test that the webhook opts out of ATOMIC_REQUESTS and CSRF"""
+    assert status_callback_view._non_atomic_requests == {"default"}
+    assert status_callback_view.csrf_exempt is True
@@ -0,0 +1,62 @@
+import hmac
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from twilio.request_validator import RequestValidator
+
+from apps.twilio.delivery import DeliveryUpdate, get_delivery_buffer
+from apps.twilio.services import find_twilio_config
+from libs.twilio.sms import metrics
+
+
+@require_GET
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Prometheus scrape endpoint, aggregating every gunicorn worker
+
+    Scrapers must send ``METRICS_TOKEN`` as a bearer token. Without a
+    token configured the endpoint is closed, unless ``DEBUG`` is on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse("METRICS_TOKEN is not set", status=403)
+    elif not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    if not metrics.enabled():
+        return HttpResponse("prometheus_client is not installed", status=501)
+    payload, content_type = metrics.collect()
+    return HttpResponse(payload, content_type=content_type)
+
+
+@transaction.non_atomic_requests
+@csrf_exempt
+@require_POST
+def status_callback_view(request: HttpRequest) -> HttpResponse:
+    """Receive Twilio message status callbacks
+
+    The ``X-Twilio-Signature`` header is checked with the auth token of the
+    account named by ``AccountSid``, against the ``status_callback`` URL of
+    its config (the request URL when unset). Valid callbacks are buffered and
+    written in batches by ``apps.twilio.delivery``; the view never touches the
+    database, hence no per-request transaction under ``ATOMIC_REQUESTS``.
+    """
+    params = request.POST.dict()
+    account_sid = params.get("AccountSid", "")
+    if not account_sid:
+        return HttpResponse(status=403)
+    config = find_twilio_config(account_sid)
+    if config is None:
+        return HttpResponse(status=403)
+    url = config.status_callback or request.build_absolute_uri()
+    signature = request.headers.get("X-Twilio-Signature", "")
+    if not RequestValidator(config.auth_token).validate(url, params, signature):
+        return HttpResponse(status=403)
+    try:
+        update = DeliveryUpdate.from_callback(params)
+    except ValueError as e:
+        return HttpResponse(str(e), status=400)
+    get_delivery_buffer().add(update)
+    return HttpResponse(status=204)
@@ -0,0 +1,18 @@
+"""Gunicorn hooks, loaded from the working directory by default (see Dockerfile CMD)"""
+import os
+import shutil
+
+
+def on_starting(server):
+    """Start with an empty Prometheus multiprocess directory"""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop the in-flight gauges of a worker that exited"""
+    from libs.twilio.sms.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
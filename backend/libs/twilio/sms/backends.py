@@ -0,0 +1,310 @@
+import hashlib
+import hmac
+import secrets
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Any
+
+from .client import get_async_client, get_client
+from .config import LocalOTPPolicy, TwilioConfig
+from .exceptions import (
+    OTPUnavailableError, TokenExpiredError, TwilioAPIError, TwilioError, UnsupportedChannelError,
+    VerificationFailedError,
+)
+from .hedge import get_check_hedger
+from .log import get_logger
+from .providers import get_sms_provider
+from .storage import get_redis, mark_redis_down
+from .types import VerificationChannel, VerificationResult, VerificationStatus
+
+logger = get_logger()
+
+
+class VerificationBackend(ABC):
+    """Engine behind ``start_verification`` and ``check_verification``
+
+    The verifier validates and normalizes numbers before calling a backend,
+    and applies deduplication and the check guard around it.
+    """
+
+    @abstractmethod
+    def start(self, phone_number: str, channel: VerificationChannel) -> VerificationResult:
+        """Send a code to ``phone_number``, errors turned into a failed result"""
+
+    @abstractmethod
+    def check(self, phone_number: str, code: str) -> VerificationStatus:
+        """Check a code sent to ``phone_number``"""
+
+    @abstractmethod
+    async def async_start(self, phone_number: str, channel: VerificationChannel) -> VerificationResult:
+        """Async counterpart of ``start``"""
+
+    @abstractmethod
+    async def async_check(self, phone_number: str, code: str) -> VerificationStatus:
+        """Async counterpart of ``check``"""
+
+
+class TwilioVerifyBackend(VerificationBackend):
+    """Codes sent and checked by the Twilio Verify service ``config.service_sid``
+
+    Raises:
+        ValueError: If the config has no service SID
+    """
+
+    def __init__(self, config: TwilioConfig):
+        if not config.service_sid:
+            logger.error("Missing service SID in config", account_sid=config.account_sid)
+            raise ValueError("Service SID is required for verification")
+        self.config = config
+        self.service_sid: str = config.service_sid
+
+    def start(self, phone_number: str, channel: VerificationChannel) -> VerificationResult:
+        config = self.config
+        try:
+            logger.debug("Fetching shared Twilio client", account_sid=config.account_sid)
+            client = get_client(config)
+
+            logger.debug("Creating verification via Twilio API", to=phone_number, channel=channel.value)
+            verification = client.create_verification(
+                self.service_sid, phone_number, channel.value
+            )
+
+            # Map status to enum
+            status = _map_verification_status(verification["status"])
+            logger.sampled("Verification started", phone_number=phone_number, status=verification["status"])
+
+            # Return result
+            return VerificationResult(
+                success=True,
+                to=phone_number,
+                status=status
+            )
+
+        except TwilioError as e:
+            # Handle domain-specific errors
+            logger.error("Error starting verification", phone_number=phone_number, error=str(e),
+                         code=getattr(e, 'code', None))  # pragma: no cover
+            return _failed(phone_number, e)  # pragma: no cover
+
+        except Exception as e:
+            # Handle unexpected errors
+            logger.error("Unexpected error starting verification", phone_number=phone_number,
+                         error=str(e))  # pragma: no cover
+            return _failed(phone_number, TwilioAPIError(str(e), "UNKNOWN"))
+
+    def check(self, phone_number: str, code: str) -> VerificationStatus:
+        config = self.config
+        try:
+            logger.debug("Fetching shared Twilio client for verification check", account_sid=config.account_sid)
+            client = get_client(config)
+
+            logger.debug("Checking verification via Twilio API", to=phone_number)
+            hedger = get_check_hedger(config)
+            create = partial(client.create_verification_check, self.service_sid, phone_number, code)
+            verification_check = hedger.call(create) if hedger else create()
+
+            # Map status to enum and return
+            logger.sampled("Verification checked", phone_number=phone_number, status=verification_check["status"])
+            return _map_verification_status(verification_check["status"])
+
+        except Exception as e:
+            # Handle errors
+            logger.error("Error checking verification", phone_number=phone_number, error=str(e))  # pragma: no cover
+            raise TwilioAPIError(str(e), "VERIFICATION_CHECK_ERROR")  # pragma: no cover
+
+    async def async_start(self, phone_number: str, channel: VerificationChannel) -> VerificationResult:
+        config = self.config
+        try:
+            client = get_async_client(config)
+            verification = await client.create_verification(
+                self.service_sid, phone_number, channel.value
+            )
+            logger.sampled("Verification started", phone_number=phone_number, status=verification["status"])
+            return VerificationResult(
+                success=True,
+                to=phone_number,
+                status=_map_verification_status(verification["status"])
+            )
+
+        except Exception as e:
+            logger.error("Error starting verification", phone_number=phone_number, error=str(e))
+            return _failed(phone_number, e if isinstance(e, TwilioError) else TwilioAPIError(str(e), "UNKNOWN"))
+
+    async def async_check(self, phone_number: str, code: str) -> VerificationStatus:
+        config = self.config
+        try:
+            client = get_async_client(config)
+            hedger = get_check_hedger(config)
+            create = partial(client.create_verification_check, self.service_sid, phone_number, code)
+            verification_check = await (hedger.async_call(create) if hedger else create())
+            logger.sampled("Verification checked", phone_number=phone_number, status=verification_check["status"])
+            return _map_verification_status(verification_check["status"])
+
+        except Exception as e:
+            logger.error("Error checking verification", phone_number=phone_number, error=str(e))
+            raise TwilioAPIError(str(e), "VERIFICATION_CHECK_ERROR")
+
+
+class LocalOTPBackend(VerificationBackend):
+    """Codes generated here, sent as plain SMS and checked against Redis
+
+    Each start draws a code from an HMAC of a random nonce (HOTP-style
+    truncation), sends it as an SMS through ``get_sms_provider`` and stores
+    ``HMAC(secret, phone:code)`` in the ``<prefix>:<account>:<phone hash>``
+    Redis hash for ``policy.ttl`` seconds. Checking a code is one pipelined
+    Redis round trip and a constant-time comparison. Attempts are counted
+    per number and survive resends, so asking for a new code does not grant
+    new guesses. Only the SMS channel is supported.
+
+    Raises:
+        ValueError: If the config has no ``local_otp`` policy
+    """
+
+    def __init__(self, config: TwilioConfig):
+        if config.local_otp is None:
+            raise ValueError("local_otp is required for local verification codes")
+        self.config = config
+        self.policy: LocalOTPPolicy = config.local_otp
+        self._secret = (self.policy.secret or config.auth_token).encode()
+
+    def start(self, phone_number: str, channel: VerificationChannel) -> VerificationResult:
+        if channel != VerificationChannel.SMS:
+            return _failed(phone_number, UnsupportedChannelError(channel.value))
+        code = self._issue(phone_number)
+        try:
+            get_sms_provider(self.config).send(phone_number, self.policy.message.format(code=code))
+        except TwilioError as e:
+            logger.error("Error sending verification code", phone_number=phone_number, error=str(e))
+            return _failed(phone_number, e)
+        logger.sampled("Verification started", phone_number=phone_number, status="pending", backend="local")
+        return VerificationResult(success=True, to=phone_number, status=VerificationStatus.PENDING)
+
+    def check(self, phone_number: str, code: str) -> VerificationStatus:
+        """Check a code locally
+
+        Returns:
+            APPROVED for the right code, PENDING for a wrong one
+
+        Raises:
+            TokenExpiredError: If no code is pending for the number
+            VerificationFailedError: If the number used up its attempts
+            OTPUnavailableError: If Redis cannot be reached
+        """
+        key = self._key(phone_number)
+        redis = self._redis()
+        try:
+            pipe = redis.pipeline()
+            pipe.hget(key, "digest")
+            pipe.hincrby(key, "attempts", 1)
+            digest, attempts = pipe.execute()
+            if digest is None:
+                redis.delete(key)  # drop the hash the HINCRBY just created
+            elif attempts <= self.policy.max_attempts and hmac.compare_digest(
+                _str(digest), self._digest(phone_number, code)
+            ):
+                redis.delete(key)
+                logger.sampled("Verification checked", phone_number=phone_number, status="approved", backend="local")
+                return VerificationStatus.APPROVED
+        except Exception as e:
+            mark_redis_down(e)
+            raise OTPUnavailableError(str(e)) from e
+
+        if digest is None:
+            raise TokenExpiredError()
+        if attempts > self.policy.max_attempts:
+            logger.warn("Rejected check past max attempts", phone_number=phone_number, attempts=attempts)
+            raise VerificationFailedError("too many attempts")
+        logger.sampled("Verification checked", phone_number=phone_number, status="pending", backend="local")
+        return VerificationStatus.PENDING
+
+    async def async_start(self, phone_number: str, channel: VerificationChannel) -> VerificationResult:
+        if channel != VerificationChannel.SMS:
+            return _failed(phone_number, UnsupportedChannelError(channel.value))
+        code = self._issue(phone_number)
+        try:
+            await get_sms_provider(self.config).async_send(phone_number, self.policy.message.format(code=code))
+        except TwilioError as e:
+            logger.error("Error sending verification code", phone_number=phone_number, error=str(e))
+            return _failed(phone_number, e)
+        logger.sampled("Verification started", phone_number=phone_number, status="pending", backend="local")
+        return VerificationResult(success=True, to=phone_number, status=VerificationStatus.PENDING)
+
+    async def async_check(self, phone_number: str, code: str) -> VerificationStatus:
+        # A local Redis round trip; not worth a thread hop
+        return self.check(phone_number, code)
+
+    def _issue(self, phone_number: str) -> str:
+        """Generate a code for ``phone_number`` and store its hash, keeping the attempt count"""
+        code = self._generate()
+        key = self._key(phone_number)
+        redis = self._redis()
+        try:
+            pipe = redis.pipeline()
+            pipe.hset(key, mapping={"digest": self._digest(phone_number, code)})
+            pipe.hincrby(key, "attempts", 0)
+            pipe.pexpire(key, int(self.policy.ttl * 1000))
+            pipe.execute()
+        except Exception as e:
+            mark_redis_down(e)
+            raise OTPUnavailableError(str(e)) from e
+        return code
+
+    def _generate(self) -> str:
+        """Draw a code by dynamic truncation of HMAC(secret, random nonce), as in RFC 4226"""
+        mac = hmac.new(self._secret, secrets.token_bytes(16), hashlib.sha256).digest()
+        offset = mac[-1] & 0x0F
+        value = int.from_bytes(mac[offset:offset + 4], "big") & 0x7FFFFFFF
+        return str(value % 10 ** self.policy.code_length).zfill(self.policy.code_length)
+
+    def _digest(self, phone_number: str, code: str) -> str:
+        return hmac.new(self._secret, f"{phone_number}:{code}".encode(), hashlib.sha256).hexdigest()
+
+    def _key(self, phone_number: str) -> str:
+        # Hashed so phone numbers do not end up in Redis key names
+        digest = hashlib.sha256(phone_number.encode()).hexdigest()[:32]
+        return f"{self.policy.key_prefix}:{self.config.account_sid}:{digest}"
+
+    def _redis(self) -> Any:
+        redis = get_redis()
+        if redis is None:
+            raise OTPUnavailableError("Redis is unavailable")
+        return redis
+
+
+def get_verification_backend(config: TwilioConfig) -> VerificationBackend:
+    """Return the backend verifying numbers for ``config``
+
+    ``LocalOTPBackend`` when ``config.local_otp`` is set, Twilio Verify
+    otherwise.
+
+    Raises:
+        ValueError: If Twilio Verify is used without a service SID
+    """
+    if config.local_otp is not None:
+        return LocalOTPBackend(config)
+    return TwilioVerifyBackend(config)
+
+
+def _failed(phone_number: str, error: TwilioError) -> VerificationResult:
+    return VerificationResult(
+        success=False,
+        to=phone_number,
+        status=VerificationStatus.FAILED,
+        error_code=error.code,
+        error_message=str(error)
+    )
+
+
+def _str(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _map_verification_status(status: str) -> VerificationStatus:
+    """Map Twilio status string to VerificationStatus enum"""
+    status_map = {
+        "pending": VerificationStatus.PENDING,
+        "approved": VerificationStatus.APPROVED,
+        "canceled": VerificationStatus.CANCELED,
+        "failed": VerificationStatus.FAILED
+    }
+    return status_map.get(status, VerificationStatus.FAILED)
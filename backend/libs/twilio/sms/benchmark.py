@@ -0,0 +1,245 @@
+"""Load-test harness for the SMS and Verify helpers
+
+Drives ``send_sms``, ``start_verification`` and ``check_verification`` at a
+given concurrency and reports throughput and latency percentiles. By default
+it runs against a local ``FakeTwilioServer``, so pooling, retry or rate
+limiting changes can be measured offline::
+
+    python -m libs.twilio.sms.benchmark --requests 2000 --concurrency 16 --latency 0.05
+    python -m libs.twilio.sms.benchmark --operation send_sms --error-rate 0.05
+    python -m libs.twilio.sms.benchmark --log-overhead
+"""
+import argparse
+import logging
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import structlog
+from pydantic import BaseModel, Field
+
+from . import log
+from .config import RetryPolicy, TwilioConfig
+from .exceptions import TwilioError
+from .fake_server import FakeTwilioServer
+from .sender import send_sms
+from .types import VerificationStatus
+from .verifier import check_verification, start_verification
+
+BENCHMARK_PHONE = "+14155552671"
+
+
+class BenchmarkReport(BaseModel):
+    """Outcome of one benchmark run"""
+    operation: str = Field(..., description="Library function exercised")
+    requests: int = Field(..., description="Number of calls made")
+    concurrency: int = Field(..., description="Calls made in parallel")
+    succeeded: int = Field(..., description="Calls that succeeded")
+    failed: int = Field(..., description="Calls that failed")
+    errors: Dict[str, int] = Field(default_factory=dict, description="Failures by error code")
+    elapsed_seconds: float = Field(..., description="Wall time of the run")
+    throughput: float = Field(..., description="Calls per second")
+    latency_p50: float = Field(..., description="Median latency (ms)")
+    latency_p90: float = Field(..., description="90th percentile latency (ms)")
+    latency_p99: float = Field(..., description="99th percentile latency (ms)")
+    latency_max: float = Field(..., description="Slowest call (ms)")
+
+
+def _send_sms(config: TwilioConfig) -> Optional[str]:
+    result = send_sms(config, BENCHMARK_PHONE, "Benchmark message")
+    return None if result.success else result.error_code
+
+
+def _start_verification(config: TwilioConfig) -> Optional[str]:
+    result = start_verification(config, BENCHMARK_PHONE)
+    return None if result.success else result.error_code
+
+
+def _check_verification(config: TwilioConfig) -> Optional[str]:
+    status = check_verification(config, BENCHMARK_PHONE, "123456")
+    return None if status == VerificationStatus.APPROVED else status.value
+
+
+# Each callable returns None on success or the error code of the failure
+OPERATIONS: Dict[str, Callable[[TwilioConfig], Optional[str]]] = {
+    "send_sms": _send_sms,
+    "start_verification": _start_verification,
+    "check_verification": _check_verification,
+}
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Return the nearest-rank percentile of ``values`` (0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_benchmark(
+    config: TwilioConfig,
+    operation: str = "send_sms",
+    requests: int = 100,
+    concurrency: int = 8
+) -> BenchmarkReport:
+    """Call one library operation ``requests`` times, ``concurrency`` at a time
+
+    Args:
+        config: TwilioConfig to send with (e.g. ``FakeTwilioServer.config()``)
+        operation: Key of ``OPERATIONS``
+        requests: Number of calls to make
+        concurrency: Number of calls made in parallel
+
+    Returns:
+        BenchmarkReport with throughput and latency percentiles
+    """
+    call = OPERATIONS[operation]
+
+    def timed(_: int) -> Tuple[float, Optional[str]]:
+        started_at = time.perf_counter()
+        try:
+            error = call(config)
+        except TwilioError as e:
+            error = e.code or type(e).__name__
+        return time.perf_counter() - started_at, error
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sms-benchmark") as executor:
+        results = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies: List[float] = [duration * 1000 for duration, _ in results]
+    errors = Counter(error for _, error in results if error is not None)
+    failed = sum(errors.values())
+    return BenchmarkReport(
+        operation=operation,
+        requests=requests,
+        concurrency=concurrency,
+        succeeded=requests - failed,
+        failed=failed,
+        errors=dict(errors),
+        elapsed_seconds=elapsed,
+        throughput=requests / elapsed if elapsed > 0 else float(requests),
+        latency_p50=percentile(latencies, 50),
+        latency_p90=percentile(latencies, 90),
+        latency_p99=percentile(latencies, 99),
+        latency_max=max(latencies, default=0.0),
+    )
+
+
+def format_report(report: BenchmarkReport) -> str:
+    """Render a report as one human-readable line"""
+    errors = ", ".join(f"{code}={count}" for code, count in sorted(report.errors.items())) or "none"
+    return (
+        f"{report.operation:<20} {report.requests} calls x{report.concurrency}: "
+        f"{report.throughput:.1f}/s, p50={report.latency_p50:.1f}ms p90={report.latency_p90:.1f}ms "
+        f"p99={report.latency_p99:.1f}ms max={report.latency_max:.1f}ms, "
+        f"{report.failed} failed (errors: {errors})"
+    )
+
+
+def measure_logging_overhead(iterations: int = 20000) -> Dict[str, float]:
+    """Time the library's logging, in microseconds per call
+
+    Events are rendered as JSON to ``os.devnull``, as a production structlog
+    setup would, without touching the application's structlog configuration.
+    ``send_sms events`` is the logging of one successful ``send_sms`` under the
+    default policy; ``send_sms events (unfiltered)`` is the same sequence
+    emitted straight through structlog, as before the policy existed.
+    """
+    with open(os.devnull, "w") as sink:
+        raw = structlog.wrap_logger(
+            structlog.PrintLogger(sink),
+            processors=[structlog.processors.add_log_level, structlog.processors.JSONRenderer()],
+        )
+        logger = log.TwilioLogger(raw)
+        sid = "SM" + "0" * 32
+
+        def send_sms_events() -> None:
+            logger.debug("Sending SMS", phone_number=BENCHMARK_PHONE, sender_id=None)
+            logger.debug("Fetching shared TwilioClient for SMS sending", account_sid="AC123")
+            logger.debug("Sending message via TwilioClient", to=BENCHMARK_PHONE, sender=BENCHMARK_PHONE)
+            logger.debug("Sending SMS", to=BENCHMARK_PHONE, sender=BENCHMARK_PHONE)
+            logger.debug("SMS sent successfully", to=BENCHMARK_PHONE, sid=sid)
+            logger.sampled("SMS sent successfully", phone_number=BENCHMARK_PHONE, sid=sid)
+
+        def unfiltered_send_sms_events() -> None:
+            raw.info("Sending SMS", phone_number=BENCHMARK_PHONE, sender_id=None)
+            raw.debug("Fetching shared TwilioClient for SMS sending", account_sid="AC123")
+            raw.debug("Sending message via TwilioClient", to=BENCHMARK_PHONE, sender=BENCHMARK_PHONE)
+            raw.info("Sending SMS", to=BENCHMARK_PHONE, sender=BENCHMARK_PHONE)
+            raw.debug("SMS sent successfully", to=BENCHMARK_PHONE, sid=sid)
+            raw.info("SMS sent successfully", phone_number=BENCHMARK_PHONE, sid=sid)
+
+        scenarios: Dict[str, Tuple[float, Callable[[], None]]] = {
+            "debug (filtered out)": (1.0, lambda: logger.debug("Sending SMS", phone_number=BENCHMARK_PHONE)),
+            "info (rendered)": (
+                1.0, lambda: logger.info("SMS sent successfully", phone_number=BENCHMARK_PHONE, sid=sid)
+            ),
+            "sampled at 1%": (
+                0.01, lambda: logger.sampled("SMS sent successfully", phone_number=BENCHMARK_PHONE, sid=sid)
+            ),
+            "send_sms events": (1.0, send_sms_events),
+            "send_sms events (unfiltered)": (1.0, unfiltered_send_sms_events),
+        }
+        level, rate = log._level, log._success_sample_rate
+        results = {}
+        try:
+            for name, (sample_rate, call) in scenarios.items():
+                log.configure_logging("INFO", sample_rate)
+                started_at = time.perf_counter()
+                for _ in range(iterations):
+                    call()
+                results[name] = (time.perf_counter() - started_at) / iterations * 1e6
+        finally:
+            log.configure_logging(level, rate)
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[BenchmarkReport]:
+    """Command-line entry point, see the module docstring"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operation", choices=[*OPERATIONS, "all"], default="all")
+    parser.add_argument("--requests", type=int, default=500, help="Calls per operation")
+    parser.add_argument("--concurrency", type=int, default=8, help="Calls made in parallel")
+    parser.add_argument("--pool-size", type=int, help="Connections kept per client (defaults to concurrency)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake server answer delay (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with an error")
+    parser.add_argument("--error-status", type=int, default=429, help="HTTP status of injected errors")
+    parser.add_argument("--error-code", type=int, default=20429, help="Twilio code of injected errors")
+    parser.add_argument("--retry-after", default="1", help="Retry-After header of injected errors")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Retry policy attempts per call")
+    parser.add_argument("--log-overhead", action="store_true", help="Time the library logging instead")
+    args = parser.parse_args(argv)
+
+    if args.log_overhead:
+        for name, micros in measure_logging_overhead().items():
+            print(f"{name:<30} {micros:.2f}us/call")
+        return []
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+    headers = {"Retry-After": args.retry_after} if args.retry_after else {}
+    operations = list(OPERATIONS) if args.operation == "all" else [args.operation]
+    reports = []
+    with FakeTwilioServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error=(args.error_status, args.error_code, headers),
+    ) as server:
+        config = server.config(
+            pool_size=args.pool_size or args.concurrency,
+            retry=RetryPolicy(max_attempts=args.max_attempts),
+        )
+        for operation in operations:
+            report = run_benchmark(config, operation, args.requests, args.concurrency)
+            print(format_report(report))
+            reports.append(report)
+    return reports
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
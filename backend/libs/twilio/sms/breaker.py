@@ -0,0 +1,203 @@
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from .config import CircuitBreakerPolicy
+from .exceptions import CircuitOpenError, RateLimitError, TwilioAPIError, TwilioError
+from .log import get_logger
+from .retry import TIMEOUT, is_retryable
+from .storage import get_redis, mark_redis_down
+
+logger = get_logger()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def counts_as_failure(error: TwilioError) -> bool:
+    """Tell whether an error means Twilio itself is degraded
+
+    Provider-side failures (5xx, connection errors, read timeouts) count;
+    rejections of our own input or throttling (``RateLimitError``) do not.
+    """
+    if isinstance(error, TwilioAPIError) and error.twilio_code == TIMEOUT:
+        return True
+    return is_retryable(error) and not isinstance(error, RateLimitError)
+
+
+class _LocalBreakerStore:
+    """In-process breaker state used when Redis is unreachable"""
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> Dict[str, float]:
+        return self._states.setdefault(
+            name, {"open_until": 0.0, "tripped": 0.0, "probes": 0.0,
+                   "window_start": 0.0, "calls": 0.0, "failures": 0.0}
+        )
+
+    def state(self, name: str) -> Tuple[str, float]:
+        with self._lock:
+            state = self._get(name)
+            remaining = state["open_until"] - time.monotonic()
+            if remaining > 0:
+                return OPEN, remaining
+            return (HALF_OPEN if state["tripped"] else CLOSED), 0.0
+
+    def acquire_probe(self, name: str, limit: int, ttl: float) -> bool:
+        with self._lock:
+            state = self._get(name)
+            state["probes"] += 1
+            return state["probes"] <= limit
+
+    def record(self, name: str, failed: bool, window: float) -> Tuple[int, int]:
+        now = time.monotonic()
+        with self._lock:
+            state = self._get(name)
+            if now - state["window_start"] >= window:
+                state.update(window_start=now, calls=0.0, failures=0.0)
+            state["calls"] += 1
+            state["failures"] += int(failed)
+            return int(state["calls"]), int(state["failures"])
+
+    def trip(self, name: str, open_duration: float) -> None:
+        with self._lock:
+            state = self._get(name)
+            state.update(open_until=time.monotonic() + open_duration, tripped=1.0,
+                         probes=0.0, calls=0.0, failures=0.0)
+
+    def close(self, name: str) -> None:
+        with self._lock:
+            self._states.pop(name, None)
+
+
+class _RedisBreakerStore:
+    """Breaker state shared by every worker through Redis
+
+    ``<name>:open`` exists while the circuit is open (its TTL is the open
+    duration), ``<name>:tripped`` marks a circuit that must be probed before
+    closing, and ``<name>:calls`` / ``<name>:failures`` count the current
+    window.
+    """
+
+    def __init__(self, redis: Any):
+        self.redis = redis
+
+    def state(self, name: str) -> Tuple[str, float]:
+        pipe = self.redis.pipeline()
+        pipe.pttl(f"{name}:open")
+        pipe.exists(f"{name}:tripped")
+        open_ttl, tripped = pipe.execute()
+        if open_ttl and open_ttl > 0:
+            return OPEN, open_ttl / 1000
+        return (HALF_OPEN if tripped else CLOSED), 0.0
+
+    def acquire_probe(self, name: str, limit: int, ttl: float) -> bool:
+        pipe = self.redis.pipeline()
+        pipe.incr(f"{name}:probes")
+        pipe.pexpire(f"{name}:probes", int(ttl * 1000))
+        probes, _ = pipe.execute()
+        return probes <= limit
+
+    def record(self, name: str, failed: bool, window: float) -> Tuple[int, int]:
+        pipe = self.redis.pipeline()
+        pipe.set(f"{name}:calls", 0, px=int(window * 1000), nx=True)
+        pipe.set(f"{name}:failures", 0, px=int(window * 1000), nx=True)
+        pipe.incr(f"{name}:calls")
+        pipe.incrby(f"{name}:failures", int(failed))
+        _, _, calls, failures = pipe.execute()
+        return int(calls), int(failures)
+
+    def trip(self, name: str, open_duration: float) -> None:
+        pipe = self.redis.pipeline()
+        pipe.set(f"{name}:open", 1, px=int(open_duration * 1000))
+        pipe.set(f"{name}:tripped", 1, px=int(open_duration * 10 * 1000))
+        pipe.delete(f"{name}:probes", f"{name}:calls", f"{name}:failures")
+        pipe.execute()
+
+    def close(self, name: str) -> None:
+        self.redis.delete(
+            f"{name}:open", f"{name}:tripped", f"{name}:probes", f"{name}:calls", f"{name}:failures"
+        )
+
+
+class CircuitBreaker:
+    """Circuit breaker shared across workers through Redis
+
+    ``before_call`` must run before every attempt and either ``record_success``
+    or ``record_failure`` after it, passing back the state it returned so each
+    call costs a single Redis round trip on each side.
+    """
+
+    def __init__(self, policy: CircuitBreakerPolicy, account_sid: str):
+        self.policy = policy
+        self.account_sid = account_sid
+        self._local = _LocalBreakerStore()
+
+    def before_call(self, operation: str) -> str:
+        """Let the call through or fail fast
+
+        Returns:
+            State the call was let through in (closed or half_open)
+
+        Raises:
+            CircuitOpenError: While the circuit is open, or half-open with all
+                probe slots taken
+        """
+        name = self._name(operation)
+        state, remaining = self._run(lambda store: store.state(name))
+        if state == CLOSED:
+            return state
+        if state == HALF_OPEN and self._run(
+            lambda store: store.acquire_probe(name, self.policy.half_open_max_calls, self.policy.open_duration)
+        ):
+            logger.info("Probing half-open Twilio circuit", operation=operation)
+            return state
+        raise CircuitOpenError(operation, retry_after=remaining or self.policy.open_duration)
+
+    def record_success(self, operation: str, duration: float, state: str = CLOSED) -> None:
+        """Record a completed call, slow calls counting as failures"""
+        self._record(operation, duration >= self.policy.slow_call_duration, state)
+
+    def record_failure(self, operation: str, error: TwilioError, state: str = CLOSED) -> None:
+        """Record a failed call; only provider-side failures count"""
+        self._record(operation, counts_as_failure(error), state)
+
+    def state(self, operation: str) -> str:
+        """Return the current state (closed, open or half_open) of an operation"""
+        name = self._name(operation)
+        return self._run(lambda store: store.state(name))[0]
+
+    def _record(self, operation: str, failed: bool, state: str) -> None:
+        name = self._name(operation)
+        if state == HALF_OPEN:
+            if failed:
+                self._trip(operation, name)
+            else:
+                logger.info("Closing Twilio circuit", operation=operation)
+                self._run(lambda store: store.close(name))
+            return
+
+        calls, failures = self._run(lambda store: store.record(name, failed, self.policy.window))
+        if calls >= self.policy.min_calls and failures / calls >= self.policy.failure_rate_threshold:
+            self._trip(operation, name)
+
+    def _trip(self, operation: str, name: str) -> None:
+        logger.warn("Opening Twilio circuit", operation=operation, open_duration=self.policy.open_duration)
+        self._run(lambda store: store.trip(name, self.policy.open_duration))
+
+    def _name(self, operation: str) -> str:
+        return f"{self.policy.key_prefix}:{self.account_sid}:{operation}"
+
+    def _run(self, func: Any) -> Any:
+        """Run ``func`` against Redis, or against local state when Redis is down"""
+        redis = get_redis()
+        if redis is not None:
+            try:
+                return func(_RedisBreakerStore(redis))
+            except Exception as e:
+                mark_redis_down(e)
+        return func(self._local)
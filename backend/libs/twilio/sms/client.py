@@ -1,13 +1,47 @@
-import structlog
-from typing import Optional, Dict, Any
+import asyncio
+import contextvars
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
 
 import twilio.rest
+from aiohttp import (
+    ClientConnectionError, ClientSession, ClientTimeout, ConnectionTimeoutError, TCPConnector, encode_basic_auth,
+)
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout, Timeout
 from twilio.base.exceptions import TwilioRestException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.http.http_client import TwilioHttpClient
+from twilio.http.request import Request as TwilioRequest
+from twilio.http.response import Response
 
+from . import metrics
+from .breaker import CLOSED, CircuitBreaker
 from .config import TwilioConfig
-from .exceptions import TwilioAPIError, RateLimitError
+from .deadline import check_deadline, clamp_timeout, deadline, remaining
+from .exceptions import DeadlineExceededError, TwilioAPIError, TwilioError, RateLimitError
+from .log import get_logger
+from .ratelimit import RateLimiter
+from .retry import CONNECTION_ERROR, TIMEOUT, async_call_with_retry, call_with_retry
 
-logger = structlog.get_logger()
+logger = get_logger()
+
+# Seconds to wait after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 60
+
+# Retry-After of the last 429 answer seen in the current thread or task. The
+# SDK's TwilioRestException does not expose response headers, so the HTTP
+# client records it here for ``_translate_error``.
+_last_retry_after: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "twilio_last_retry_after", default=None
+)
 
 
 class TwilioClient:
@@ -15,55 +49,555 @@ class TwilioClient:
 
     def __init__(self, config: TwilioConfig):
         """Initialize the Twilio client with the provided configuration
-        
+
         Args:
             config: TwilioConfig instance with account credentials
         """
         self.config = config
         logger.debug("Initializing Twilio REST client", account_sid=config.account_sid)
-        self._client = twilio.rest.Client(config.account_sid, config.auth_token)
+        self._client = twilio.rest.Client(
+            config.account_sid,
+            config.auth_token,
+            http_client=_PooledHttpClient(config),
+        )
+        self._limiter = RateLimiter(config.rate_limit) if config.rate_limit else None
+        self._breaker = (
+            CircuitBreaker(config.circuit_breaker, config.account_sid) if config.circuit_breaker else None
+        )
+        # Extra Messages API parameters sent with every SMS
+        self._callback = {"status_callback": config.status_callback} if config.status_callback else {}
         logger.info("TwilioClient initialized", account_sid=config.account_sid)
 
     def send_message(
-        self, to: str, body: str, from_: Optional[str] = None
+        self, to: str, body: str, from_: Optional[str] = None, messaging_service_sid: Optional[str] = None
     ) -> Dict[str, Any]:
         """Send an SMS message using the Twilio API
-        
+
         Args:
             to: Recipient phone number
             body: Message content
             from_: Sender phone number (defaults to config.from_number)
-            
+            messaging_service_sid: Messaging service sending the message
+                instead of a number
+
+        Returns:
+            Dictionary containing the Twilio API response
+
+        Raises:
+            TwilioAPIError: If the Twilio API returns an error
+            RateLimitError: If rate limits are exceeded
+        """
+        sender = messaging_service_sid or from_ or self.config.from_number
+        route = {"messaging_service_sid": sender} if messaging_service_sid else {"from_": sender}
+        logger.debug("Sending SMS", to=to, sender=sender)
+        response = self._call(
+            "send_message",
+            lambda: self._client.messages.create(to=to, body=body, **route, **self._callback),
+            to=to,
+            sender=sender,
+        )
+        logger.debug("SMS sent successfully", to=to, sid=response.sid)
+        return _message_payload(response)
+
+    def create_verification(
+        self, service_sid: str, to: str, channel: str
+    ) -> Dict[str, Any]:
+        """Create a verification using the Twilio Verify API
+
+        Args:
+            service_sid: Verify service SID
+            to: Recipient phone number
+            channel: Verification channel value (sms, call or email)
+
         Returns:
             Dictionary containing the Twilio API response
-            
+
+        Raises:
+            TwilioAPIError: If the Twilio API returns an error
+            RateLimitError: If rate limits are exceeded
+        """
+        verification = self._call(
+            "create_verification",
+            lambda: self._client.verify.v2.services(service_sid).verifications.create(
+                to=to, channel=channel
+            ),
+            to=to,
+        )
+        return _verification_payload(verification, to)
+
+    def create_verification_check(
+        self, service_sid: str, to: str, code: str
+    ) -> Dict[str, Any]:
+        """Check a verification code using the Twilio Verify API
+
+        Args:
+            service_sid: Verify service SID
+            to: Recipient phone number
+            code: Verification code to check
+
+        Returns:
+            Dictionary containing the Twilio API response
+
         Raises:
             TwilioAPIError: If the Twilio API returns an error
             RateLimitError: If rate limits are exceeded
         """
-        try:
-            sender = from_ or self.config.from_number
-            logger.info("Sending SMS", to=to, sender=sender)
-            response = self._client.messages.create(
-                to=to,
-                body=body,
-                from_=sender
-            )
-            logger.debug("SMS sent successfully", to=to, sid=response.sid)  # pragma: no cover
-            return {    # pragma: no cover
-                "sid": getattr(response, "sid", None),  
-                "status": getattr(response, "status", None),
-                "to": getattr(response, "to", None),
-                "error_code": getattr(response, "error_code", None),
-                "error_message": getattr(response, "error_message", None),
-            }
-        except TwilioRestException as e:
-            logger.error("Twilio API error", to=to, error=str(e), code=getattr(e, 'code', None))
-            if e.code == 20429:  # Rate limit error code
-                retry_after = int(e.response.headers.get('Retry-After', 60))  # pragma: no cover
-                raise RateLimitError(str(e), retry_after=retry_after)  # pragma: no cover
-            else:
-                raise TwilioAPIError(str(e), str(e.code))  # pragma: no cover
-        except Exception as e:
-            logger.error("Unexpected error when sending SMS", to=to, error=str(e))  # pragma: no cover
-            raise TwilioAPIError(str(e), "UNKNOWN")  # pragma: no cover
+        verification_check = self._call(
+            "create_verification_check",
+            lambda: self._client.verify.v2.services(service_sid).verification_checks.create(
+                to=to, code=code
+            ),
+            to=to,
+        )
+        return _verification_payload(verification_check, to)
+
+    def _call(
+        self, operation: str, func: Callable[[], Any], to: str, sender: Optional[str] = None
+    ) -> Any:
+        """Run a Twilio SDK call translating errors into domain exceptions
+
+        Every attempt goes through the circuit breaker and takes a token from
+        the rate limiter, if configured, and transient errors are retried
+        according to ``config.retry``. Attempts and waits all fit within
+        ``config.deadline`` and any enclosing ``deadline()`` block.
+        """
+        def attempt() -> Any:
+            check_deadline(operation)
+            state = self._breaker.before_call(operation) if self._breaker else CLOSED
+            if self._limiter is not None:
+                self._limiter.acquire(self.config.account_sid, sender)
+            started_at = time.monotonic()
+            try:
+                result = func()
+            except Exception as e:
+                error = _translate_error(e, operation, to)
+                if self._breaker is not None:
+                    self._breaker.record_failure(operation, error, state)
+                raise error from e
+            if self._breaker is not None:
+                self._breaker.record_success(operation, time.monotonic() - started_at, state)
+            return result
+
+        with deadline(self.config.deadline), metrics.track(operation):
+            return call_with_retry(self.config.retry, operation, attempt)
+
+
+class AsyncTwilioClient:
+    """Asyncio counterpart of TwilioClient built on the SDK's aiohttp client
+
+    Instances are bound to the event loop they were created in; use
+    ``get_async_client`` rather than building them directly.
+    """
+
+    def __init__(self, config: TwilioConfig):
+        """Initialize the async Twilio client with the provided configuration
+
+        Args:
+            config: TwilioConfig instance with account credentials
+        """
+        self.config = config
+        logger.debug("Initializing async Twilio REST client", account_sid=config.account_sid)
+        self._http_client = _PooledAsyncHttpClient(config)
+        self._client = twilio.rest.Client(
+            config.account_sid,
+            config.auth_token,
+            http_client=self._http_client,
+        )
+        self._limiter = RateLimiter(config.rate_limit) if config.rate_limit else None
+        self._breaker = (
+            CircuitBreaker(config.circuit_breaker, config.account_sid) if config.circuit_breaker else None
+        )
+        # Extra Messages API parameters sent with every SMS
+        self._callback = {"status_callback": config.status_callback} if config.status_callback else {}
+        logger.info("AsyncTwilioClient initialized", account_sid=config.account_sid)
+
+    async def send_message(
+        self, to: str, body: str, from_: Optional[str] = None, messaging_service_sid: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send an SMS message using the Twilio API
+
+        Args:
+            to: Recipient phone number
+            body: Message content
+            from_: Sender phone number (defaults to config.from_number)
+            messaging_service_sid: Messaging service sending the message
+                instead of a number
+
+        Returns:
+            Dictionary containing the Twilio API response
+
+        Raises:
+            TwilioAPIError: If the Twilio API returns an error
+            RateLimitError: If rate limits are exceeded
+        """
+        sender = messaging_service_sid or from_ or self.config.from_number
+        route = {"messaging_service_sid": sender} if messaging_service_sid else {"from_": sender}
+        logger.debug("Sending SMS", to=to, sender=sender)
+        response = await self._call(
+            "send_message",
+            lambda: self._client.messages.create_async(to=to, body=body, **route, **self._callback),
+            to=to,
+            sender=sender,
+        )
+        logger.debug("SMS sent successfully", to=to, sid=response.sid)
+        return _message_payload(response)
+
+    async def create_verification(
+        self, service_sid: str, to: str, channel: str
+    ) -> Dict[str, Any]:
+        """Create a verification using the Twilio Verify API
+
+        Args:
+            service_sid: Verify service SID
+            to: Recipient phone number
+            channel: Verification channel value (sms, call or email)
+
+        Returns:
+            Dictionary containing the Twilio API response
+        """
+        verification = await self._call(
+            "create_verification",
+            lambda: self._client.verify.v2.services(service_sid).verifications.create_async(
+                to=to, channel=channel
+            ),
+            to=to,
+        )
+        return _verification_payload(verification, to)
+
+    async def create_verification_check(
+        self, service_sid: str, to: str, code: str
+    ) -> Dict[str, Any]:
+        """Check a verification code using the Twilio Verify API
+
+        Args:
+            service_sid: Verify service SID
+            to: Recipient phone number
+            code: Verification code to check
+
+        Returns:
+            Dictionary containing the Twilio API response
+        """
+        verification_check = await self._call(
+            "create_verification_check",
+            lambda: self._client.verify.v2.services(service_sid).verification_checks.create_async(
+                to=to, code=code
+            ),
+            to=to,
+        )
+        return _verification_payload(verification_check, to)
+
+    async def close(self) -> None:
+        """Close the underlying aiohttp session"""
+        await self._http_client.close()
+
+    async def _call(
+        self, operation: str, func: Callable[[], Awaitable[Any]], to: str, sender: Optional[str] = None
+    ) -> Any:
+        """Await a Twilio SDK call translating errors into domain exceptions
+
+        Every attempt goes through the circuit breaker and takes a token from
+        the rate limiter, if configured, and transient errors are retried
+        according to ``config.retry``. Attempts and waits all fit within
+        ``config.deadline`` and any enclosing ``deadline()`` block.
+        """
+        async def attempt() -> Any:
+            check_deadline(operation)
+            state = self._breaker.before_call(operation) if self._breaker else CLOSED
+            if self._limiter is not None:
+                await self._limiter.async_acquire(self.config.account_sid, sender)
+            started_at = time.monotonic()
+            try:
+                result = await func()
+            except Exception as e:
+                error = _translate_error(e, operation, to)
+                if self._breaker is not None:
+                    self._breaker.record_failure(operation, error, state)
+                raise error from e
+            if self._breaker is not None:
+                self._breaker.record_success(operation, time.monotonic() - started_at, state)
+            return result
+
+        with deadline(self.config.deadline), metrics.track(operation):
+            return await async_call_with_retry(self.config.retry, operation, attempt)
+
+
+def _translate_error(error: Exception, operation: str, to: str) -> TwilioError:
+    """Map an exception raised by the Twilio SDK to a domain exception"""
+    if isinstance(error, TwilioError):  # e.g. DeadlineExceededError from the HTTP client
+        return error
+
+    if isinstance(error, TwilioRestException):
+        logger.error("Twilio API error", operation=operation, to=to, error=str(error), code=error.code)
+        if error.code == 20429:  # Rate limit error code
+            return RateLimitError(str(error), retry_after=_retry_after(error))
+        status = error.status if isinstance(error.status, int) else None
+        return TwilioAPIError(str(error), str(error.code), status=status)
+
+    if isinstance(error, (Timeout, TimeoutError)) and not isinstance(
+        error, (ConnectTimeout, ConnectionTimeoutError)
+    ):
+        left = remaining()
+        if left is not None and left <= 0:
+            logger.error("Twilio call deadline exceeded", operation=operation, to=to)
+            return DeadlineExceededError(operation)
+        logger.error("Twilio read timeout", operation=operation, to=to, error=str(error))
+        return TwilioAPIError(str(error) or "Read timed out", TIMEOUT)
+
+    if isinstance(error, (RequestsConnectionError, ClientConnectionError, ConnectionError)):
+        logger.error("Twilio connection error", operation=operation, to=to, error=str(error))
+        return TwilioAPIError(str(error), CONNECTION_ERROR)
+
+    logger.error("Unexpected Twilio client error", operation=operation, to=to, error=str(error))
+    return TwilioAPIError(str(error), "UNKNOWN")
+
+
+def _retry_after(error: TwilioRestException) -> int:
+    """Read the Retry-After of a rate limit error, in seconds or as an HTTP date, defaulting to 60"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Retry-After") or _last_retry_after.get()
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0, math.ceil((retry_at - datetime.now(timezone.utc)).total_seconds()))
+
+
+def _message_payload(response: Any) -> Dict[str, Any]:
+    """Extract the fields we care about from a Twilio message resource"""
+    return {
+        "sid": getattr(response, "sid", None),
+        "status": getattr(response, "status", None),
+        "to": getattr(response, "to", None),
+        "error_code": getattr(response, "error_code", None),
+        "error_message": getattr(response, "error_message", None),
+    }
+
+
+def _verification_payload(verification: Any, to: str) -> Dict[str, Any]:
+    """Extract the fields we care about from a Twilio verification resource"""
+    return {
+        "sid": getattr(verification, "sid", None),
+        "status": getattr(verification, "status", None),
+        "to": to,
+    }
+
+
+def _rewrite_url(url: str, base_url: Optional[str]) -> str:
+    """Point a Twilio API URL at ``base_url`` keeping its path and query"""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit(
+        (base.scheme, base.netloc, base.path.rstrip("/") + parts.path, parts.query, parts.fragment)
+    )
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """HTTPAdapter applying the configured timeouts, cut to the remaining deadline"""
+
+    def __init__(self, connect_timeout: float, read_timeout: float, **kwargs: Any):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        super().__init__(**kwargs)
+
+    def send(self, request: Any, *args: Any, **kwargs: Any):
+        kwargs["timeout"] = (clamp_timeout(self.connect_timeout), clamp_timeout(self.read_timeout))
+        return super().send(request, *args, **kwargs)
+
+
+class _PooledHttpClient(TwilioHttpClient):
+    """Keep-alive HTTP client whose pool fits ``config.pool_size``"""
+
+    def __init__(self, config: TwilioConfig):
+        super().__init__(pool_connections=True)
+        self.base_url = config.api_base_url
+        adapter = _TimeoutAdapter(
+            config.connect_timeout,
+            config.read_timeout,
+            pool_connections=1,
+            pool_maxsize=config.pool_size,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any):
+        response = super().request(method, _rewrite_url(url, self.base_url), *args, **kwargs)
+        if response.status_code == 429:
+            _last_retry_after.set(response.headers.get("Retry-After"))
+        return response
+
+
+class _PooledAsyncHttpClient(AsyncTwilioHttpClient):
+    """aiohttp client with a connection limit of ``config.pool_size``
+
+    ``request`` is reimplemented because the SDK hands ``timeout=None`` to
+    aiohttp, which disables every timeout of the session.
+    """
+
+    def __init__(self, config: TwilioConfig):
+        super().__init__(pool_connections=False)
+        self.base_url = config.api_base_url
+        self.connect_timeout = config.connect_timeout
+        self.read_timeout = config.read_timeout
+        self.session = ClientSession(connector=TCPConnector(limit=config.pool_size))
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+        timeout: Optional[float] = None,
+        allow_redirects: bool = False,
+    ) -> Response:
+        left = remaining()
+        method = method.upper()
+        url = _rewrite_url(url, self.base_url)
+        headers = dict(headers or {})
+        if auth is not None:
+            headers["Authorization"] = encode_basic_auth(auth[0], auth[1])
+        kwargs: Dict[str, Any] = {
+            "method": method, "url": url, "params": params, "data": data, "headers": headers,
+            "allow_redirects": allow_redirects,
+        }
+        self.log_request(kwargs)
+        self._test_only_last_request = TwilioRequest(**kwargs)
+        client_timeout = ClientTimeout(
+            total=clamp_timeout(left) if left is not None else None,
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+        async with self.session.request(
+            method, url, params=params, data=data, headers=headers, allow_redirects=allow_redirects,
+            timeout=client_timeout,
+        ) as raw:
+            self.log_response(raw.status, raw)
+            response = Response(raw.status, await raw.text(), raw.headers)
+        self._test_only_last_response = response
+        if response.status_code == 429:
+            _last_retry_after.set(response.headers.get("Retry-After"))
+        return response
+
+
+_clients: Dict[TwilioConfig, TwilioClient] = {}
+_clients_lock = threading.Lock()
+
+# Clients of each running loop, with the task closing them when the loop shuts down
+_async_clients: Dict[asyncio.AbstractEventLoop, Tuple[Dict[TwilioConfig, AsyncTwilioClient], "asyncio.Task[None]"]] = {}
+
+
+def get_client(config: TwilioConfig) -> TwilioClient:
+    """Return the process-wide TwilioClient for the given configuration
+
+    Clients are created once per distinct ``TwilioConfig`` and reused by every
+    thread of the process, so the underlying HTTP connections are kept alive
+    across calls instead of paying a new TLS handshake per message.
+
+    Args:
+        config: TwilioConfig instance with account credentials
+
+    Returns:
+        Shared TwilioClient instance
+    """
+    client = _clients.get(config)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(config)
+        if client is None:
+            client = TwilioClient(config)
+            _clients[config] = client
+        return client
+
+
+def get_async_client(config: TwilioConfig) -> AsyncTwilioClient:
+    """Return the AsyncTwilioClient for the given configuration and running loop
+
+    aiohttp sessions cannot be shared between event loops, so clients are
+    scoped to the running loop. They are closed and forgotten when the loop
+    shuts down (``asyncio.run``, ``async_to_sync``), as those cancel the
+    loop's remaining tasks, or at the latest on the next call after the loop
+    was closed. Must be called from a coroutine.
+
+    Args:
+        config: TwilioConfig instance with account credentials
+
+    Returns:
+        Shared AsyncTwilioClient instance for the running loop
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        _forget_closed_loops()
+        entry = _async_clients[loop] = ({}, loop.create_task(_close_on_shutdown(loop)))
+    clients = entry[0]
+    client = clients.get(config)
+    if client is None:
+        client = AsyncTwilioClient(config)
+        clients[config] = client
+    return client
+
+
+async def close_async_clients() -> None:
+    """Close every async client bound to the running loop
+
+    Call it on ASGI lifespan shutdown so pooled connections are released.
+    """
+    clients, watcher = _async_clients.pop(asyncio.get_running_loop(), ({}, None))
+    if watcher is not None:
+        watcher.cancel()
+    for client in clients.values():
+        await client.close()
+
+
+async def _close_on_shutdown(loop: asyncio.AbstractEventLoop) -> None:
+    """Wait until cancelled with the loop's other tasks, then close its clients"""
+    try:
+        await asyncio.Event().wait()
+    finally:
+        entry = _async_clients.get(loop)
+        if entry is not None and entry[1] is asyncio.current_task():
+            del _async_clients[loop]
+            for client in entry[0].values():
+                await client.close()
+
+
+def _forget_closed_loops() -> None:
+    """Drop the clients of loops closed without cancelling their tasks"""
+    for loop in [loop for loop in _async_clients if loop.is_closed()]:
+        del _async_clients[loop]
+
+
+def reset_clients() -> None:
+    """Drop every registered client so the next call builds a fresh one"""
+    with _clients_lock:
+        _clients.clear()
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's clients in a forked child (e.g. gunicorn workers)
+
+    The lock is recreated because it may have been held by another thread at
+    fork time, and the pools are dropped so sockets are never shared between
+    processes.
+    """
+    global _clients_lock
+    _clients_lock = threading.Lock()
+    _clients.clear()
+    _async_clients.clear()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no cover
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,14 +1,300 @@
-from typing import Optional, Self
+from typing import Literal, Optional, Self, Tuple, cast
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+class RetryPolicy(BaseModel):
+    """Retry policy applied to transient Twilio errors
+
+    Retries use exponential backoff (``base_delay * 2 ** (attempt - 1)``, capped
+    at ``max_delay``) reduced by up to ``jitter`` percent, and never wait less
+    than the ``Retry-After`` returned by Twilio. No retry is attempted once it
+    would end past ``deadline`` seconds from the first attempt.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    max_attempts: int = Field(3, ge=1, description="Attempts including the first call")
+    base_delay: float = Field(0.2, ge=0, description="Delay before the first retry (seconds)")
+    max_delay: float = Field(5.0, ge=0, description="Upper bound of a single backoff (seconds)")
+    jitter: float = Field(0.5, ge=0, le=1, description="Fraction of the delay randomized away")
+    deadline: float = Field(10.0, gt=0, description="Total time budget for all attempts (seconds)")
+
+
+class RateLimitPolicy(BaseModel):
+    """Client-side token buckets applied before calling the Twilio API
+
+    One bucket is shared by the whole account and, when ``sender_rate`` is
+    set, one more per sender number. Buckets live in Redis so every worker
+    process draws from the same budget.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    account_rate: float = Field(..., gt=0, description="Requests per second for the account")
+    account_burst: Optional[int] = Field(None, ge=1, description="Bucket size (defaults to the rate)")
+    sender_rate: Optional[float] = Field(None, gt=0, description="Messages per second per sender number")
+    sender_burst: Optional[int] = Field(None, ge=1, description="Bucket size (defaults to the rate)")
+    mode: Literal["block", "fail_fast"] = Field(
+        "block", description="Wait for a token or fail immediately when the bucket is empty"
+    )
+    timeout: float = Field(2.0, ge=0, description="Max seconds to wait for a token in block mode")
+    key_prefix: str = Field("twilio:ratelimit", description="Redis key prefix of the buckets")
+
+
+class CircuitBreakerPolicy(BaseModel):
+    """Circuit breaker settings applied per account and operation
+
+    A call counts as failed when Twilio answers with a 5xx, the connection
+    fails or it takes longer than ``slow_call_duration``. Once ``min_calls``
+    calls were seen in the current ``window`` and the failure rate reaches
+    ``failure_rate_threshold``, calls fail fast for ``open_duration`` seconds;
+    then up to ``half_open_max_calls`` probes decide whether to close it again.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    failure_rate_threshold: float = Field(0.5, gt=0, le=1, description="Failure rate that opens the circuit")
+    slow_call_duration: float = Field(5.0, gt=0, description="Calls slower than this count as failures (seconds)")
+    min_calls: int = Field(20, ge=1, description="Calls needed in a window before the rate is evaluated")
+    window: float = Field(30.0, gt=0, description="Length of the counting window (seconds)")
+    open_duration: float = Field(30.0, gt=0, description="Time calls fail fast once open (seconds)")
+    half_open_max_calls: int = Field(3, ge=1, description="Probe calls allowed while half-open")
+    key_prefix: str = Field("twilio:breaker", description="Redis key prefix of the breaker state")
+
+
+class VerificationDedupPolicy(BaseModel):
+    """Reuse of pending verifications when users ask for a new code
+
+    Within ``window`` seconds of a successful ``start_verification``, further
+    calls for the same number and channel return the pending result instead
+    of calling Twilio again. Concurrent calls wait up to ``wait_timeout``
+    seconds for the one already in flight rather than racing it.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    window: float = Field(60.0, gt=0, description="Seconds a pending verification is reused")
+    lock_timeout: float = Field(10.0, gt=0, description="Max seconds an in-flight call holds the lock")
+    wait_timeout: float = Field(5.0, ge=0, description="Max seconds a concurrent call waits for it")
+    key_prefix: str = Field("twilio:verify", description="Redis key prefix of the dedup state")
+
+
+class VerificationGuardPolicy(BaseModel):
+    """Local checks run before a verification code is sent to Twilio
+
+    Codes that cannot be valid, numbers without a pending verification and
+    numbers past ``max_attempts`` checks are rejected without an API call.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    code_length: int = Field(6, ge=4, le=10, description="Digits in codes sent by the Verify service")
+    max_attempts: int = Field(5, ge=1, description="Checks allowed per pending verification")
+    ttl: float = Field(600.0, gt=0, description="Seconds a started verification stays pending")
+    key_prefix: str = Field("twilio:verify:guard", description="Redis key prefix of pending verifications")
+
+
+class LocalOTPPolicy(BaseModel):
+    """Verification codes generated and checked by this library
+
+    Codes are sent through the Messages API and checked against a keyed hash
+    kept in Redis, so checking one needs no call to Twilio.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    secret: Optional[str] = Field(
+        None, description="HMAC key of codes and stored hashes, defaults to the auth token"
+    )
+    code_length: int = Field(6, ge=4, le=10, description="Digits per code")
+    ttl: float = Field(600.0, gt=0, description="Seconds a code stays valid")
+    max_attempts: int = Field(5, ge=1, description="Checks allowed per code, resends included")
+    message: str = Field("Your verification code is {code}", description="SMS body, with a {code} placeholder")
+    key_prefix: str = Field("twilio:otp", description="Redis key prefix of pending codes")
+
+
+class OutboxPolicy(BaseModel):
+    """Settings of the Redis stream outbox drained by the dispatch worker
+
+    Queued messages are retried ``max_attempts`` times when Twilio fails
+    transiently, waiting at least ``retry_delay`` seconds between attempts.
+    Messages left unacknowledged by a crashed worker are picked up by another
+    one once idle for ``retry_delay`` seconds.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    stream: str = Field("twilio:outbox", description="Redis stream holding queued messages")
+    group: str = Field("twilio-outbox", description="Consumer group shared by the workers")
+    batch_size: int = Field(50, ge=1, description="Messages read from the stream at once")
+    concurrency: int = Field(8, ge=1, description="Messages sent in parallel by a worker")
+    max_attempts: int = Field(5, ge=1, description="Delivery attempts before a message fails")
+    retry_delay: float = Field(30.0, gt=0, description="Min seconds before retrying a message")
+    block: float = Field(5.0, ge=0, description="Seconds a worker waits for new messages")
+    state_ttl: int = Field(7 * 24 * 3600, ge=1, description="Seconds the delivery state is kept")
+
+
+class SenderRoute(BaseModel):
+    """A sender of a pool: a phone number or a messaging service
+
+    Routes use the credentials of the config holding the pool unless they
+    name another account (e.g. a subaccount) with its own auth token.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    from_number: Optional[str] = Field(None, description="Sender phone number")
+    messaging_service_sid: Optional[str] = Field(None, description="Messaging service sending instead of a number")
+    account_sid: Optional[str] = Field(None, description="Account the sender belongs to, defaults to the config's")
+    auth_token: Optional[str] = Field(None, description="Auth token of that account")
+    weight: int = Field(1, ge=1, description="Share of the traffic relative to the other senders")
+    rate: Optional[float] = Field(
+        None, gt=0, description="Messages per second the sender may send (e.g. 1 for a long code)"
+    )
+    burst: Optional[int] = Field(None, ge=1, description="Bucket size (defaults to the rate)")
+
+    @model_validator(mode="after")
+    def validate_route(self) -> Self:
+        """Require exactly one sender and complete credentials"""
+        if (self.from_number is None) == (self.messaging_service_sid is None):
+            raise ValueError("Set exactly one of from_number and messaging_service_sid")
+        if self.from_number is not None and not self.from_number.startswith("+"):
+            raise ValueError("Phone number must start with +")
+        if (self.account_sid is None) != (self.auth_token is None):
+            raise ValueError("account_sid and auth_token go together")
+        return self
+
+    @property
+    def sender(self) -> str:
+        """Number or messaging service SID messages are sent from"""
+        # validate_route makes sure exactly one of them is set
+        return cast(str, self.from_number or self.messaging_service_sid)
+
+
+class SenderPoolPolicy(BaseModel):
+    """Spreading of ``send_sms`` over several senders
+
+    Each message goes to one of ``senders`` by weighted round-robin or, when
+    ``sticky``, to the sender a weighted hash of the recipient picks, so a
+    recipient keeps hearing from the same number. Senders whose ``rate`` is
+    used up are skipped for the next candidate. A sender answering
+    ``failure_threshold`` sender errors (invalid number, bad credentials, full
+    queue, ...) within ``cooldown`` seconds is left out for ``cooldown``
+    seconds, and messages it refuses are retried on another sender.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    senders: Tuple[SenderRoute, ...] = Field(..., min_length=1, description="Senders messages are spread over")
+    sticky: bool = Field(True, description="Keep sending to a recipient from the same sender")
+    failure_threshold: int = Field(3, ge=1, description="Sender errors within cooldown that take a sender out")
+    cooldown: float = Field(60.0, gt=0, description="Seconds a failing sender stays out of the pool")
+    key_prefix: str = Field("twilio:senders", description="Redis key prefix of sender buckets and health")
+
+
+class FailoverPolicy(BaseModel):
+    """Delivery of ``send_sms`` through a chain of SMS providers
+
+    Messages go to the first healthy provider of ``providers`` (names given
+    to ``providers.register_provider``, ``"twilio"`` being this config). When
+    it fails on its side, the next one is tried, while errors about the
+    message itself are returned; when it has not answered within
+    ``latency_budget`` seconds, the next one is started as well and the first
+    success wins, so a slow provider can cause a duplicate SMS. Providers
+    whose average latency, errors counting as twice the budget, exceeds the
+    budget are tried last, and get traffic again once they have not been
+    measured for ``probe_interval`` seconds.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    providers: Tuple[str, ...] = Field(..., min_length=1, description="Provider names, in order of preference")
+    latency_budget: float = Field(2.0, gt=0, description="Seconds to wait for a provider before hedging")
+    ewma_alpha: float = Field(0.2, gt=0, le=1, description="Weight of the latest sample in a provider's score")
+    probe_interval: float = Field(30.0, gt=0, description="Seconds after which a slow provider is tried again")
+
+
+class CheckHedgingPolicy(BaseModel):
+    """Hedged Verify checks, against Twilio's tail latency on the login path
+
+    When a ``check_verification`` call has not answered within the
+    ``percentile`` latency of the last ``window`` checks (``max_delay`` until
+    ``min_samples`` are measured), the same check is sent again and the first
+    success is returned. Hedges are capped to ``max_hedge_rate`` of recent
+    checks so a slow Twilio does not get twice the load. A hedged wrong code
+    uses two of the Verify service's attempts, and the later of two checks of
+    a right code finds the verification already approved; that error is
+    dropped when the other check succeeds.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    percentile: float = Field(0.95, gt=0, lt=1, description="Latency percentile after which a check is hedged")
+    min_delay: float = Field(0.05, gt=0, description="Shortest wait before hedging, in seconds")
+    max_delay: float = Field(1.0, gt=0, description="Longest wait before hedging, in seconds")
+    min_samples: int = Field(20, ge=1, description="Checks measured before the percentile is trusted")
+    window: int = Field(200, ge=10, description="Recent checks the percentile and hedge rate are taken over")
+    max_hedge_rate: float = Field(0.1, gt=0, le=1, description="Largest share of recent checks that get hedged")
+
+    @model_validator(mode="after")
+    def validate_delays(self) -> Self:
+        """Require min_delay <= max_delay"""
+        if self.min_delay > self.max_delay:
+            raise ValueError("min_delay must not exceed max_delay")
+        return self
 
 
 class TwilioConfig(BaseModel):
-    """Configuration for Twilio SMS service"""
+    """Configuration for Twilio SMS service
+
+    Instances are immutable and hashable so they can be used as keys of the
+    process-wide client registry (see ``client.get_client``).
+    """
+    model_config = ConfigDict(frozen=True)
+
     account_sid: str
     auth_token: str
     from_number: str
     service_sid: Optional[str] = None
+    status_callback: Optional[str] = Field(
+        None, description="URL Twilio posts delivery status updates of sent messages to"
+    )
+    pool_size: int = Field(
+        10, ge=1, description="Max keep-alive connections kept per client"
+    )
+    api_base_url: Optional[str] = Field(
+        None,
+        description="Replaces the Twilio API host (e.g. a local fake server)",
+    )
+    connect_timeout: float = Field(
+        3.05, gt=0, description="Max seconds to establish a connection to Twilio"
+    )
+    read_timeout: float = Field(
+        10.0, gt=0, description="Max seconds to wait for Twilio's answer on an open connection"
+    )
+    deadline: Optional[float] = Field(
+        15.0, gt=0, description="Total time budget of an operation, retries included (seconds)"
+    )
+    retry: RetryPolicy = Field(
+        default_factory=RetryPolicy, description="Retry policy for transient errors"
+    )
+    rate_limit: Optional[RateLimitPolicy] = Field(
+        None, description="Outbound token buckets, disabled when not set"
+    )
+    verification_dedup: Optional[VerificationDedupPolicy] = Field(
+        None, description="Suppression of repeated start_verification calls, disabled when not set"
+    )
+    verification_guard: Optional[VerificationGuardPolicy] = Field(
+        None, description="Local rejection of bad verification checks, disabled when not set"
+    )
+    local_otp: Optional[LocalOTPPolicy] = Field(
+        None, description="Self-hosted codes used instead of Twilio Verify when set"
+    )
+    outbox: OutboxPolicy = Field(
+        default_factory=OutboxPolicy, description="Queue used by send_sms(enqueue=True)"
+    )
+    circuit_breaker: Optional[CircuitBreakerPolicy] = Field(
+        None, description="Fail-fast protection when Twilio degrades, disabled when not set"
+    )
+    sender_pool: Optional[SenderPoolPolicy] = Field(
+        None, description="Senders send_sms spreads messages over instead of from_number"
+    )
+    failover: Optional[FailoverPolicy] = Field(
+        None, description="Providers send_sms fails over to, Twilio only when not set"
+    )
+    check_hedging: Optional[CheckHedgingPolicy] = Field(
+        None, description="Second Verify check sent when the first is slow, disabled when not set"
+    )
 
     @field_validator('from_number')
     def validate_phone(cls: Self, v: str) -> str:
@@ -0,0 +1,67 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .exceptions import DeadlineExceededError
+
+# Absolute time.monotonic() by which the current request must be done. Being a
+# ContextVar, it follows the calling thread or asyncio task.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "twilio_deadline", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound every Twilio call made inside the block to ``seconds`` from now
+
+    Nested blocks can only shorten the budget, so a view can pass down what
+    is left of its latency SLO and the client's own per-operation deadline
+    still applies within it::
+
+        with deadline(0.8):
+            start_verification(config, phone)
+
+    Args:
+        seconds: Time budget in seconds; None leaves the current budget as is
+    """
+    if seconds is None:
+        yield
+        return
+    end = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(end if current is None else min(current, end))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None when there is none"""
+    end = _deadline.get()
+    if end is None:
+        return None
+    return end - time.monotonic()
+
+
+def check_deadline(operation: str) -> None:
+    """Raise DeadlineExceededError when no time is left for ``operation``"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(operation)
+
+
+def clamp_timeout(timeout: float) -> float:
+    """Shorten ``timeout`` to what is left of the current deadline
+
+    Raises:
+        DeadlineExceededError: When the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceededError("http request")
+    return min(timeout, left)
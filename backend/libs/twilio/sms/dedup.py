@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .config import TwilioConfig, VerificationDedupPolicy
+from .log import get_logger
+from .storage import get_redis, mark_redis_down
+from .types import VerificationChannel, VerificationResult, VerificationStatus
+
+logger = get_logger()
+
+# Seconds between two looks at the result of a call made by another caller
+POLL_INTERVAL = 0.05
+
+# Counters reported by ``get_dedup_stats``
+CALLS = "calls"            # start_verification calls that reached Twilio
+SUPPRESSED = "suppressed"  # answered from a pending verification in the window
+COALESCED = "coalesced"    # answered by waiting for a concurrent identical call
+
+
+class _LocalDedupStore:
+    """In-process dedup state used when Redis is unreachable"""
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[str, float]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value, expires_at = self._values.get(key, (None, 0.0))
+            if value is not None and expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: float, nx: bool = False) -> bool:
+        with self._lock:
+            current, expires_at = self._values.get(key, (None, 0.0))
+            if nx and current is not None and expires_at > time.monotonic():
+                return False
+            self._values[key] = (value, time.monotonic() + ttl)
+            return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def incr(self, name: str, field: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, {})
+            stats[field] = stats.get(field, 0) + 1
+
+    def stats(self, name: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats.get(name, {}))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._stats.clear()
+
+
+class _RedisDedupStore:
+    """Dedup state shared by every worker through Redis"""
+
+    def __init__(self, redis: Any):
+        self.redis = redis
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.redis.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl: float, nx: bool = False) -> bool:
+        return bool(self.redis.set(key, value, px=int(ttl * 1000), nx=nx))
+
+    def delete(self, *keys: str) -> None:
+        self.redis.delete(*keys)
+
+    def incr(self, name: str, field: str) -> None:
+        self.redis.hincrby(name, field, 1)
+
+    def stats(self, name: str) -> Dict[str, int]:
+        return {
+            (key.decode() if isinstance(key, bytes) else key): int(value)
+            for key, value in (self.redis.hgetall(name) or {}).items()
+        }
+
+
+# Shared by all deduplicators of the process, so the fallback still coalesces
+# concurrent calls made from different threads
+_local = _LocalDedupStore()
+
+
+class VerificationDeduplicator:
+    """Suppress and coalesce repeated ``start_verification`` calls
+
+    The first call for a number and channel takes a short-lived lock, calls
+    Twilio and keeps a pending result for ``policy.window`` seconds; identical
+    calls made meanwhile return that result instead of sending another code.
+    Callers arriving while the first call is in flight wait for its result
+    for up to ``policy.wait_timeout`` seconds, then call Twilio themselves.
+    State lives in Redis so the window spans every worker; when Redis is down
+    it falls back to this process.
+    """
+
+    def __init__(self, policy: VerificationDedupPolicy, account_sid: str, service_sid: str):
+        self.policy = policy
+        self.account_sid = account_sid
+        self.service_sid = service_sid
+
+    def start(
+        self,
+        phone_number: str,
+        channel: VerificationChannel,
+        call: Callable[[], VerificationResult]
+    ) -> VerificationResult:
+        """Return the pending verification of ``phone_number`` or start one with ``call``"""
+        key = self._key(phone_number, channel)
+        give_up_at = time.monotonic() + self.policy.wait_timeout
+        waited = False
+        while True:
+            cached, leader = self._lookup(key)
+            if cached is not None:
+                return self._reuse(cached, waited)
+            if leader or time.monotonic() >= give_up_at:
+                return self._lead(key, leader, call)
+            waited = True
+            time.sleep(POLL_INTERVAL)
+
+    async def async_start(
+        self,
+        phone_number: str,
+        channel: VerificationChannel,
+        call: Callable[[], Awaitable[VerificationResult]]
+    ) -> VerificationResult:
+        """Async counterpart of ``start``"""
+        key = self._key(phone_number, channel)
+        give_up_at = time.monotonic() + self.policy.wait_timeout
+        waited = False
+        while True:
+            cached, leader = self._lookup(key)
+            if cached is not None:
+                return self._reuse(cached, waited)
+            if leader or time.monotonic() >= give_up_at:
+                try:
+                    return self._store(key, await call())
+                finally:
+                    if leader:
+                        self._run(lambda store: store.delete(f"{key}:lock"))
+            waited = True
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def forget(self, phone_number: str) -> None:
+        """Drop the pending verifications of a number, e.g. once it is approved"""
+        keys = [self._key(phone_number, channel) for channel in VerificationChannel]
+        self._run(lambda store: store.delete(*keys))
+
+    def stats(self) -> Dict[str, int]:
+        """Return the calls, suppressed and coalesced counters of this service"""
+        stats = {CALLS: 0, SUPPRESSED: 0, COALESCED: 0}
+        stats.update(self._run(lambda store: store.stats(self._stats_key())))
+        return stats
+
+    def _lookup(self, key: str) -> Tuple[Optional[VerificationResult], bool]:
+        """Return the cached result, or whether the lock to make the call was taken"""
+        cached = self._run(lambda store: store.get(key))
+        if cached is not None:
+            return VerificationResult.model_validate_json(cached), False
+        return None, self._run(lambda store: store.set(f"{key}:lock", "1", self.policy.lock_timeout, nx=True))
+
+    def _lead(self, key: str, leader: bool, call: Callable[[], VerificationResult]) -> VerificationResult:
+        """Make the Twilio call and publish its result to waiting callers"""
+        try:
+            # Published before the lock goes, or a waiter could take it and call again
+            return self._store(key, call())
+        finally:
+            if leader:
+                self._run(lambda store: store.delete(f"{key}:lock"))
+
+    def _store(self, key: str, result: VerificationResult) -> VerificationResult:
+        self._count(CALLS)
+        if result.success and result.status == VerificationStatus.PENDING:
+            self._run(lambda store: store.set(key, result.model_dump_json(), self.policy.window))
+        return result
+
+    def _reuse(self, result: VerificationResult, waited: bool) -> VerificationResult:
+        self._count(COALESCED if waited else SUPPRESSED)
+        logger.info(
+            "Reusing pending verification",
+            phone_number=result.to,
+            reason=COALESCED if waited else SUPPRESSED,
+        )
+        return result
+
+    def _count(self, field: str) -> None:
+        self._run(lambda store: store.incr(self._stats_key(), field))
+
+    def _key(self, phone_number: str, channel: VerificationChannel) -> str:
+        # Hashed so phone numbers do not end up in Redis key names
+        digest = hashlib.sha256(phone_number.encode()).hexdigest()[:32]
+        return f"{self.policy.key_prefix}:{self.account_sid}:{self.service_sid}:{digest}:{channel.value}"
+
+    def _stats_key(self) -> str:
+        return f"{self.policy.key_prefix}:{self.account_sid}:{self.service_sid}:stats"
+
+    def _run(self, func: Any) -> Any:
+        """Run ``func`` against Redis, or against local state when Redis is down"""
+        redis = get_redis()
+        if redis is not None:
+            try:
+                return func(_RedisDedupStore(redis))
+            except Exception as e:
+                mark_redis_down(e)
+        return func(_local)
+
+
+def get_deduplicator(config: TwilioConfig) -> Optional[VerificationDeduplicator]:
+    """Return the deduplicator of a config, or None when dedup is disabled"""
+    if config.verification_dedup is None:
+        return None
+    service = "local" if config.local_otp is not None else config.service_sid
+    if not service:
+        return None
+    return VerificationDeduplicator(config.verification_dedup, config.account_sid, service)
+
+
+def get_dedup_stats(config: TwilioConfig) -> Dict[str, int]:
+    """Return how many start_verification calls reached Twilio, were suppressed or coalesced
+
+    Args:
+        config: TwilioConfig with ``verification_dedup`` set
+
+    Returns:
+        Counters keyed by ``calls``, ``suppressed`` and ``coalesced``, empty
+        when dedup is disabled
+    """
+    deduplicator = get_deduplicator(config)
+    return deduplicator.stats() if deduplicator is not None else {}
+
+
+def reset_dedup_state() -> None:
+    """Forget the in-process fallback state (tests)"""
+    _local.clear()
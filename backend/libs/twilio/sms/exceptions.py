@@ -35,8 +35,9 @@ class VerificationFailedError(TwilioError):
 class TwilioAPIError(TwilioError):
     """Raised when Twilio API returns an error"""
 
-    def __init__(self, message: str, twilio_code: str):
+    def __init__(self, message: str, twilio_code: str, status: Optional[int] = None):
         self.twilio_code = twilio_code
+        self.status = status
         super().__init__(f"Twilio API Error: {message}", code="TWILIO_API_ERROR")
 
 
@@ -46,3 +47,51 @@ class RateLimitError(TwilioError):
     def __init__(self, message: str, retry_after: int):
         self.retry_after = retry_after
         super().__init__(f"Rate limit exceeded: {message}", code="RATE_LIMIT_EXCEEDED")
+
+
+class ThrottledError(TwilioError):
+    """Raised when the client-side rate limiter has no token available"""
+
+    def __init__(self, bucket: str, retry_after: float):
+        self.bucket = bucket
+        self.retry_after = retry_after
+        super().__init__(f"Outbound rate limit reached for {bucket}", code="THROTTLED")
+
+
+class CircuitOpenError(TwilioError):
+    """Raised when calls are short-circuited because Twilio is failing"""
+
+    def __init__(self, operation: str, retry_after: float):
+        self.operation = operation
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for {operation}", code="CIRCUIT_OPEN")
+
+
+class DeadlineExceededError(TwilioError):
+    """Raised when a call's time budget runs out before Twilio answered"""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        super().__init__(f"Deadline exceeded for {operation}", code="DEADLINE_EXCEEDED")
+
+
+class OutboxUnavailableError(TwilioError):
+    """Raised when a message cannot be queued because Redis is unreachable"""
+
+    def __init__(self, message: str):
+        super().__init__(f"Outbox unavailable: {message}", code="OUTBOX_UNAVAILABLE")
+
+
+class OTPUnavailableError(TwilioError):
+    """Raised when local verification codes cannot be stored or checked"""
+
+    def __init__(self, message: str):
+        super().__init__(f"Local OTP unavailable: {message}", code="OTP_UNAVAILABLE")
+
+
+class UnsupportedChannelError(TwilioError):
+    """Raised when a verification backend cannot send codes over a channel"""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        super().__init__(f"Unsupported verification channel: {channel}", code="UNSUPPORTED_CHANNEL")
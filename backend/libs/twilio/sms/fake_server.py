@@ -0,0 +1,210 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, cast
+from urllib.parse import parse_qsl, urlsplit
+
+from .config import TwilioConfig
+
+# (http status, twilio error code, response headers)
+InjectedError = Tuple[int, int, Dict[str, str]]
+
+_ROUTES = [
+    ("POST", re.compile(r"^/2010-04-01/Accounts/(?P<account>\w+)/Messages\.json$"), "_create_message"),
+    ("POST", re.compile(r"^/v2/Services$"), "_create_service"),
+    ("GET", re.compile(r"^/v2/Services/(?P<service>\w+)$"), "_fetch_service"),
+    ("POST", re.compile(r"^/v2/Services/(?P<service>\w+)/Verifications$"), "_create_verification"),
+    ("POST", re.compile(r"^/v2/Services/(?P<service>\w+)/VerificationCheck$"), "_check_verification"),
+]
+
+
+class FakeTwilioServer:
+    """Local HTTP server answering like the Twilio Messages and Verify APIs
+
+    Point a ``TwilioConfig`` at it through ``api_base_url`` (see ``config()``)
+    to exercise the library end to end without credentials or network. The
+    server is threaded and keeps connections alive, so pooling behaves as it
+    does against the real API::
+
+        with FakeTwilioServer(latency=0.05) as server:
+            server.errors.append((429, 20429, {"Retry-After": "1"}))
+            send_sms(server.config(), "+14155552671", "Hello")
+
+    Attributes:
+        latency: Seconds every answer is delayed by
+        approved_code: Verification code approved by VerificationCheck
+        errors: Errors answered, in order, to the next requests
+        error_rate: Probability of answering any request with ``error``
+        error: Error answered at ``error_rate``
+        requests: ``(method, path, form)`` of every request received
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        approved_code: str = "123456",
+        error_rate: float = 0.0,
+        error: InjectedError = (429, 20429, {"Retry-After": "1"}),
+    ):
+        self.latency = latency
+        self.approved_code = approved_code
+        self.errors: List[InjectedError] = []
+        self.error_rate = error_rate
+        self.error = error
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        # An AF_INET server address, never the bytes of a Unix socket path
+        host, port = cast(Tuple[str, int], self._httpd.server_address[:2])
+        return f"http://{host}:{port}"
+
+    def config(self, **overrides: Any) -> TwilioConfig:
+        """Return a TwilioConfig pointed at this server"""
+        fields = {
+            "account_sid": "AC" + "0" * 32,
+            "auth_token": "fake_auth_token",
+            "from_number": "+15005550006",
+            "service_sid": "VA" + "0" * 32,
+            "api_base_url": self.base_url,
+        }
+        fields.update(overrides)
+        return TwilioConfig(**fields)
+
+    def start(self) -> "FakeTwilioServer":
+        """Serve requests from a background thread"""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, name="fake-twilio", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeTwilioServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def handle(self, method: str, path: str, form: Dict[str, str]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Answer one request with ``(status, json body, headers)``"""
+        with self._lock:
+            self.requests.append((method, path, form))
+            injected = self.errors.pop(0) if self.errors else None
+        if injected is None and self.error_rate and random.random() < self.error_rate:  # nosec B311
+            injected = self.error
+        if self.latency:
+            time.sleep(self.latency)
+        if injected is not None:
+            status, code, headers = injected
+            return status, _error(status, code, "Injected error"), headers
+
+        for route_method, pattern, name in _ROUTES:
+            match = pattern.match(path)
+            if match and route_method == method:
+                status, body = getattr(self, name)(form, **match.groupdict())
+                return status, body, {}
+        return 404, _error(404, 20404, "The requested resource was not found"), {}
+
+    def _create_message(self, form: Dict[str, str], account: str) -> Tuple[int, Dict[str, Any]]:
+        return 201, {
+            "sid": _sid("SM"),
+            "account_sid": account,
+            "status": "queued",
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "messaging_service_sid": form.get("MessagingServiceSid"),
+            "body": form.get("Body"),
+            "num_segments": "1",
+            "direction": "outbound-api",
+        }
+
+    def _create_service(self, form: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        return 201, {"sid": _sid("VA"), "friendly_name": form.get("FriendlyName"), "code_length": 6}
+
+    def _fetch_service(self, form: Dict[str, str], service: str) -> Tuple[int, Dict[str, Any]]:
+        return 200, {"sid": service, "friendly_name": "Fake service", "code_length": 6}
+
+    def _create_verification(self, form: Dict[str, str], service: str) -> Tuple[int, Dict[str, Any]]:
+        return 201, {
+            "sid": _sid("VE"),
+            "service_sid": service,
+            "to": form.get("To"),
+            "channel": form.get("Channel"),
+            "status": "pending",
+            "valid": False,
+        }
+
+    def _check_verification(self, form: Dict[str, str], service: str) -> Tuple[int, Dict[str, Any]]:
+        approved = form.get("Code") == self.approved_code
+        return 200, {
+            "sid": _sid("VE"),
+            "service_sid": service,
+            "to": form.get("To"),
+            "status": "approved" if approved else "pending",
+            "valid": approved,
+        }
+
+
+def _handler_for(server: FakeTwilioServer) -> type:
+    """Build the request handler class bound to ``server``"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_GET(self) -> None:
+            self._answer("GET")
+
+        def do_POST(self) -> None:
+            self._answer("POST")
+
+        def _answer(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            form = dict(parse_qsl(self.rfile.read(length).decode())) if length else {}
+            status, body, headers = server.handle(method, urlsplit(self.path).path, form)
+            payload = json.dumps(body).encode()
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # the client timed out and went away
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def _sid(prefix: str) -> str:
+    return prefix + uuid.uuid4().hex
+
+
+def _error(status: int, code: int, message: str) -> Dict[str, Any]:
+    return {
+        "code": code,
+        "message": message,
+        "more_info": f"https://www.twilio.com/docs/errors/{code}",
+        "status": status,
+    }
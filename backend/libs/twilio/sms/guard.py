@@ -0,0 +1,108 @@
+import hashlib
+from typing import Optional
+
+from .config import TwilioConfig, VerificationGuardPolicy
+from .exceptions import TokenExpiredError, VerificationFailedError
+from .log import get_logger
+from .storage import get_redis, mark_redis_down
+
+logger = get_logger()
+
+
+class VerificationGuard:
+    """Reject verification checks that Twilio would turn down anyway
+
+    Every verification started through ``start_verification`` leaves a
+    ``<prefix>:<account>:<service>:<phone hash>`` counter in Redis for
+    ``policy.ttl`` seconds. ``before_check`` then refuses, without calling
+    Twilio, codes of the wrong shape, numbers with no such counter and numbers
+    that used up their ``max_attempts`` checks. Resends keep the counter, so
+    asking for a new code does not reset the attempts.
+
+    Redis holds the only record of which numbers have a pending verification,
+    so when it is unreachable only the code format is checked and the rest is
+    left to Twilio.
+    """
+
+    def __init__(self, policy: VerificationGuardPolicy, account_sid: str, service_sid: str):
+        self.policy = policy
+        self.account_sid = account_sid
+        self.service_sid = service_sid
+
+    def register(self, phone_number: str) -> None:
+        """Record a verification started for ``phone_number``"""
+        key = self._key(phone_number)
+        ttl = int(self.policy.ttl * 1000)
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            pipe = redis.pipeline()
+            pipe.set(key, 0, px=ttl, nx=True)
+            pipe.pexpire(key, ttl)
+            pipe.execute()
+        except Exception as e:
+            mark_redis_down(e)
+
+    def before_check(self, phone_number: str, code: str) -> None:
+        """Count a check attempt, or refuse it
+
+        Raises:
+            VerificationFailedError: If the code is malformed or the number
+                used up its attempts
+            TokenExpiredError: If no verification is pending for the number
+        """
+        if len(code) != self.policy.code_length or not code.isdigit():
+            logger.info("Rejected malformed verification code", phone_number=phone_number)
+            raise VerificationFailedError("malformed code")
+
+        attempts = self._count_attempt(phone_number)
+        if attempts is None:
+            return
+        if attempts == 0:
+            logger.info("Rejected check without pending verification", phone_number=phone_number)
+            raise TokenExpiredError()
+        if attempts > self.policy.max_attempts:
+            logger.warn("Rejected check past max attempts", phone_number=phone_number, attempts=attempts)
+            raise VerificationFailedError("too many attempts")
+
+    def clear(self, phone_number: str) -> None:
+        """Forget the pending verification of a number once it is settled"""
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            redis.delete(self._key(phone_number))
+        except Exception as e:
+            mark_redis_down(e)
+
+    def _count_attempt(self, phone_number: str) -> Optional[int]:
+        """Return the attempt number of this check, 0 when nothing is pending, None when unknown"""
+        key = self._key(phone_number)
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            pipe = redis.pipeline()
+            pipe.exists(key)
+            pipe.incr(key)
+            pending, attempts = pipe.execute()
+            if not pending:
+                redis.delete(key)  # drop the counter the INCR just created
+                return 0
+        except Exception as e:
+            mark_redis_down(e)
+            return None
+        return int(attempts)
+
+    def _key(self, phone_number: str) -> str:
+        # Hashed so phone numbers do not end up in Redis key names
+        digest = hashlib.sha256(phone_number.encode()).hexdigest()[:32]
+        return f"{self.policy.key_prefix}:{self.account_sid}:{self.service_sid}:{digest}"
+
+
+def get_guard(config: TwilioConfig) -> Optional[VerificationGuard]:
+    """Return the verification guard of a config, or None when it is disabled"""
+    if config.verification_guard is None or not config.service_sid:
+        return None
+    return VerificationGuard(config.verification_guard, config.account_sid, config.service_sid)
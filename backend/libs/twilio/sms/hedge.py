@@ -0,0 +1,201 @@
+"""Hedged Verify checks
+
+With ``config.check_hedging``, ``TwilioVerifyBackend`` sends a Verify check a
+second time when the first is slower than nearly all recent checks, and
+returns the first success. Checking the same code twice is safe: a wrong code
+stays wrong and a right one approves the verification once, the other check
+then failing with "not found".
+
+Sync checks and their hedges run in a shared thread pool. The caller waits
+on them with the hedge delay as timeout and returns the first success, so no
+thread is started per check. Latencies are measured from when a check starts
+running, so a queue in the pool does not make Twilio look slow. Async checks
+race the same way on the event loop.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, TypeVar
+
+from . import metrics
+from .config import CheckHedgingPolicy, TwilioConfig
+from .log import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+OPERATION = "create_verification_check"
+
+# Threads running sync checks; every check in flight holds one, two when hedged
+MAX_HEDGE_THREADS = 32
+
+
+class CheckHedger:
+    """Runs Verify checks, hedging the slow ones
+
+    The hedge delay is the ``policy.percentile`` latency of the last
+    ``policy.window`` checks and hedges are counted over the same window,
+    both per process. Use ``get_check_hedger`` so they are shared.
+    """
+
+    def __init__(self, policy: CheckHedgingPolicy):
+        self.policy = policy
+        self._latencies: Deque[float] = deque(maxlen=policy.window)
+        self._checks: Deque[bool] = deque(maxlen=policy.window)  # whether each check was hedged
+        self._lock = threading.Lock()
+        self._background: Set[asyncio.Task] = set()
+
+    def delay(self) -> float:
+        """Seconds to wait for a check before hedging it"""
+        policy = self.policy
+        with self._lock:
+            if len(self._latencies) < policy.min_samples:
+                return policy.max_delay
+            latencies = sorted(self._latencies)
+        latency = latencies[min(len(latencies) - 1, int(policy.percentile * len(latencies)))]
+        return min(max(latency, policy.min_delay), policy.max_delay)
+
+    def call(self, check: Callable[[], T]) -> T:
+        """Run ``check``, running it a second time when the first is slow
+
+        Returns:
+            Result of the first run to succeed
+
+        Raises:
+            Exception: Error of the first run when no run succeeded
+        """
+        futures = [self._submit(check)]
+        done, _ = wait(futures, timeout=self.delay())
+        if not self._may_hedge(slow=not done):
+            return futures[0].result()
+        futures.append(self._submit(check))
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._settled(won=future is futures[1])
+                    return future.result()
+        self._settled(won=False)
+        return futures[0].result()
+
+    async def async_call(self, check: Callable[[], Awaitable[T]]) -> T:
+        """Async counterpart of ``call``"""
+        tasks = [asyncio.ensure_future(self._async_timed(check))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay())
+            if not self._may_hedge(slow=not done):
+                return await tasks[0]
+            tasks.append(asyncio.ensure_future(self._async_timed(check)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._settled(won=task is tasks[1])
+                        return task.result()
+            self._settled(won=False)
+            return tasks[0].result()
+        finally:
+            # The losing check still answers; let it finish and be measured
+            for task in tasks:
+                if not task.done():
+                    self._background.add(task)
+                    task.add_done_callback(self._forget)
+
+    def _may_hedge(self, slow: bool) -> bool:
+        """Tell whether a check is to be hedged, counting it in the hedge rate"""
+        with self._lock:
+            allowed = slow and sum(self._checks) < self.policy.max_hedge_rate * (len(self._checks) + 1)
+            self._checks.append(allowed)
+        if not slow:
+            return False
+        if allowed:
+            logger.debug("Verification check slower than usual, hedging")
+        else:
+            metrics.record_hedge(OPERATION, "capped")
+        return allowed
+
+    def _settled(self, won: bool) -> None:
+        metrics.record_hedge(OPERATION, "won" if won else "lost")
+
+    def _submit(self, check: Callable[[], T]) -> "Future[T]":
+        context = contextvars.copy_context()  # carries deadline() into the pool
+        return _get_executor().submit(context.run, self._timed, check)
+
+    def _timed(self, check: Callable[[], T]) -> T:
+        started_at = time.monotonic()
+        try:
+            return check()
+        finally:
+            self._record(time.monotonic() - started_at)
+
+    async def _async_timed(self, check: Callable[[], Awaitable[T]]) -> T:
+        started_at = time.monotonic()
+        try:
+            return await check()
+        finally:
+            self._record(time.monotonic() - started_at)
+
+    def _record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # retrieved so asyncio does not report it
+
+
+_hedgers: Dict[TwilioConfig, CheckHedger] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_check_hedger(config: TwilioConfig) -> Optional[CheckHedger]:
+    """Return the shared hedger of a config, or None when checks are not hedged"""
+    if config.check_hedging is None:
+        return None
+    hedger = _hedgers.get(config)
+    if hedger is None:
+        with _lock:
+            hedger = _hedgers.get(config)
+            if hedger is None:
+                hedger = _hedgers[config] = CheckHedger(config.check_hedging)
+    return hedger
+
+
+def reset_check_hedgers() -> None:
+    """Drop every shared hedger and its latency window (tests, reloads)"""
+    with _lock:
+        _hedgers.clear()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_HEDGE_THREADS, thread_name_prefix="verify-hedge")
+    return _executor
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's hedgers and pool in a forked child (e.g. gunicorn workers)
+
+    The pool's threads do not survive the fork, and the lock may have been
+    held by one of them.
+    """
+    global _lock, _executor
+    _lock = threading.Lock()
+    _executor = None
+    _hedgers.clear()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no cover
+    os.register_at_fork(after_in_child=_reset_after_fork)
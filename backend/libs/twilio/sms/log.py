@@ -0,0 +1,136 @@
+"""Logging policy of the Twilio SMS library
+
+Every module logs through ``get_logger()``, a thin wrapper over structlog
+that:
+
+- drops events below the library level (``configure_logging(level=...)``,
+  nothing is dropped until it is called) before structlog builds anything,
+  so disabled debug events cost one comparison;
+- samples high-volume success events logged with ``sampled()``, adding the
+  rate to the event so counts can be scaled back up;
+- masks phone numbers and secrets in event fields, including numbers quoted
+  in error messages, memoizing masked numbers since the same ones keep
+  coming back.
+
+``mask_processor`` applies the same masking as a structlog processor, for
+applications that want it on their own events too.
+"""
+import logging
+import random
+import re
+from functools import lru_cache
+from typing import Any, MutableMapping, Optional, Union
+
+import structlog
+from pydantic import BaseModel
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+# Fields replaced by a placeholder whatever their value
+SECRET_FIELDS = frozenset({"auth_token", "secret", "otp", "password", "token"})
+# Fields holding phone numbers, of which only the country code and last digits are kept
+PHONE_FIELDS = frozenset({"phone_number", "to", "sender", "sender_id", "from_", "from_number"})
+# Fields holding free text, such as Twilio error messages, in which E.164 numbers are masked
+TEXT_FIELDS = frozenset({"error", "error_message", "reason"})
+
+_PHONE_PATTERN = re.compile(r"\+\d{8,15}")
+
+# Everything is passed on to structlog until configure_logging() sets a level
+_level = DEBUG
+_success_sample_rate = 1.0
+
+
+def configure_logging(level: Union[str, int] = "DEBUG", success_sample_rate: float = 1.0) -> None:
+    """Set the library log level and the share of success events kept
+
+    Args:
+        level: Lowest level logged (DEBUG, INFO, WARNING or ERROR, or a
+            ``logging`` level number), DEBUG leaving the filtering to structlog
+        success_sample_rate: Share of ``sampled()`` events logged, from 0 to 1
+    """
+    global _level, _success_sample_rate
+    if not 0 <= success_sample_rate <= 1:
+        raise ValueError("success_sample_rate must be between 0 and 1")
+    _level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if not isinstance(_level, int):
+        raise ValueError(f"Unknown log level: {level}")
+    _success_sample_rate = success_sample_rate
+
+
+@lru_cache(maxsize=4096)
+def mask_phone(phone_number: str) -> str:
+    """Keep the country and area prefix and the last two digits: ``+1415*****71``"""
+    if len(phone_number) <= 7:
+        return "*" * len(phone_number)
+    return phone_number[:5] + "*" * (len(phone_number) - 7) + phone_number[-2:]
+
+
+def mask_event(event_dict: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    """Mask secrets, phone numbers and whole config objects in an event, in place"""
+    for key, value in event_dict.items():
+        if value is None:
+            continue
+        if key in SECRET_FIELDS:
+            event_dict[key] = "***"
+        elif key in PHONE_FIELDS and isinstance(value, str) and value.startswith("+"):
+            event_dict[key] = mask_phone(value)
+        elif isinstance(value, BaseModel):
+            # Models such as TwilioConfig carry credentials; log what identifies them
+            event_dict[key] = f"{type(value).__name__}({getattr(value, 'account_sid', '...')})"
+        elif isinstance(value, BaseException) or (key in TEXT_FIELDS and isinstance(value, str)):
+            event_dict[key] = _PHONE_PATTERN.sub(lambda match: mask_phone(match.group()), str(value))
+    return event_dict
+
+
+def mask_processor(logger: Any, method_name: str, event_dict: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+    """structlog processor applying ``mask_event``"""
+    return mask_event(event_dict)
+
+
+class TwilioLogger:
+    """structlog logger filtered, sampled and masked by the library policy"""
+
+    def __init__(self, logger: Optional[Any] = None):
+        self._logger = logger if logger is not None else structlog.get_logger()
+
+    @staticmethod
+    def is_enabled(level: int) -> bool:
+        """Tell whether events at ``level`` are logged, to skip building costly fields"""
+        return level >= _level
+
+    def debug(self, event: str, **fields: Any) -> None:
+        if _level <= DEBUG:
+            self._logger.debug(event, **mask_event(fields))
+
+    def info(self, event: str, **fields: Any) -> None:
+        if _level <= INFO:
+            self._logger.info(event, **mask_event(fields))
+
+    def warning(self, event: str, **fields: Any) -> None:
+        if _level <= WARNING:
+            self._logger.warning(event, **mask_event(fields))
+
+    warn = warning
+
+    def error(self, event: str, **fields: Any) -> None:
+        if _level <= ERROR:
+            self._logger.error(event, **mask_event(fields))
+
+    def sampled(self, event: str, **fields: Any) -> None:
+        """Log a high-volume success event at info level, ``success_sample_rate`` of the time"""
+        if _level > INFO:
+            return
+        rate = _success_sample_rate
+        if rate < 1:
+            if random.random() >= rate:  # nosec B311
+                return
+            fields["sample_rate"] = rate
+        self._logger.info(event, **mask_event(fields))
+
+
+def get_logger() -> TwilioLogger:
+    """Return a logger following the library policy"""
+    return TwilioLogger()
@@ -0,0 +1,142 @@
+"""Prometheus metrics of the Twilio calls
+
+Recorded around every ``TwilioClient`` / ``AsyncTwilioClient`` operation
+(``send_message``, ``create_verification``, ``create_verification_check``):
+
+- ``twilio_request_duration_seconds``: latency histogram per operation,
+  retries and waits included
+- ``twilio_requests_total``: calls per operation and outcome, ``success`` or
+  the mapped error code (``RATE_LIMIT_EXCEEDED``, ``TWILIO_API_ERROR``, ...)
+- ``twilio_retries_total``: retries per operation and error code
+- ``twilio_requests_in_progress``: calls in flight per operation
+- ``twilio_hedges_total``: slow calls per operation and outcome of their
+  hedge, ``won`` (the hedge's answer was used), ``lost`` (the first call's was)
+  or ``capped`` (not hedged, over ``max_hedge_rate``)
+
+Under gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` so every worker writes its
+samples there and ``collect()`` aggregates them; the directory is created on
+import when missing. Metrics are skipped when
+``prometheus_client`` is not installed.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from .exceptions import TwilioError
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    )
+    from prometheus_client import multiprocess
+    _available = True
+except ImportError:  # pragma: no cover
+    _available = False
+
+SUCCESS = "success"
+
+# Verify and Messages calls usually take 100-500ms; the tail covers retries
+# up to the default 15s deadline
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0, 15.0)
+
+if _available:
+    _multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if _multiproc_dir:
+        # gunicorn.conf.py empties it before the workers start; other processes
+        # (management commands, the outbox worker) may find it missing
+        os.makedirs(_multiproc_dir, exist_ok=True)
+
+    REQUEST_DURATION = Histogram(
+        "twilio_request_duration_seconds",
+        "Duration of Twilio operations, retries included",
+        ["operation"],
+        buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS = Counter(
+        "twilio_requests",
+        "Twilio operations by outcome (success or error code)",
+        ["operation", "outcome"],
+    )
+    RETRIES = Counter(
+        "twilio_retries",
+        "Retried Twilio attempts by error code",
+        ["operation", "code"],
+    )
+    IN_PROGRESS = Gauge(
+        "twilio_requests_in_progress",
+        "Twilio operations in flight",
+        ["operation"],
+        multiprocess_mode="livesum",
+    )
+    HEDGES = Counter(
+        "twilio_hedges",
+        "Slow Twilio operations by outcome of their hedge",
+        ["operation", "outcome"],
+    )
+
+
+def enabled() -> bool:
+    """Tell whether prometheus_client is installed"""
+    return _available
+
+
+@contextmanager
+def track(operation: str) -> Iterator[None]:
+    """Record the latency, outcome and concurrency of the operation run in the block"""
+    if not _available:
+        yield
+        return
+    in_progress = IN_PROGRESS.labels(operation)
+    in_progress.inc()
+    outcome = SUCCESS
+    started_at = time.perf_counter()
+    try:
+        yield
+    except TwilioError as e:
+        outcome = e.code or type(e).__name__
+        raise
+    except Exception:
+        outcome = "UNKNOWN_ERROR"
+        raise
+    finally:
+        REQUEST_DURATION.labels(operation).observe(time.perf_counter() - started_at)
+        REQUESTS.labels(operation, outcome).inc()
+        in_progress.dec()
+
+
+def record_retry(operation: str, code: Optional[str]) -> None:
+    """Count an attempt that failed and is about to be retried"""
+    if _available:
+        RETRIES.labels(operation, code or "UNKNOWN_ERROR").inc()
+
+
+def record_hedge(operation: str, outcome: str) -> None:
+    """Count a call slow enough to be hedged and how the hedge went"""
+    if _available:
+        HEDGES.labels(operation, outcome).inc()
+
+
+def collect() -> Tuple[bytes, str]:
+    """Render every metric of the process, or of all workers in multiprocess mode
+
+    Returns:
+        Exposition payload and its content type
+
+    Raises:
+        RuntimeError: If prometheus_client is not installed
+    """
+    if not _available:
+        raise RuntimeError("prometheus_client is not installed")
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a dead worker (gunicorn ``child_exit`` hook)"""
+    if _available and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,305 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import OutboxPolicy, TwilioConfig
+from .exceptions import (
+    CircuitOpenError, DeadlineExceededError, OutboxUnavailableError, ThrottledError, TwilioAPIError,
+    TwilioError,
+)
+from .log import get_logger
+from .phone import normalize_phone
+from .providers import get_sms_provider
+from .retry import is_retryable
+from .storage import REDIS_RETRY_INTERVAL, get_redis, mark_redis_down
+from .types import OutboxMessageState, OutboxStatus
+
+logger = get_logger()
+
+# (stream entry ID, entry fields, number of the attempt about to be made)
+_Entry = Tuple[str, Dict[str, str], int]
+
+
+def enqueue_sms(
+    config: TwilioConfig,
+    phone_number: str,
+    message: str,
+    sender_id: Optional[str] = None
+) -> str:
+    """Durably queue an SMS for the outbox worker and return right away
+
+    The message is appended to the ``config.outbox.stream`` Redis stream and
+    its delivery state is recorded under its own key, see ``get_outbox_state``.
+
+    Args:
+        config: TwilioConfig instance with account credentials
+        phone_number: Recipient phone number, normalized to E.164
+        message: SMS message content
+        sender_id: Optional custom sender ID (must start with +)
+
+    Returns:
+        Outbox message ID
+
+    Raises:
+        InvalidPhoneNumberError: If the phone number is not a valid number
+        OutboxUnavailableError: If Redis cannot be reached
+    """
+    phone_number = normalize_phone(phone_number)
+    policy = config.outbox
+    redis = get_redis()
+    if redis is None:
+        raise OutboxUnavailableError("Redis is unavailable")
+
+    message_id = uuid.uuid4().hex
+    now = time.time()
+    key = _state_key(policy, message_id)
+    try:
+        pipe = redis.pipeline()
+        pipe.hset(key, mapping={
+            "status": OutboxStatus.QUEUED.value,
+            "to": phone_number,
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        })
+        pipe.expire(key, policy.state_ttl)
+        pipe.xadd(policy.stream, {
+            "id": message_id,
+            "to": phone_number,
+            "body": message,
+            "sender_id": sender_id or "",
+        })
+        pipe.execute()
+    except Exception as e:
+        mark_redis_down(e)
+        raise OutboxUnavailableError(str(e)) from e
+
+    logger.sampled("SMS queued", phone_number=phone_number, outbox_id=message_id)
+    return message_id
+
+
+def get_outbox_state(config: TwilioConfig, message_id: str) -> Optional[OutboxMessageState]:
+    """Return the delivery state of a queued message
+
+    Args:
+        config: TwilioConfig the message was queued with
+        message_id: ID returned by ``enqueue_sms``
+
+    Returns:
+        OutboxMessageState, or None when unknown or expired
+
+    Raises:
+        OutboxUnavailableError: If Redis cannot be reached
+    """
+    redis = get_redis()
+    if redis is None:
+        raise OutboxUnavailableError("Redis is unavailable")
+    try:
+        state = _decode(redis.hgetall(_state_key(config.outbox, message_id)))
+    except Exception as e:
+        mark_redis_down(e)
+        raise OutboxUnavailableError(str(e)) from e
+    if not state:
+        return None
+    state.pop("next_attempt_at", None)
+    return OutboxMessageState(id=message_id, **{name: value for name, value in state.items() if value})
+
+
+class OutboxWorker:
+    """Drain the outbox stream and send its messages through Twilio
+
+    Workers join the ``config.outbox.group`` consumer group, so any number of
+    them can run side by side; each message is delivered to one of them and
+    acknowledged once sent or failed for good. Messages are read in batches
+    and sent ``concurrency`` at a time.
+    """
+
+    def __init__(self, config: TwilioConfig, consumer: Optional[str] = None):
+        """Initialize the worker
+
+        Args:
+            config: TwilioConfig used to send the messages
+            consumer: Consumer name within the group (defaults to host-pid)
+        """
+        self.config = config
+        self.policy = config.outbox
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.policy.concurrency, thread_name_prefix="sms-outbox"
+        )
+        self._group_ready = False
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Process batches until ``stop`` is set
+
+        Redis failures are logged and retried after a pause instead of
+        stopping the worker.
+        """
+        logger.info("Starting SMS outbox worker", consumer=self.consumer, stream=self.policy.stream)
+        try:
+            while stop is None or not stop.is_set():
+                try:
+                    self.process_batch()
+                except OutboxUnavailableError as e:
+                    logger.warn("SMS outbox unavailable", error=str(e))
+                    time.sleep(REDIS_RETRY_INTERVAL)
+        finally:
+            self.close()
+
+    def process_batch(self, block: Optional[float] = None) -> int:
+        """Read one batch from the stream and deliver its due messages
+
+        Args:
+            block: Seconds to wait for new messages (defaults to policy.block)
+
+        Returns:
+            Number of delivery attempts made
+
+        Raises:
+            OutboxUnavailableError: If Redis cannot be reached
+        """
+        redis = get_redis()
+        if redis is None:
+            raise OutboxUnavailableError("Redis is unavailable")
+        try:
+            entries = self._read(redis, self.policy.block if block is None else block)
+            due, done = self._due(redis, entries)
+            results = list(self._executor.map(self._send, due))
+            self._record(redis, due, results, done)
+        except OutboxUnavailableError:
+            raise
+        except Exception as e:
+            if "NOGROUP" in str(e):  # stream or group was deleted, recreate it
+                self._group_ready = False
+                return 0
+            mark_redis_down(e)
+            raise OutboxUnavailableError(str(e)) from e
+        return len(due)
+
+    def close(self) -> None:
+        """Wait for in-flight sends and release the worker threads"""
+        self._executor.shutdown(wait=True)
+
+    def _read(self, redis: Any, block: float) -> List[Tuple[str, Dict[str, str]]]:
+        """Claim stale or retrying entries, then top the batch up with new ones"""
+        policy = self.policy
+        if not self._group_ready:
+            try:
+                redis.xgroup_create(policy.stream, policy.group, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+            self._group_ready = True
+
+        claimed = redis.xautoclaim(
+            policy.stream, policy.group, self.consumer,
+            min_idle_time=int(policy.retry_delay * 1000), start_id="0-0", count=policy.batch_size,
+        )
+        entries = [(entry_id, fields) for entry_id, fields in claimed[1] if fields]
+        if len(entries) < policy.batch_size:
+            response = redis.xreadgroup(
+                policy.group, self.consumer, {policy.stream: ">"},
+                count=policy.batch_size - len(entries),
+                block=int(block * 1000) if block and not entries else None,
+            )
+            for _, stream_entries in response or []:
+                entries.extend(stream_entries)
+        return [(_str(entry_id), _decode(fields)) for entry_id, fields in entries]
+
+    def _due(self, redis: Any, entries: List[Tuple[str, Dict[str, str]]]) -> Tuple[List[_Entry], List[str]]:
+        """Split entries into those to send now and those already settled"""
+        pipe = redis.pipeline()
+        for _, fields in entries:
+            pipe.hgetall(_state_key(self.policy, fields.get("id", "")))
+        states = [_decode(state) for state in pipe.execute()] if entries else []
+
+        now = time.time()
+        due: List[_Entry] = []
+        done: List[str] = []
+        for (entry_id, fields), state in zip(entries, states):
+            if not state or state.get("status") in (OutboxStatus.SENT.value, OutboxStatus.FAILED.value):
+                done.append(entry_id)
+            elif float(state.get("next_attempt_at") or 0) <= now:
+                due.append((entry_id, fields, int(state.get("attempts") or 0) + 1))
+        return due, done
+
+    def _send(self, entry: _Entry) -> Tuple[Optional[Dict[str, Any]], Optional[TwilioError]]:
+        """Send one entry, returning the Twilio response or the error raised"""
+        _, fields, _ = entry
+        try:
+            response = get_sms_provider(self.config).send(fields["to"], fields["body"], fields.get("sender_id") or None)
+        except TwilioError as e:
+            return None, e
+        except Exception as e:
+            # Failing this attempt alone: the batch's other sends went out and must be recorded
+            logger.error("Unexpected error sending SMS", outbox_id=fields["id"], error=str(e))
+            return None, TwilioAPIError(f"Unexpected error: {e}", "UNKNOWN")
+        return response, None
+
+    def _record(
+        self,
+        redis: Any,
+        due: List[_Entry],
+        results: List[Tuple[Optional[Dict[str, Any]], Optional[TwilioError]]],
+        done: List[str],
+    ) -> None:
+        """Store the outcome of each attempt and acknowledge settled entries"""
+        policy = self.policy
+        now = time.time()
+        counts = {status: 0 for status in OutboxStatus}
+        pipe = redis.pipeline()
+        for (entry_id, fields, attempts), (response, error) in zip(due, results):
+            key = _state_key(policy, fields["id"])
+            if error is None:
+                status = OutboxStatus.SENT
+                pipe.hset(key, mapping={"status": status.value, "attempts": attempts,
+                                        "message_sid": (response or {}).get("sid") or "", "updated_at": now})
+                pipe.hdel(key, "error_code", "error_message", "next_attempt_at")
+                done.append(entry_id)
+            else:
+                status = OutboxStatus.RETRYING if self._should_retry(error, attempts) else OutboxStatus.FAILED
+                mapping = {"status": status.value, "attempts": attempts, "error_code": error.code or "",
+                           "error_message": str(error), "updated_at": now}
+                if status == OutboxStatus.RETRYING:
+                    delay = max(policy.retry_delay * 2 ** (attempts - 1), getattr(error, "retry_after", 0) or 0)
+                    mapping["next_attempt_at"] = now + delay
+                else:
+                    done.append(entry_id)
+                pipe.hset(key, mapping=mapping)
+            counts[status] += 1
+
+        if done:
+            pipe.xack(policy.stream, policy.group, *done)
+            pipe.xdel(policy.stream, *done)
+        pipe.execute()
+        if due:
+            logger.info(
+                "SMS outbox batch processed",
+                consumer=self.consumer,
+                sent=counts[OutboxStatus.SENT],
+                retrying=counts[OutboxStatus.RETRYING],
+                failed=counts[OutboxStatus.FAILED],
+            )
+
+    def _should_retry(self, error: TwilioError, attempts: int) -> bool:
+        """Tell whether a failed message gets another attempt later"""
+        if attempts >= self.policy.max_attempts:
+            return False
+        return is_retryable(error) or isinstance(error, (ThrottledError, CircuitOpenError, DeadlineExceededError))
+
+
+def _state_key(policy: OutboxPolicy, message_id: str) -> str:
+    return f"{policy.stream}:msg:{message_id}"
+
+
+def _str(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _decode(mapping: Optional[Dict[Any, Any]]) -> Dict[str, str]:
+    """Turn a Redis hash or stream entry into a str -> str dict"""
+    return {_str(key): _str(value) for key, value in (mapping or {}).items()}
@@ -0,0 +1,68 @@
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+import phonenumbers
+
+from .exceptions import InvalidPhoneNumberError
+from .log import get_logger
+
+logger = get_logger()
+
+# Distinct (number, region) pairs kept in memory; OTP retries and resends
+# keep hitting the same few numbers, so a few thousand entries cover them.
+PHONE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def _to_e164(phone_number: str, region: Optional[str]) -> Optional[str]:
+    """Parse and validate a number, returning its E.164 form or None"""
+    try:
+        parsed = phonenumbers.parse(phone_number, region)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(parsed):
+        return None
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_phone(phone_number: str, region: Optional[str] = None) -> str:
+    """Validate a phone number and return it in E.164 format
+
+    Formatting such as spaces, dashes or parentheses is accepted, so
+    ``"+1 (415) 555-2671"`` becomes ``"+14155552671"``. Results are memoized.
+
+    Args:
+        phone_number: Number to normalize, with its + country code unless
+            ``region`` is given
+        region: ISO 3166 country code used for numbers without a + prefix
+
+    Returns:
+        Number in E.164 format
+
+    Raises:
+        InvalidPhoneNumberError: If the number cannot be parsed or is not a
+            valid number
+    """
+    normalized = _to_e164(phone_number, region)
+    if normalized is None:
+        logger.warn("Invalid phone number format", phone_number=phone_number)
+        raise InvalidPhoneNumberError(phone_number)
+    return normalized
+
+
+def normalize_many(phone_numbers: Iterable[str], region: Optional[str] = None) -> List[Optional[str]]:
+    """Normalize a batch of phone numbers, e.g. before a bulk send
+
+    Args:
+        phone_numbers: Numbers to normalize
+        region: ISO 3166 country code used for numbers without a + prefix
+
+    Returns:
+        E.164 numbers in input order, None for invalid ones
+    """
+    return [_to_e164(phone_number, region) for phone_number in phone_numbers]
+
+
+def clear_phone_cache() -> None:
+    """Empty the normalization cache"""
+    _to_e164.cache_clear()
@@ -0,0 +1,386 @@
+"""SMS providers behind ``send_sms``
+
+Every SMS of the library, queued or not, goes out through ``SMSProvider.send``.
+Without ``config.failover`` that is ``TwilioProvider``, the Messages API with
+the config's sender or sender pool. With it, ``FailoverProvider`` chains the
+providers named in the policy: other Twilio accounts or regions, another
+vendor, or ``StubProvider`` in tests, each registered once with
+``register_provider``::
+
+    register_provider("twilio-eu", lambda config: TwilioProvider(eu_config, name="twilio-eu"))
+    config = TwilioConfig(..., failover=FailoverPolicy(providers=("twilio", "twilio-eu")))
+
+Providers raise ``TwilioError`` subclasses so callers handle them alike.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from .breaker import counts_as_failure
+from .client import get_async_client, get_client
+from .config import FailoverPolicy, TwilioConfig
+from .exceptions import TwilioAPIError, TwilioError
+from .log import get_logger
+from .retry import is_retryable
+from .routing import get_sender_pool
+
+logger = get_logger()
+
+# Threads running provider calls of FailoverProvider.send with more than one
+# provider; hedged calls need one each, so keep it well above the number of
+# concurrent senders
+MAX_FAILOVER_THREADS = 64
+
+
+class SMSProvider(ABC):
+    """Something that delivers SMS messages"""
+
+    name = "provider"
+
+    @abstractmethod
+    def send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send ``body`` to ``to``
+
+        Returns:
+            Provider response with at least ``sid``, ``sender`` and ``provider``
+
+        Raises:
+            TwilioError: If the message was not accepted
+        """
+
+    @abstractmethod
+    async def async_send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        """Async counterpart of ``send``"""
+
+
+class TwilioProvider(SMSProvider):
+    """Messages API of ``config``'s account, through its sender pool when set"""
+
+    def __init__(self, config: TwilioConfig, name: str = "twilio"):
+        self.config = config
+        self.name = name
+
+    def send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        pool = get_sender_pool(self.config) if sender_id is None else None
+        if pool is not None:
+            response, route = pool.send(to, body)
+            return {**response, "sender": route.sender, "provider": self.name}
+        sender = sender_id or self.config.from_number
+        logger.debug("Sending message via TwilioClient", to=to, sender=sender)
+        response = get_client(self.config).send_message(to=to, body=body, from_=sender)
+        return {**response, "sender": sender, "provider": self.name}
+
+    async def async_send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        pool = get_sender_pool(self.config) if sender_id is None else None
+        if pool is not None:
+            response, route = await pool.async_send(to, body)
+            return {**response, "sender": route.sender, "provider": self.name}
+        sender = sender_id or self.config.from_number
+        response = await get_async_client(self.config).send_message(to=to, body=body, from_=sender)
+        return {**response, "sender": sender, "provider": self.name}
+
+
+class StubProvider(SMSProvider):
+    """Provider answering locally, for tests, benchmarks and local development
+
+    Attributes:
+        latency: Seconds every send takes
+        errors: Errors raised, in order, by the next sends
+        sent: ``(to, body)`` of every message accepted
+    """
+
+    def __init__(self, name: str = "stub", latency: float = 0.0, sender: str = "+15005550006"):
+        self.name = name
+        self.latency = latency
+        self.sender = sender
+        self.errors: List[Exception] = []
+        self.sent: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._answer(to, body, sender_id)
+
+    async def async_send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._answer(to, body, sender_id)
+
+    def _answer(self, to: str, body: str, sender_id: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            if self.errors:
+                raise self.errors.pop(0)
+            self.sent.append((to, body))
+        return {
+            "sid": "SM" + uuid.uuid4().hex,
+            "status": "queued",
+            "to": to,
+            "sender": sender_id or self.sender,
+            "provider": self.name,
+        }
+
+
+class ProviderHealth:
+    """Moving average latency of a provider, errors counting as twice the budget"""
+
+    def __init__(self, policy: FailoverPolicy):
+        self.policy = policy
+        self.score: Optional[float] = None
+        self.measured_at = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, failed: bool) -> None:
+        sample = max(latency, 2 * self.policy.latency_budget) if failed else latency
+        with self._lock:
+            alpha = self.policy.ewma_alpha
+            self.score = sample if self.score is None else alpha * sample + (1 - alpha) * self.score
+            self.measured_at = time.monotonic()
+
+    def healthy(self) -> bool:
+        """Tell whether the provider keeps its place in the chain"""
+        if self.score is None or self.score <= self.policy.latency_budget:
+            return True
+        return time.monotonic() - self.measured_at >= self.policy.probe_interval
+
+
+class FailoverProvider(SMSProvider):
+    """Chain of providers tried in turn, hedged past the latency budget
+
+    Healthy providers are tried in the order given, unhealthy ones last by
+    score. A provider failing on its side (5xx, connection errors, timeouts,
+    throttling) hands over to the next at once; errors about the message
+    itself, such as an invalid number, are raised as every provider would
+    refuse it too. A provider slower than ``latency_budget`` keeps running
+    while the next is started, and the first success wins. Scores are kept
+    per process.
+    """
+
+    name = "failover"
+
+    def __init__(self, providers: Sequence[SMSProvider], policy: FailoverPolicy):
+        self.providers = list(providers)
+        self.policy = policy
+        self._health = {provider.name: ProviderHealth(policy) for provider in self.providers}
+        self._background: Set[asyncio.Task] = set()
+
+    def send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        if len(self.providers) == 1:
+            # Nothing to hedge with, so no thread hop either
+            try:
+                return self._timed(self.providers[0], to, body, sender_id)
+            except Exception as e:
+                raise _as_twilio_error(e)
+        queue = self._order()
+        pending: Dict[Future, SMSProvider] = {}
+        # Last provider error, raised once every provider failed
+        error: TwilioError = TwilioAPIError("No SMS provider answered", "UNKNOWN")
+
+        def start() -> None:
+            provider = queue.pop(0)
+            context = contextvars.copy_context()  # carries deadline() into the thread
+            future = _get_executor().submit(context.run, self._timed, provider, to, body, sender_id)
+            pending[future] = provider
+
+        start()
+        while pending:
+            done, _ = wait(
+                pending, timeout=self.policy.latency_budget if queue else None, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                self._hedging(list(pending.values())[-1], queue[0])
+                start()
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = self._failed(provider, e, queue)
+                    if queue:
+                        start()
+        raise error
+
+    async def async_send(self, to: str, body: str, sender_id: Optional[str] = None) -> Dict[str, Any]:
+        queue = self._order()
+        pending: Dict[asyncio.Task, SMSProvider] = {}
+        # Last provider error, raised once every provider failed
+        error: TwilioError = TwilioAPIError("No SMS provider answered", "UNKNOWN")
+
+        def start() -> None:
+            provider = queue.pop(0)
+            task = asyncio.ensure_future(self._async_timed(provider, to, body, sender_id))
+            pending[task] = provider
+
+        start()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.policy.latency_budget if queue else None, return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    self._hedging(list(pending.values())[-1], queue[0])
+                    start()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        error = self._failed(provider, e, queue)
+                        if queue:
+                            start()
+            raise error
+        finally:
+            # Losing calls may still deliver; let them finish and be measured
+            for task in pending:
+                self._background.add(task)
+                task.add_done_callback(self._forget)
+
+    def health(self) -> Dict[str, Optional[float]]:
+        """Return the score of every provider, None until measured"""
+        return {name: health.score for name, health in self._health.items()}
+
+    def _order(self) -> List[SMSProvider]:
+        healthy = [provider for provider in self.providers if self._health[provider.name].healthy()]
+        slow = sorted(
+            (provider for provider in self.providers if provider not in healthy),
+            key=lambda provider: self._health[provider.name].score or 0.0,  # unhealthy ones are scored
+        )
+        return healthy + slow
+
+    def _timed(self, provider: SMSProvider, to: str, body: str, sender_id: Optional[str]) -> Dict[str, Any]:
+        started_at = time.monotonic()
+        try:
+            response = provider.send(to, body, sender_id)
+        except Exception as e:
+            failed = _fails_over(_as_twilio_error(e))
+            self._health[provider.name].record(time.monotonic() - started_at, failed=failed)
+            raise
+        self._health[provider.name].record(time.monotonic() - started_at, failed=False)
+        return response
+
+    async def _async_timed(
+        self, provider: SMSProvider, to: str, body: str, sender_id: Optional[str]
+    ) -> Dict[str, Any]:
+        started_at = time.monotonic()
+        try:
+            response = await provider.async_send(to, body, sender_id)
+        except Exception as e:
+            failed = _fails_over(_as_twilio_error(e))
+            self._health[provider.name].record(time.monotonic() - started_at, failed=failed)
+            raise
+        self._health[provider.name].record(time.monotonic() - started_at, failed=False)
+        return response
+
+    def _hedging(self, slow: SMSProvider, nxt: SMSProvider) -> None:
+        logger.warn("SMS provider over its latency budget, hedging", provider=slow.name, next_provider=nxt.name,
+                    latency_budget=self.policy.latency_budget)
+
+    def _failed(self, provider: SMSProvider, error: Exception, queue: List[SMSProvider]) -> TwilioError:
+        """Return the error to fail over from, raising it when no provider would accept the message"""
+        error = _as_twilio_error(error)
+        if not _fails_over(error):
+            raise error
+        if queue:
+            logger.warn("SMS provider failed, failing over", provider=provider.name,
+                        next_provider=queue[0].name, error=str(error))
+        return error
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()  # retrieved so asyncio does not report it
+
+
+ProviderFactory = Callable[[TwilioConfig], SMSProvider]
+
+_factories: Dict[str, ProviderFactory] = {"twilio": TwilioProvider}
+_providers: Dict[TwilioConfig, SMSProvider] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def register_provider(name: str, factory: ProviderFactory) -> None:
+    """Make a provider available to ``FailoverPolicy.providers`` under ``name``
+
+    Args:
+        name: Name used in the policy
+        factory: Builds the provider from the config sending the message
+    """
+    with _lock:
+        _factories[name] = factory
+        _providers.clear()
+
+
+def get_sms_provider(config: TwilioConfig) -> SMSProvider:
+    """Return the shared provider sending the SMS of ``config``
+
+    Raises:
+        ValueError: If the failover policy names an unregistered provider
+    """
+    provider = _providers.get(config)
+    if provider is None:
+        with _lock:
+            provider = _providers.get(config)
+            if provider is None:
+                provider = _providers[config] = _build(config)
+    return provider
+
+
+def reset_providers() -> None:
+    """Drop the shared providers and their health scores (tests, reloads)"""
+    with _lock:
+        _providers.clear()
+
+
+def _build(config: TwilioConfig) -> SMSProvider:
+    policy = config.failover
+    if policy is None:
+        return TwilioProvider(config)
+    unknown = [name for name in policy.providers if name not in _factories]
+    if unknown:
+        raise ValueError(f"Unknown SMS provider(s): {', '.join(unknown)}")
+    return FailoverProvider([_factories[name](config) for name in policy.providers], policy)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_FAILOVER_THREADS, thread_name_prefix="sms-failover")
+    return _executor
+
+
+def _fails_over(error: TwilioError) -> bool:
+    """Tell whether another provider may accept a message this one failed to send"""
+    return counts_as_failure(error) or is_retryable(error)
+
+
+def _as_twilio_error(error: Exception) -> TwilioError:
+    if isinstance(error, TwilioError):
+        return error
+    return TwilioAPIError(str(error), "UNKNOWN")
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's providers and pool in a forked child (e.g. gunicorn workers)
+
+    The pool's threads do not survive the fork, and the locks may have been
+    held by one of them.
+    """
+    global _lock, _executor
+    _lock = threading.Lock()
+    _executor = None
+    _providers.clear()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no cover
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,202 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import RateLimitPolicy
+from .deadline import remaining
+from .exceptions import ThrottledError
+from .log import get_logger
+from .storage import get_redis, mark_redis_down
+
+logger = get_logger()
+
+# Refills every bucket of KEYS (rates and bursts in ARGV, in pairs) from the
+# elapsed time, then takes one token from each only if they all have one, so
+# an empty bucket never costs the others a token. Returns the 1-based index
+# of the bucket with the longest wait (0 when tokens were taken) and, as a
+# string to keep the fraction, that wait in seconds.
+_TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local levels = {}
+local empty, wait = 0, 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local burst = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < 1 and (1 - tokens) / rate > wait then
+        empty, wait = i, (1 - tokens) / rate
+    end
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local burst = tonumber(ARGV[2 * i])
+    local tokens = levels[i]
+    if empty == 0 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+end
+return {empty, tostring(wait)}
+"""
+
+# (key, rate, burst) of a token bucket
+Bucket = Tuple[str, float, int]
+
+
+class LocalTokenBucket:
+    """In-process token buckets used when Redis is unreachable
+
+    Limits then apply per worker process instead of globally, which keeps
+    traffic flowing while still smoothing bursts.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from ``key``, returning 0 or the seconds to wait for one"""
+        return self.take_all([(key, rate, burst)])[1]
+
+    def take_all(self, buckets: Sequence[Bucket]) -> Tuple[str, float]:
+        """Take a token from every bucket if they all have one
+
+        Returns:
+            ``("", 0.0)`` when tokens were taken, else the bucket with the
+            longest wait and that wait in seconds
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            empty, wait = "", 0.0
+            for key, rate, burst in buckets:
+                tokens, updated_at = self._buckets.get(key, (float(burst), now))
+                tokens = min(burst, tokens + (now - updated_at) * rate)
+                levels.append(tokens)
+                if tokens < 1 and (1 - tokens) / rate > wait:
+                    empty, wait = key, (1 - tokens) / rate
+            for (key, _, _), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens if empty else tokens - 1, now)
+        return empty, wait
+
+
+class RateLimiter:
+    """Token-bucket rate limiter shared across workers through Redis"""
+
+    def __init__(self, policy: RateLimitPolicy):
+        self.policy = policy
+        self._local = LocalTokenBucket()
+
+    def try_acquire(self, account_sid: str, sender: Optional[str] = None) -> Tuple[str, float]:
+        """Try to take a token from every bucket that applies to the call
+
+        Tokens are taken from all the buckets or from none.
+
+        Args:
+            account_sid: Account the call is made with
+            sender: Sender number of the message, if any
+
+        Returns:
+            Tuple of the bucket with the longest wait and that wait in
+            seconds, or ``("", 0.0)`` when a token was taken from every bucket
+        """
+        return take_tokens(self._buckets(account_sid, sender), self._local)
+
+    def acquire(self, account_sid: str, sender: Optional[str] = None) -> None:
+        """Take a token, waiting according to the policy mode
+
+        Raises:
+            ThrottledError: In fail-fast mode when a bucket is empty, or in
+                block mode when no token is available within ``timeout``
+        """
+        deadline = time.monotonic() + self.policy.timeout
+        while True:
+            key, wait = self.try_acquire(account_sid, sender)
+            if not wait:
+                return
+            self._check_wait(key, wait, deadline)
+            time.sleep(wait)
+
+    async def async_acquire(self, account_sid: str, sender: Optional[str] = None) -> None:
+        """Async counterpart of ``acquire``"""
+        deadline = time.monotonic() + self.policy.timeout
+        while True:
+            key, wait = self.try_acquire(account_sid, sender)
+            if not wait:
+                return
+            self._check_wait(key, wait, deadline)
+            await asyncio.sleep(wait)
+
+    def _check_wait(self, key: str, wait: float, deadline: float) -> None:
+        """Raise ThrottledError when the policy does not allow waiting ``wait``"""
+        left = remaining()
+        if left is not None:
+            deadline = min(deadline, time.monotonic() + left)
+        if self.policy.mode == "fail_fast" or time.monotonic() + wait > deadline:
+            logger.warn("Outbound Twilio rate limit reached", bucket=key, retry_after=wait)
+            raise ThrottledError(key, retry_after=wait)
+
+    def _buckets(self, account_sid: str, sender: Optional[str]) -> List[Bucket]:
+        """List the (key, rate, burst) buckets a call must draw from"""
+        policy = self.policy
+        buckets = [(
+            f"{policy.key_prefix}:{account_sid}",
+            policy.account_rate,
+            policy.account_burst or max(1, int(policy.account_rate)),
+        )]
+        if sender and policy.sender_rate:
+            buckets.append((
+                f"{policy.key_prefix}:{account_sid}:{sender}",
+                policy.sender_rate,
+                policy.sender_burst or max(1, int(policy.sender_rate)),
+            ))
+        return buckets
+
+
+def take_token(key: str, rate: float, burst: int, local: LocalTokenBucket) -> float:
+    """Take a token from the Redis bucket ``key``, or from ``local`` when Redis is down
+
+    Returns:
+        0 when a token was taken, else the seconds to wait for one
+    """
+    return take_tokens([(key, rate, burst)], local)[1]
+
+
+def take_tokens(buckets: Sequence[Bucket], local: LocalTokenBucket) -> Tuple[str, float]:
+    """Take a token from every Redis bucket if they all have one, or from ``local`` when Redis is down
+
+    Returns:
+        ``("", 0.0)`` when tokens were taken, else the bucket with the
+        longest wait and that wait in seconds
+    """
+    redis = get_redis()
+    if redis is not None:
+        try:
+            empty, wait = _bucket_script(redis)(
+                keys=[key for key, _, _ in buckets],
+                args=[value for _, rate, burst in buckets for value in (rate, burst)],
+                client=redis,
+            )
+            return (buckets[int(empty) - 1][0] if int(empty) else ""), float(wait)
+        except Exception as e:
+            mark_redis_down(e)
+    return local.take_all(buckets)
+
+
+_script: Optional[Any] = None
+
+
+def _bucket_script(redis: Any) -> Any:
+    """Register the token bucket script once per Redis client"""
+    global _script
+    script = _script
+    if script is None or script.registered_client is not redis:
+        script = _script = redis.register_script(_TOKEN_BUCKET_SCRIPT)
+    return script
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from . import metrics
+from .config import RetryPolicy
+from .deadline import remaining
+from .exceptions import RateLimitError, TwilioAPIError, TwilioError
+from .log import get_logger
+
+logger = get_logger()
+
+CONNECTION_ERROR = "CONNECTION_ERROR"
+TIMEOUT = "TIMEOUT"
+
+
+def is_retryable(error: TwilioError) -> bool:
+    """Tell whether an error is transient and worth retrying
+
+    Retryable errors are rate limits (20429), 5xx answers from Twilio and
+    connection failures (resets, refused or dropped connections). Read
+    timeouts are not retried as Twilio may have processed the request.
+    """
+    if isinstance(error, RateLimitError):
+        return True
+    if isinstance(error, TwilioAPIError):
+        if error.twilio_code == CONNECTION_ERROR:
+            return True
+        return error.status is not None and error.status >= 500
+    return False
+
+
+def compute_delay(policy: RetryPolicy, attempt: int, error: TwilioError) -> float:
+    """Compute how long to wait before the next attempt
+
+    Args:
+        policy: Retry policy in use
+        attempt: Number of the attempt that just failed (starting at 1)
+        error: Error raised by that attempt
+
+    Returns:
+        Delay in seconds, never shorter than the error's Retry-After
+    """
+    delay = min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1))
+    delay -= delay * policy.jitter * random.random()  # nosec B311 - not crypto
+    if isinstance(error, RateLimitError):
+        delay = max(delay, float(error.retry_after))
+    return delay
+
+
+def _next_delay(
+    policy: RetryPolicy, attempt: int, error: TwilioError, started_at: float, operation: str
+) -> Optional[float]:
+    """Return the delay before retrying, or None when the error must be raised"""
+    if attempt >= policy.max_attempts or not is_retryable(error):
+        return None
+    delay = compute_delay(policy, attempt, error)
+    left = remaining()
+    if time.monotonic() + delay - started_at > policy.deadline or (left is not None and delay >= left):
+        logger.warn("Twilio retry deadline exhausted", operation=operation, attempt=attempt, delay=delay)
+        return None
+    logger.warn("Retrying Twilio call", operation=operation, attempt=attempt, delay=delay, code=error.code)
+    metrics.record_retry(operation, error.code)
+    return delay
+
+
+def call_with_retry(policy: RetryPolicy, operation: str, func: Callable[[], Any]) -> Any:
+    """Call ``func`` retrying transient TwilioErrors according to ``policy``
+
+    Args:
+        policy: Retry policy to apply
+        operation: Operation name used in logs
+        func: Callable raising TwilioError subclasses on failure
+
+    Returns:
+        Whatever ``func`` returns
+
+    Raises:
+        TwilioError: The last error once retries are exhausted or not allowed
+    """
+    started_at = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return func()
+        except TwilioError as e:
+            delay = _next_delay(policy, attempt, e, started_at, operation)
+            if delay is None:
+                raise
+        time.sleep(delay)
+
+
+async def async_call_with_retry(
+    policy: RetryPolicy, operation: str, func: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Async counterpart of ``call_with_retry``"""
+    started_at = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await func()
+        except TwilioError as e:
+            delay = _next_delay(policy, attempt, e, started_at, operation)
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
@@ -0,0 +1,278 @@
+import hashlib
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple, TypeGuard
+
+from .client import get_async_client, get_client
+from .config import SenderPoolPolicy, SenderRoute, TwilioConfig
+from .exceptions import ThrottledError, TwilioAPIError, TwilioError
+from .log import get_logger
+from .ratelimit import LocalTokenBucket, take_token
+from .storage import get_redis, mark_redis_down
+
+logger = get_logger()
+
+# Twilio error codes blaming the sender rather than the message or its recipient
+SENDER_ERROR_CODES = frozenset({
+    "20003",  # authentication failed (account of the sender)
+    "21212",  # invalid From number
+    "21606",  # From number not SMS-capable or not owned by the account
+    "21611",  # From number has too many queued messages
+    "21659",  # From is not a Twilio number
+    "21703",  # messaging service has no sender available
+    "21704",  # messaging service has no phone numbers
+    "21705",  # invalid messaging service
+})
+
+
+def is_sender_error(error: TwilioError) -> TypeGuard[TwilioAPIError]:
+    """Tell whether an error comes from the sender used rather than the message"""
+    return isinstance(error, TwilioAPIError) and error.twilio_code in SENDER_ERROR_CODES
+
+
+@dataclass(frozen=True)
+class _Route:
+    route: SenderRoute
+    config: TwilioConfig
+    key: str
+
+    @property
+    def params(self) -> Dict[str, str]:
+        """Sender arguments of ``send_message``"""
+        if self.route.messaging_service_sid:
+            return {"messaging_service_sid": self.route.messaging_service_sid}
+        return {"from_": self.route.sender}
+
+
+class _LocalHealthStore:
+    """In-process sender health used when Redis is unreachable"""
+
+    def __init__(self):
+        self._failures: Dict[str, Tuple[int, float]] = {}
+        self._down_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def down(self, keys: List[str]) -> Set[str]:
+        now = time.monotonic()
+        with self._lock:
+            return {key for key in keys if self._down_until.get(key, 0.0) > now}
+
+    def record_failure(self, key: str, threshold: int, cooldown: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            count, expires_at = self._failures.get(key, (0, 0.0))
+            count = count + 1 if expires_at > now else 1
+            if count >= threshold:
+                self._failures.pop(key, None)
+                self._down_until[key] = now + cooldown
+                return True
+            self._failures[key] = (count, now + cooldown)
+            return False
+
+
+class SenderPool:
+    """Spreads messages of a config over the senders of its ``sender_pool``
+
+    Picks a sender per message (weighted round-robin, or a weighted
+    rendezvous hash of the recipient when ``sticky``), skipping senders out of
+    their ``rate`` or taken out after repeated sender errors. Rate buckets and
+    health live in Redis so every worker shares them, with per-process
+    fallbacks while Redis is unreachable. Use ``get_sender_pool`` rather than
+    building pools directly so the round-robin state is shared.
+
+    Raises:
+        ValueError: If the config has no ``sender_pool``
+    """
+
+    def __init__(self, config: TwilioConfig):
+        if config.sender_pool is None:
+            raise ValueError("sender_pool is required to spread messages over senders")
+        self.config = config
+        self.policy: SenderPoolPolicy = config.sender_pool
+        self._routes = [self._route(route) for route in self.policy.senders]
+        self._current = {route.key: 0 for route in self._routes}
+        self._lock = threading.Lock()
+        self._buckets = LocalTokenBucket()
+        self._health = _LocalHealthStore()
+
+    def send(self, to: str, body: str) -> Tuple[Dict[str, Any], SenderRoute]:
+        """Send a message from the sender picked for ``to``
+
+        A message refused because of its sender is retried once on every
+        other sender before the error is raised.
+
+        Returns:
+            Twilio response and the sender used
+
+        Raises:
+            ThrottledError: If every sender is out of its rate
+            TwilioError: If Twilio refused the message
+        """
+        tried: Set[str] = set()
+        while True:
+            route = self._choose(to, tried)
+            try:
+                response = get_client(route.config).send_message(to=to, body=body, **route.params)
+            except TwilioError as e:
+                if not self._failed_over(route, e, tried):
+                    raise
+                continue
+            return response, route.route
+
+    async def async_send(self, to: str, body: str) -> Tuple[Dict[str, Any], SenderRoute]:
+        """Async counterpart of ``send``"""
+        tried: Set[str] = set()
+        while True:
+            route = self._choose(to, tried)
+            try:
+                response = await get_async_client(route.config).send_message(to=to, body=body, **route.params)
+            except TwilioError as e:
+                if not self._failed_over(route, e, tried):
+                    raise
+                continue
+            return response, route.route
+
+    def down(self) -> List[SenderRoute]:
+        """List the senders currently out of the pool"""
+        down = self._down()
+        return [route.route for route in self._routes if route.key in down]
+
+    def _choose(self, to: str, exclude: Set[str]) -> _Route:
+        """Pick the first candidate for ``to`` with a token left"""
+        throttled: List[Tuple[float, str]] = []
+        for route in self._candidates(to, exclude):
+            rate = route.route.rate
+            if rate is None:
+                return route
+            wait = take_token(
+                f"{self.policy.key_prefix}:{route.key}:rate", rate,
+                route.route.burst or max(1, int(rate)), self._buckets,
+            )
+            if not wait:
+                return route
+            throttled.append((wait, route.route.sender))
+        wait, sender = min(throttled)
+        logger.warn("Every pooled sender is out of its rate", retry_after=wait)
+        raise ThrottledError(sender, retry_after=wait)
+
+    def _candidates(self, to: str, exclude: Set[str]) -> List[_Route]:
+        """Order the senders to try for ``to``, healthy ones first"""
+        routes = [route for route in self._routes if route.key not in exclude]
+        down = self._down()
+        healthy = [route for route in routes if route.key not in down]
+        if not healthy:
+            logger.warn("Every pooled sender is down, trying them anyway")
+            healthy = routes
+        if self.policy.sticky:
+            return sorted(healthy, key=lambda route: _score(to, route), reverse=True)
+        first = self._next_round_robin(healthy)
+        return [first] + sorted(
+            (route for route in healthy if route is not first), key=lambda route: -route.route.weight
+        )
+
+    def _next_round_robin(self, routes: List[_Route]) -> _Route:
+        """Smooth weighted round-robin: every sender gets its weight's share, interleaved"""
+        total = sum(route.route.weight for route in routes)
+        with self._lock:
+            for route in routes:
+                self._current[route.key] += route.route.weight
+            chosen = max(routes, key=lambda route: self._current[route.key])
+            self._current[chosen.key] -= total
+        return chosen
+
+    def _failed_over(self, route: _Route, error: TwilioError, tried: Set[str]) -> bool:
+        """Record a failed send and tell whether another sender should be tried"""
+        if not is_sender_error(error):
+            return False
+        self._record_failure(route)
+        tried.add(route.key)
+        if len(tried) >= len(self._routes):
+            return False
+        logger.warn("Sender refused the message, trying another", sender=route.route.sender,
+                    code=error.twilio_code)
+        return True
+
+    def _down(self) -> Set[str]:
+        """Return the keys of the senders taken out of the pool"""
+        keys = [route.key for route in self._routes]
+        redis = get_redis()
+        if redis is not None:
+            try:
+                flags = redis.mget(*[self._down_key(key) for key in keys])
+                return {key for key, flag in zip(keys, flags) if flag}
+            except Exception as e:
+                mark_redis_down(e)
+        return self._health.down(keys)
+
+    def _record_failure(self, route: _Route) -> None:
+        """Count a sender error, taking the sender out at ``failure_threshold``"""
+        policy = self.policy
+        ttl = int(policy.cooldown * 1000)
+        redis = get_redis()
+        tripped = None
+        if redis is not None:
+            try:
+                failures_key = f"{policy.key_prefix}:{route.key}:failures"
+                pipe = redis.pipeline()
+                pipe.incr(failures_key)
+                pipe.pexpire(failures_key, ttl)
+                failures, _ = pipe.execute()
+                tripped = failures >= policy.failure_threshold
+                if tripped:
+                    pipe = redis.pipeline()
+                    pipe.set(self._down_key(route.key), 1, px=ttl)
+                    pipe.delete(failures_key)
+                    pipe.execute()
+            except Exception as e:
+                mark_redis_down(e)
+                tripped = None
+        if tripped is None:
+            tripped = self._health.record_failure(route.key, policy.failure_threshold, policy.cooldown)
+        if tripped:
+            logger.error("Sender taken out of the pool", sender=route.route.sender, cooldown=policy.cooldown)
+
+    def _down_key(self, key: str) -> str:
+        return f"{self.policy.key_prefix}:{key}:down"
+
+    def _route(self, route: SenderRoute) -> _Route:
+        config = self.config
+        if route.account_sid and route.account_sid != config.account_sid:
+            config = config.model_copy(update={
+                "account_sid": route.account_sid, "auth_token": route.auth_token, "sender_pool": None,
+            })
+        return _Route(route=route, config=config, key=f"{config.account_sid}:{route.sender}")
+
+
+def _score(to: str, route: _Route) -> float:
+    """Weighted rendezvous score: the highest scoring sender serves ``to``
+
+    Adding or removing a sender only moves the recipients it wins or loses.
+    """
+    digest = hashlib.sha256(f"{to}|{route.key}".encode()).digest()
+    unit = (int.from_bytes(digest[:8], "big") + 1) / (2 ** 64 + 1)
+    return -route.route.weight / math.log(unit)
+
+
+_pools: Dict[TwilioConfig, SenderPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_sender_pool(config: TwilioConfig) -> Optional[SenderPool]:
+    """Return the shared sender pool of a config, or None when it has none"""
+    if config.sender_pool is None:
+        return None
+    pool = _pools.get(config)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(config)
+            if pool is None:
+                pool = _pools[config] = SenderPool(config)
+    return pool
+
+
+def reset_sender_pools() -> None:
+    """Drop every shared pool and its per-process state (tests, reloads)"""
+    with _pools_lock:
+        _pools.clear()
@@ -1,58 +1,66 @@
-from typing import Optional
-import structlog
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional, Set, Tuple, Union
 
 # Use absolute imports to match the test mocking pattern
 from .config import TwilioConfig
-from .client import TwilioClient
-from .types import SMSDeliveryResult
-from .exceptions import InvalidPhoneNumberError, TwilioError
+from .log import get_logger
+from .types import BulkSendSummary, SMSDeliveryResult, SMSMessage
+from .exceptions import InvalidPhoneNumberError, OutboxUnavailableError, TwilioError
+from .outbox import enqueue_sms
+from .phone import normalize_phone
+from .providers import get_sms_provider
 
-logger = structlog.get_logger()
+logger = get_logger()
 
 
 def send_sms(
     config: TwilioConfig,
     phone_number: str,
     message: str,
-    sender_id: Optional[str] = None
+    sender_id: Optional[str] = None,
+    enqueue: bool = False
 ) -> SMSDeliveryResult:
     """Send an SMS message using Twilio
     
     Args:
         config: TwilioConfig instance with account credentials
-        phone_number: Recipient phone number (must start with +)
+        phone_number: Recipient phone number, normalized to E.164
         message: SMS message content
-        sender_id: Optional custom sender ID (must start with +)
+        sender_id: Optional custom sender ID (must start with +); when
+            omitted, the sender is picked from ``config.sender_pool`` if set
+        enqueue: Queue the message for the outbox worker instead of calling
+            Twilio; falls back to sending right away if Redis is unreachable
         
     Returns:
-        SMSDeliveryResult with status and metadata
+        SMSDeliveryResult with status and metadata; ``outbox_id`` is set when
+        the message was queued
         
     Raises:
-        InvalidPhoneNumberError: If phone number format is invalid
+        InvalidPhoneNumberError: If the phone number is not a valid number
     """
-    logger.info("Sending SMS", phone_number=phone_number, sender_id=sender_id)
-    # Validate phone number
-    if not phone_number.startswith('+'):
-        logger.warn("Invalid phone number format", phone_number=phone_number)
-        raise InvalidPhoneNumberError(phone_number)
+    logger.debug("Sending SMS", phone_number=phone_number, sender_id=sender_id)
+    # Validate and normalize phone number before any network call
+    phone_number = normalize_phone(phone_number)
+
+    if enqueue:
+        try:
+            outbox_id = enqueue_sms(config, phone_number, message, sender_id=sender_id)
+            return SMSDeliveryResult(success=True, to=phone_number, outbox_id=outbox_id)
+        except OutboxUnavailableError as e:
+            logger.warn("SMS outbox unavailable, sending right away", phone_number=phone_number, error=str(e))
     
     try:
-        logger.debug("Initializing TwilioClient for SMS sending", account_sid=config.account_sid)
-        client = TwilioClient(config)
-        
-        logger.debug("Sending message via TwilioClient", to=phone_number, sender=sender_id or config.from_number)
-        response = client.send_message(
-            to=phone_number,
-            body=message,
-            from_=sender_id or config.from_number
-        )
-        logger.info("SMS sent successfully", phone_number=phone_number, sid=response.get('sid'))
+        response = get_sms_provider(config).send(phone_number, message, sender_id)
+        logger.sampled("SMS sent successfully", phone_number=phone_number, sid=response.get('sid'),
+                       provider=response.get('provider'))
         
         # Return success result
         return SMSDeliveryResult(
             success=True,
             message_sid=response.get('sid'),
-            to=phone_number
+            to=phone_number,
+            sender=response.get('sender')
         )
         
     except TwilioError as e:
@@ -62,7 +70,8 @@ def send_sms(
             success=False,
             to=phone_number,
             error_code=e.code,
-            error_message=str(e)
+            error_message=str(e),
+            retry_after=getattr(e, 'retry_after', None)
         )
         
     except Exception as e:
@@ -74,3 +83,157 @@ def send_sms(
             error_code="UNKNOWN_ERROR",
             error_message=str(e)
         )
+
+
+def send_sms_bulk(
+    config: TwilioConfig,
+    messages: Iterable[Union[SMSMessage, Tuple[str, str]]],
+    concurrency: int = 8,
+    on_complete: Optional[Callable[[BulkSendSummary], None]] = None
+) -> Iterator[SMSDeliveryResult]:
+    """Send many SMS messages through a bounded pool of worker threads
+
+    ``messages`` is consumed lazily and at most ``concurrency`` messages are in
+    flight at any time, so arbitrarily large iterables can be streamed without
+    being held in memory. Results are yielded as soon as each send completes,
+    not in input order. When Twilio answers with a rate limit error, no new
+    message is dispatched until its ``retry_after`` has elapsed.
+
+    Args:
+        config: TwilioConfig instance with account credentials
+        messages: SMSMessage instances or ``(phone_number, body)`` tuples
+        concurrency: Maximum number of messages sent in parallel
+        on_complete: Optional callback receiving the aggregate BulkSendSummary
+
+    Yields:
+        SMSDeliveryResult for every message, in completion order
+    """
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+    if concurrency > config.pool_size:
+        logger.warn("Bulk SMS concurrency exceeds connection pool size", concurrency=concurrency,
+                    pool_size=config.pool_size)
+
+    started_at = time.monotonic()
+    resume_at = 0.0
+    succeeded = failed = 0
+    pending: Set[Future] = set()
+    iterator = iter(messages)
+    exhausted = False
+
+    logger.info("Starting bulk SMS send", concurrency=concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="sms-bulk")
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                message = next(iterator, None)
+                if message is None:
+                    exhausted = True
+                    break
+                delay = resume_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                pending.add(executor.submit(_send_bulk_item, config, message))
+
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result.success:
+                    succeeded += 1
+                else:
+                    failed += 1
+                    if result.retry_after:
+                        resume_at = max(resume_at, time.monotonic() + result.retry_after)
+                yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.monotonic() - started_at
+    total = succeeded + failed
+    summary = BulkSendSummary(
+        total=total,
+        succeeded=succeeded,
+        failed=failed,
+        elapsed_seconds=elapsed,
+        throughput=total / elapsed if elapsed > 0 else float(total)
+    )
+    logger.info("Bulk SMS send finished", **summary.model_dump())
+    if on_complete is not None:
+        on_complete(summary)
+
+
+def _send_bulk_item(
+    config: TwilioConfig, message: Union[SMSMessage, Tuple[str, str]]
+) -> SMSDeliveryResult:
+    """Send one bulk message, reporting invalid numbers as failed results"""
+    if not isinstance(message, SMSMessage):
+        message = SMSMessage(to=message[0], body=message[1])
+    try:
+        return send_sms(config, message.to, message.body, sender_id=message.sender_id)
+    except InvalidPhoneNumberError as e:
+        return SMSDeliveryResult(
+            success=False,
+            to=message.to,
+            error_code=e.code,
+            error_message=str(e)
+        )
+
+
+async def async_send_sms(
+    config: TwilioConfig,
+    phone_number: str,
+    message: str,
+    sender_id: Optional[str] = None
+) -> SMSDeliveryResult:
+    """Send an SMS message using Twilio without blocking the event loop
+
+    Async counterpart of ``send_sms`` for ASGI views. Uses a connection pool
+    shared by every coroutine of the running event loop.
+
+    Args:
+        config: TwilioConfig instance with account credentials
+        phone_number: Recipient phone number, normalized to E.164
+        message: SMS message content
+        sender_id: Optional custom sender ID (must start with +)
+
+    Returns:
+        SMSDeliveryResult with status and metadata
+
+    Raises:
+        InvalidPhoneNumberError: If the phone number is not a valid number
+    """
+    logger.debug("Sending SMS", phone_number=phone_number, sender_id=sender_id)
+    # Validate and normalize phone number before any network call
+    phone_number = normalize_phone(phone_number)
+
+    try:
+        response = await get_sms_provider(config).async_send(phone_number, message, sender_id)
+        logger.sampled("SMS sent successfully", phone_number=phone_number, sid=response.get('sid'),
+                       provider=response.get('provider'))
+        return SMSDeliveryResult(
+            success=True,
+            message_sid=response.get('sid'),
+            to=phone_number,
+            sender=response.get('sender')
+        )
+
+    except TwilioError as e:
+        logger.error("Error sending SMS", phone_number=phone_number, error=str(e), code=getattr(e, 'code', None))
+        return SMSDeliveryResult(
+            success=False,
+            to=phone_number,
+            error_code=e.code,
+            error_message=str(e),
+            retry_after=getattr(e, 'retry_after', None)
+        )
+
+    except Exception as e:
+        logger.error("Unexpected error sending SMS", phone_number=phone_number, error=str(e))
+        return SMSDeliveryResult(
+            success=False,
+            to=phone_number,
+            error_code="UNKNOWN_ERROR",
+            error_message=str(e)
+        )
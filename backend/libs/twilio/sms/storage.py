@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Any, Optional
+
+from .log import get_logger
+
+logger = get_logger()
+
+# Seconds during which Redis is not tried again after a failure
+REDIS_RETRY_INTERVAL = 5.0
+
+_redis_down_until = 0.0
+_lock = threading.Lock()
+
+
+def get_redis() -> Optional[Any]:
+    """Return the raw Redis connection behind ``CACHES["default"]``
+
+    The connection comes from django_redis so the library shares the pool the
+    Django cache already uses. ``None`` is returned when Django or django_redis
+    is not available, or while Redis is considered down after a failure (see
+    ``mark_redis_down``), so callers can fall back to in-process state.
+    """
+    if time.monotonic() < _redis_down_until:
+        return None
+    try:
+        return _get_redis_connection()
+    except Exception as e:
+        mark_redis_down(e)
+        return None
+
+
+def _get_redis_connection() -> Any:
+    """Fetch the django_redis connection, imported lazily as it is optional"""
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def mark_redis_down(error: Exception) -> None:
+    """Stop using Redis for ``REDIS_RETRY_INTERVAL`` seconds after an error"""
+    global _redis_down_until
+    with _lock:
+        if time.monotonic() >= _redis_down_until:
+            logger.warn("Redis unavailable, using in-process fallback", error=str(error))
+        _redis_down_until = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+def reset_redis_state() -> None:
+    """Forget a previous Redis failure so the next call tries it again"""
+    global _redis_down_until
+    with _lock:
+        _redis_down_until = 0.0
@@ -1,8 +1,38 @@
+import time
+
 import pytest
+import pytest_asyncio
 from unittest.mock import patch, MagicMock
 
+from libs.twilio.sms.client import close_async_clients, reset_clients
 from libs.twilio.sms.config import TwilioConfig
+from libs.twilio.sms.dedup import reset_dedup_state
 from libs.twilio.sms.exceptions import TwilioAPIError
+from libs.twilio.sms.fake_server import FakeTwilioServer
+from libs.twilio.sms.hedge import reset_check_hedgers
+from libs.twilio.sms.log import configure_logging
+from libs.twilio.sms.providers import reset_providers
+from libs.twilio.sms.routing import reset_sender_pools
+from libs.twilio.sms.storage import reset_redis_state
+
+
+@pytest.fixture(autouse=True)
+def reset_twilio_clients():
+    """Make sure no pooled client or Redis state leaks from one test into another"""
+    reset_clients()
+    reset_redis_state()
+    reset_dedup_state()
+    reset_sender_pools()
+    reset_providers()
+    reset_check_hedgers()
+    yield
+    reset_clients()
+    reset_redis_state()
+    reset_dedup_state()
+    reset_sender_pools()
+    reset_providers()
+    reset_check_hedgers()
+    configure_logging()
 
 
 @pytest.fixture
@@ -41,8 +71,8 @@ def mock_twilio_client():
 
 @pytest.fixture
 def mock_twilio_client_for_sender():
-    """Mock for TwilioClient used in sender.py"""
-    with patch('libs.twilio.sms.sender.TwilioClient') as mock_client_class:
+    """Mock for the shared TwilioClient handed out to sender.py and the outbox worker"""
+    with patch('libs.twilio.sms.providers.get_client') as mock_client_class:
         mock_instance = mock_client_class.return_value
         mock_instance.send_message.return_value = {
             "sid": "SM123456",
@@ -54,8 +84,8 @@ def mock_twilio_client_for_sender():
 
 @pytest.fixture
 def mock_twilio_client_for_verifier():
-    """Mock for twilio.rest.Client used in verifier.py"""
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client') as mock_client:
+    """Mock for twilio.rest.Client behind the client used in verifier.py"""
+    with patch('libs.twilio.sms.client.twilio.rest.Client') as mock_client:
         # Setup mock client instance
         instance = mock_client.return_value
         
@@ -74,3 +104,198 @@ def mock_twilio_client_for_verifier():
         verification_check.status = "approved"
         
         yield mock_client
+
+
+@pytest_asyncio.fixture
+async def fake_twilio_api():
+    """Local HTTP server answering like the Twilio API"""
+    with FakeTwilioServer() as server:
+        yield server
+        await close_async_clients()
+
+
+@pytest.fixture
+def fake_twilio_config(fake_twilio_api):
+    """TwilioConfig pointed at the local fake Twilio API"""
+    return TwilioConfig(
+        account_sid="AC123456789",
+        auth_token="auth_token_123",
+        from_number="+1234567890",
+        service_sid="VA123456789",
+        api_base_url=fake_twilio_api.base_url
+    )
+
+
+class FakeRedis:
+    """Tiny in-memory stand-in for the redis-py client commands the lib uses"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def mget(self, *keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expire(key, ex)
+        if px is not None:
+            self.pexpire(key, px)
+        return True
+
+    def delete(self, *keys):
+        removed = sum(1 for key in keys if self._alive(key))
+        for key in keys:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    def incrby(self, key, amount=1):
+        value = int(self.get(key) or 0) + amount
+        self.data[key] = str(value).encode()
+        return value
+
+    def incr(self, key, amount=1):
+        return self.incrby(key, amount)
+
+    def expire(self, key, seconds):
+        return self.pexpire(key, int(seconds * 1000))
+
+    def pexpire(self, key, milliseconds):
+        if not self._alive(key):
+            return False
+        self.expires[key] = time.monotonic() + milliseconds / 1000
+        return True
+
+    def pttl(self, key):
+        if not self._alive(key):
+            return -2
+        if key not in self.expires:
+            return -1
+        return int((self.expires[key] - time.monotonic()) * 1000)
+
+    def ttl(self, key):
+        pttl = self.pttl(key)
+        return pttl if pttl < 0 else pttl // 1000
+
+    def hset(self, key, mapping):
+        self._alive(key)
+        self.data.setdefault(key, {}).update(
+            {field: str(value).encode() for field, value in mapping.items()}
+        )
+        return len(mapping)
+
+    def hgetall(self, key):
+        return dict(self.data[key]) if self._alive(key) else {}
+
+    def hget(self, key, field):
+        return self.data[key].get(field) if self._alive(key) else None
+
+    def hincrby(self, key, field, amount=1):
+        self._alive(key)
+        values = self.data.setdefault(key, {})
+        value = int(values.get(field, b"0")) + amount
+        values[field] = str(value).encode()
+        return value
+
+    def hdel(self, key, *fields):
+        values = self.data.get(key, {}) if self._alive(key) else {}
+        return sum(1 for field in fields if values.pop(field, None) is not None)
+
+    def xadd(self, name, fields):
+        stream = self.data.setdefault(name, [])
+        entry_id = f"{int(time.time() * 1000)}-{len(stream)}".encode()
+        stream.append((entry_id, {key: str(value).encode() for key, value in fields.items()}))
+        return entry_id
+
+    def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        groups = self.data.setdefault(f"{name}:groups", {})
+        if groupname in groups:
+            raise Exception("BUSYGROUP Consumer Group name already exists")
+        self.data.setdefault(name, [])
+        groups[groupname] = {"delivered": set(), "pending": {}}
+        return True
+
+    def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        response = []
+        for name in streams:
+            group = self.data[f"{name}:groups"][groupname]
+            entries = [entry for entry in self.data.get(name, []) if entry[0] not in group["delivered"]][:count]
+            for entry_id, _ in entries:
+                group["delivered"].add(entry_id)
+                group["pending"][entry_id] = time.monotonic()
+            if entries:
+                response.append((name.encode(), entries))
+        return response
+
+    def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None):
+        group = self.data[f"{name}:groups"][groupname]
+        now = time.monotonic()
+        entries = [
+            entry for entry in self.data.get(name, [])
+            if entry[0] in group["pending"] and (now - group["pending"][entry[0]]) * 1000 >= min_idle_time
+        ][:count]
+        for entry_id, _ in entries:
+            group["pending"][entry_id] = now
+        return [b"0-0", entries, []]
+
+    def xack(self, name, groupname, *ids):
+        pending = self.data[f"{name}:groups"][groupname]["pending"]
+        return sum(1 for entry_id in ids if pending.pop(_bytes(entry_id), None) is not None)
+
+    def xdel(self, name, *ids):
+        ids = {_bytes(entry_id) for entry_id in ids}
+        stream = self.data.get(name, [])
+        self.data[name] = [entry for entry in stream if entry[0] not in ids]
+        return len(stream) - len(self.data[name])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _bytes(value):
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakePipeline:
+    """Queues FakeRedis commands until execute() like a redis-py pipeline"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    """FakeRedis returned by every storage.get_redis() call of the lib"""
+    redis = FakeRedis()
+    with patch('libs.twilio.sms.storage._get_redis_connection', return_value=redis):
+        yield redis
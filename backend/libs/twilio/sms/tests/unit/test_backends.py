@@ -0,0 +1,163 @@
+import re
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.backends import (
+    LocalOTPBackend, TwilioVerifyBackend, VerificationBackend, get_verification_backend,
+)
+from libs.twilio.sms.config import LocalOTPPolicy
+from libs.twilio.sms.exceptions import OTPUnavailableError, TokenExpiredError, VerificationFailedError
+from libs.twilio.sms.fake_server import FakeTwilioServer
+from libs.twilio.sms.types import VerificationChannel, VerificationStatus
+from libs.twilio.sms.verifier import (
+    async_check_verification, async_start_verification, check_verification, start_verification,
+)
+
+PHONE = "+14155552671"
+
+
+@pytest.fixture
+def server():
+    with FakeTwilioServer() as server:
+        yield server
+
+
+@pytest.fixture
+def config(server, fake_redis):
+    """Config using local codes, backed by FakeRedis, without a Verify service"""
+    return server.config(service_sid=None, local_otp=LocalOTPPolicy(secret="s3cret", max_attempts=3))
+
+
+def _sent_code(server):
+    """Return the code of the last SMS sent through the fake server"""
+    _, path, form = server.requests[-1]
+    assert path.endswith("/Messages.json")
+    return re.search(r"\d+", form["Body"]).group()
+
+
+def test_backend_selection(server, config):
+    """Test that local_otp switches the backend away from Twilio Verify"""
+    assert isinstance(get_verification_backend(config), LocalOTPBackend)
+    assert isinstance(get_verification_backend(server.config()), TwilioVerifyBackend)
+    with pytest.raises(ValueError):
+        get_verification_backend(server.config(service_sid=None))
+    with pytest.raises(TypeError):
+        VerificationBackend()
+
+
+def test_code_is_sent_by_sms_and_checked_locally(config, server, fake_redis):
+    """Test that a code goes out through the Messages API and is approved without Verify"""
+    result = start_verification(config, PHONE)
+
+    assert result.success is True
+    assert result.status == VerificationStatus.PENDING
+    code = _sent_code(server)
+    assert len(code) == 6
+    assert code not in str(fake_redis.data)
+
+    assert check_verification(config, PHONE, code) == VerificationStatus.APPROVED
+    assert not any("/v2/" in path for _, path, _ in server.requests)
+
+
+def test_wrong_code_stays_pending(config, server):
+    """Test that a wrong code leaves the verification pending"""
+    start_verification(config, PHONE)
+    code = _sent_code(server)
+    wrong = str((int(code) + 1) % 10 ** 6).zfill(6)
+
+    assert check_verification(config, PHONE, wrong) == VerificationStatus.PENDING
+    assert check_verification(config, PHONE, code) == VerificationStatus.APPROVED
+
+
+def test_code_is_single_use(config, server):
+    """Test that an approved code cannot be replayed"""
+    start_verification(config, PHONE)
+    code = _sent_code(server)
+    check_verification(config, PHONE, code)
+
+    with pytest.raises(TokenExpiredError):
+        check_verification(config, PHONE, code)
+
+
+def test_unknown_number(config, fake_redis):
+    """Test that checking a number without a code raises TokenExpiredError"""
+    with pytest.raises(TokenExpiredError):
+        check_verification(config, PHONE, "123456")
+    assert fake_redis.data == {}
+
+
+def test_attempts_survive_resends(config, server):
+    """Test that asking for a new code does not grant new guesses"""
+    start_verification(config, PHONE)
+    check_verification(config, PHONE, "000000")
+    check_verification(config, PHONE, "000001")
+    start_verification(config, PHONE)
+    code = _sent_code(server)
+    check_verification(config, PHONE, "000002" if code != "000002" else "000003")
+
+    with pytest.raises(VerificationFailedError):
+        check_verification(config, PHONE, code)
+
+
+def test_resend_replaces_the_code(config, server):
+    """Test that only the latest code is accepted"""
+    start_verification(config, PHONE)
+    first = _sent_code(server)
+    start_verification(config, PHONE)
+    second = _sent_code(server)
+
+    if first != second:
+        assert check_verification(config, PHONE, first) == VerificationStatus.PENDING
+    assert check_verification(config, PHONE, second) == VerificationStatus.APPROVED
+
+
+def test_send_failure_returns_failed_result(config, server):
+    """Test that Messages API errors come back as a failed result"""
+    server.errors.append((400, 21211, {}))
+
+    result = start_verification(config, PHONE)
+
+    assert result.success is False
+    assert result.status == VerificationStatus.FAILED
+    assert result.error_code == "TWILIO_API_ERROR"
+
+
+def test_only_sms_channel(config):
+    """Test that other channels are refused with a failed result"""
+    result = start_verification(config, PHONE, VerificationChannel.CALL)
+
+    assert result.success is False
+    assert result.error_code == "UNSUPPORTED_CHANNEL"
+
+
+def test_redis_unavailable(server):
+    """Test that local codes fail loudly without Redis"""
+    config = server.config(local_otp=LocalOTPPolicy())
+    with patch('libs.twilio.sms.backends.get_redis', return_value=None):
+        with pytest.raises(OTPUnavailableError):
+            start_verification(config, PHONE)
+        with pytest.raises(OTPUnavailableError):
+            check_verification(config, PHONE, "123456")
+    assert server.requests == []
+
+
+def test_codes_are_digits_of_the_configured_length(server):
+    """Test that generated codes honour code_length, zero padding included"""
+    backend = LocalOTPBackend(server.config(local_otp=LocalOTPPolicy(code_length=8)))
+
+    codes = {backend._generate() for _ in range(200)}
+
+    assert all(len(code) == 8 and code.isdigit() for code in codes)
+    assert len(codes) > 190
+
+
+@pytest.mark.asyncio
+async def test_async_local_otp(fake_twilio_api, fake_redis):
+    """Test that the async API uses the local backend too"""
+    config = fake_twilio_api.config(local_otp=LocalOTPPolicy())
+
+    result = await async_start_verification(config, PHONE)
+
+    assert result.success is True
+    assert await async_check_verification(config, PHONE, _sent_code(fake_twilio_api)) == VerificationStatus.APPROVED
@@ -0,0 +1,55 @@
+import structlog
+
+from libs.twilio.sms.benchmark import (
+    format_report, main, measure_logging_overhead, percentile, run_benchmark,
+)
+from libs.twilio.sms import log
+from libs.twilio.sms.fake_server import FakeTwilioServer
+
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0.0
+
+
+def test_run_benchmark_reports_errors():
+    """Test that the report counts successes and failures by code"""
+    with FakeTwilioServer() as server:
+        server.errors = [(400, 21211, {})] * 2
+        report = run_benchmark(server.config(), "send_sms", requests=10, concurrency=2)
+
+    assert report.requests == 10
+    assert report.succeeded == 8
+    assert report.errors == {"TWILIO_API_ERROR": 2}
+    assert 0 < report.latency_p50 <= report.latency_p99 <= report.latency_max
+    assert "send_sms" in format_report(report)
+
+
+def test_main_runs_every_operation(capsys):
+    """Test the command-line entry point"""
+    try:
+        reports = main(["--requests", "4", "--concurrency", "2"])
+    finally:
+        structlog.reset_defaults()
+
+    assert [report.operation for report in reports] == [
+        "send_sms", "start_verification", "check_verification"
+    ]
+    assert all(report.failed == 0 for report in reports)
+    assert "check_verification" in capsys.readouterr().out
+
+
+def test_measure_logging_overhead():
+    """Test that the logging benchmark covers the policy and leaves it unchanged"""
+    log.configure_logging("WARNING", 0.5)
+    results = measure_logging_overhead(iterations=50)
+
+    assert set(results) >= {"debug (filtered out)", "send_sms events", "send_sms events (unfiltered)"}
+    assert all(micros > 0 for micros in results.values())
+    assert log.TwilioLogger.is_enabled(log.WARNING) and not log.TwilioLogger.is_enabled(log.INFO)
+    assert log._success_sample_rate == 0.5
@@ -0,0 +1,138 @@
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, counts_as_failure
+from libs.twilio.sms.client import TwilioClient
+from libs.twilio.sms.config import CircuitBreakerPolicy, RetryPolicy
+from libs.twilio.sms.exceptions import (
+    CircuitOpenError, InvalidPhoneNumberError, RateLimitError, TwilioAPIError,
+)
+
+SERVER_ERROR = TwilioAPIError("Service unavailable", "20503", status=503)
+
+
+@pytest.fixture(params=["redis", "local"])
+def breaker(request):
+    """CircuitBreaker running against FakeRedis and against local state"""
+    policy = CircuitBreakerPolicy(min_calls=4, failure_rate_threshold=0.5, open_duration=30,
+                                  half_open_max_calls=1, slow_call_duration=1)
+    if request.param == "redis":
+        request.getfixturevalue("fake_redis")
+        yield CircuitBreaker(policy, "AC123")
+    else:
+        with patch('libs.twilio.sms.breaker.get_redis', return_value=None):
+            yield CircuitBreaker(policy, "AC123")
+
+
+def _fail(breaker, operation="send_message", times=1):
+    for _ in range(times):
+        state = breaker.before_call(operation)
+        breaker.record_failure(operation, SERVER_ERROR, state)
+
+
+def test_counts_as_failure():
+    """Test that only provider-side failures count against the circuit"""
+    assert counts_as_failure(SERVER_ERROR)
+    assert counts_as_failure(TwilioAPIError("Reset", "CONNECTION_ERROR"))
+    assert not counts_as_failure(TwilioAPIError("Invalid To", "21211", status=400))
+    assert not counts_as_failure(RateLimitError("Slow down", retry_after=1))
+    assert not counts_as_failure(InvalidPhoneNumberError("123"))
+
+
+def test_opens_after_failure_rate(breaker):
+    """Test that the circuit opens once min_calls are seen at the failure rate"""
+    for _ in range(2):
+        state = breaker.before_call("send_message")
+        breaker.record_success("send_message", 0.1, state)
+    _fail(breaker, times=1)
+    assert breaker.state("send_message") == CLOSED
+
+    _fail(breaker, times=1)
+
+    assert breaker.state("send_message") == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call("send_message")
+    assert excinfo.value.code == "CIRCUIT_OPEN"
+    assert 0 < excinfo.value.retry_after <= 30
+
+
+def test_slow_calls_count_as_failures(breaker):
+    """Test that calls slower than slow_call_duration trip the circuit"""
+    for _ in range(4):
+        state = breaker.before_call("send_message")
+        breaker.record_success("send_message", 2.0, state)
+
+    assert breaker.state("send_message") == OPEN
+
+
+def test_operations_are_independent(breaker):
+    """Test that one failing operation does not open the others"""
+    _fail(breaker, "send_message", times=4)
+
+    assert breaker.state("send_message") == OPEN
+    assert breaker.before_call("create_verification_check") == CLOSED
+
+
+def test_half_open_probe_closes_circuit(breaker):
+    """Test that a successful probe after open_duration closes the circuit"""
+    _fail(breaker, times=4)
+    _expire_open(breaker)
+
+    assert breaker.state("send_message") == HALF_OPEN
+    state = breaker.before_call("send_message")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("send_message")  # single probe slot taken
+
+    breaker.record_success("send_message", 0.1, state)
+    assert breaker.state("send_message") == CLOSED
+
+
+def test_half_open_probe_failure_reopens(breaker):
+    """Test that a failed probe opens the circuit again"""
+    _fail(breaker, times=4)
+    _expire_open(breaker)
+
+    _fail(breaker, times=1)
+
+    assert breaker.state("send_message") == OPEN
+
+
+def test_state_shared_across_breakers(fake_redis):
+    """Test that a circuit opened by one worker is seen by another"""
+    policy = CircuitBreakerPolicy(min_calls=2)
+    _fail(CircuitBreaker(policy, "AC123"), times=2)
+
+    with pytest.raises(CircuitOpenError):
+        CircuitBreaker(policy, "AC123").before_call("send_message")
+
+
+def test_client_fails_fast_when_open(mock_twilio_config, mock_twilio_client):
+    """Test that TwilioClient stops calling Twilio once the circuit opens"""
+    from twilio.base.exceptions import TwilioRestException
+    config = mock_twilio_config.model_copy(update={
+        "circuit_breaker": CircuitBreakerPolicy(min_calls=2),
+        "retry": RetryPolicy(max_attempts=1),
+    })
+    mock_instance = mock_twilio_client.return_value
+    mock_instance.messages.create.side_effect = TwilioRestException(503, "/Messages.json", "Unavailable", 20503)
+    client = TwilioClient(config)
+
+    with patch('libs.twilio.sms.breaker.get_redis', return_value=None):
+        for _ in range(2):
+            with pytest.raises(TwilioAPIError):
+                client.send_message("+1987654321", "Test message")
+        with pytest.raises(CircuitOpenError):
+            client.send_message("+1987654321", "Test message")
+
+    assert mock_instance.messages.create.call_count == 2
+
+
+def _expire_open(breaker):
+    """Make the open period elapse for both store flavours"""
+    name = breaker._name("send_message")
+    redis = breaker._run(lambda store: getattr(store, "redis", None))
+    if redis is not None:
+        redis.delete(f"{name}:open")
+    else:
+        breaker._local._states[name]["open_until"] = 0.0
@@ -1,7 +1,18 @@
+import asyncio
+import gc
+import weakref
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import ANY
+
 import pytest
 
-from libs.twilio.sms.client import TwilioClient
+from libs.twilio.sms.client import (
+    TwilioClient, _async_clients, _last_retry_after, _retry_after, get_async_client, get_client, reset_clients,
+)
+from libs.twilio.sms.config import TwilioConfig
 from libs.twilio.sms.exceptions import TwilioAPIError
+from libs.twilio.sms.fake_server import FakeTwilioServer
 
 
 def test_client_initialization(mock_twilio_config, mock_twilio_client):
@@ -11,7 +22,8 @@ def test_client_initialization(mock_twilio_config, mock_twilio_client):
     # Verify Twilio client was initialized with correct credentials
     mock_twilio_client.assert_called_once_with(
         mock_twilio_config.account_sid,
-        mock_twilio_config.auth_token
+        mock_twilio_config.auth_token,
+        http_client=ANY,
     )
 
     # Verify client properties
@@ -91,3 +103,95 @@ def test_client_twilio_rest_exception_other_code(mock_twilio_config, mock_twilio
             from_=mock_twilio_config.from_number
         )
     assert "twilio error" in str(excinfo.value).lower() or "99999" in str(excinfo.value)
+
+
+def test_client_uses_keep_alive_pool(mock_twilio_config, mock_twilio_client):
+    """Test that TwilioClient hands a pooled HTTP client sized by the config to the SDK"""
+    TwilioClient(mock_twilio_config)
+
+    http_client = mock_twilio_client.call_args.kwargs["http_client"]
+    adapter = http_client.session.get_adapter("https://api.twilio.com")
+    assert adapter._pool_maxsize == mock_twilio_config.pool_size
+
+
+def test_client_sends_status_callback():
+    """Test that config.status_callback is passed with every message, and omitted when unset"""
+    with FakeTwilioServer() as server:
+        TwilioClient(server.config(status_callback="https://example.com/twilio/status")).send_message(
+            to="+14155552671", body="Hello"
+        )
+        TwilioClient(server.config()).send_message(to="+14155552671", body="Hello")
+
+    assert server.requests[0][2]["StatusCallback"] == "https://example.com/twilio/status"
+    assert "StatusCallback" not in server.requests[1][2]
+
+
+def test_get_client_reuses_instance(mock_twilio_config, mock_twilio_client):
+    """Test that get_client returns the same shared client for equal configs"""
+    same_config = TwilioConfig(**mock_twilio_config.model_dump())
+
+    first = get_client(mock_twilio_config)
+    second = get_client(same_config)
+
+    assert first is second
+    mock_twilio_client.assert_called_once()
+
+
+def test_get_client_distinct_per_account(mock_twilio_config, mock_twilio_client):
+    """Test that get_client keeps separate clients for different accounts"""
+    other_config = mock_twilio_config.model_copy(update={"account_sid": "AC987654321"})
+
+    assert get_client(mock_twilio_config) is not get_client(other_config)
+    assert mock_twilio_client.call_count == 2
+
+
+def test_get_client_thread_safe(mock_twilio_config, mock_twilio_client):
+    """Test that concurrent get_client calls build a single client"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: get_client(mock_twilio_config), range(32)))
+
+    assert all(client is clients[0] for client in clients)
+    mock_twilio_client.assert_called_once()
+
+
+def test_reset_clients(mock_twilio_config, mock_twilio_client):
+    """Test that reset_clients forces a new client on the next call"""
+    first = get_client(mock_twilio_config)
+    reset_clients()
+
+    assert get_client(mock_twilio_config) is not first
+
+
+def test_async_clients_are_closed_with_their_loop(mock_twilio_config):
+    """Test that a loop's clients are closed and the loop collected once it shuts down"""
+    async def use_client():
+        session = get_async_client(mock_twilio_config)._http_client.session
+        return weakref.ref(asyncio.get_running_loop()), weakref.ref(session), session.closed
+
+    loop_ref, session_ref, closed_while_running = asyncio.run(use_client())
+    gc.collect()
+
+    assert not closed_while_running
+    assert loop_ref() is None
+    assert session_ref() is None
+    assert not _async_clients
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("42", 42), (None, 60), ("soon", 60), ("-5", 60), (timedelta(seconds=30), 30), (timedelta(seconds=-30), 0),
+])
+def test_retry_after_header(value, expected):
+    """Test that Retry-After is read as seconds or an HTTP date, and defaults to 60"""
+    if isinstance(value, timedelta):
+        value = format_datetime(datetime.now(timezone.utc) + value, usegmt=True)
+
+    class Response:
+        headers = {"Retry-After": value}
+
+    class Error(Exception):
+        response = Response()
+
+    _last_retry_after.set(None)
+    assert abs(_retry_after(Error()) - expected) <= 1
@@ -64,3 +64,47 @@ def test_twilio_config_validation():
             auth_token="auth_token_123",
             from_number="+1234567890"
         )
+
+
+def test_twilio_config_is_hashable():
+    """Test that TwilioConfig is immutable and usable as a registry key"""
+    config = TwilioConfig(
+        account_sid="AC123456789",
+        auth_token="auth_token_123",
+        from_number="+1234567890"
+    )
+
+    assert config.pool_size == 10
+    assert config.retry.max_attempts == 3
+    assert hash(config) == hash(TwilioConfig(**config.model_dump()))
+    with pytest.raises(ValidationError):
+        config.account_sid = "AC987654321"
+
+    with pytest.raises(ValidationError):
+        TwilioConfig(
+            account_sid="AC123456789",
+            auth_token="auth_token_123",
+            from_number="+1234567890",
+            pool_size=0
+        )
+
+
+def test_twilio_config_timeouts():
+    """Test that every call is bounded by default timeouts and deadline"""
+    config = TwilioConfig(
+        account_sid="AC123456789",
+        auth_token="auth_token_123",
+        from_number="+1234567890"
+    )
+
+    assert config.connect_timeout == 3.05
+    assert config.read_timeout == 10.0
+    assert config.deadline == 15.0
+
+    with pytest.raises(ValidationError):
+        TwilioConfig(
+            account_sid="AC123456789",
+            auth_token="auth_token_123",
+            from_number="+1234567890",
+            read_timeout=0
+        )
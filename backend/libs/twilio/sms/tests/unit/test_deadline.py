@@ -0,0 +1,116 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.client import TwilioClient, _TimeoutAdapter, get_async_client
+from libs.twilio.sms.deadline import check_deadline, clamp_timeout, deadline, remaining
+from libs.twilio.sms.exceptions import DeadlineExceededError, TwilioAPIError
+from libs.twilio.sms.retry import TIMEOUT
+from libs.twilio.sms.config import RetryPolicy
+
+
+def test_no_deadline_by_default():
+    """Test that no budget applies outside a deadline block"""
+    assert remaining() is None
+    assert clamp_timeout(10.0) == 10.0
+    check_deadline("send_message")
+
+
+def test_deadline_bounds_timeouts():
+    """Test that timeouts are cut to the remaining budget"""
+    with deadline(1.0):
+        assert 0 < remaining() <= 1.0
+        assert clamp_timeout(10.0) <= 1.0
+        assert clamp_timeout(0.5) == 0.5
+    assert remaining() is None
+
+
+def test_nested_deadline_only_shortens():
+    """Test that an inner block cannot extend the outer budget"""
+    with deadline(0.5):
+        with deadline(30):
+            assert remaining() <= 0.5
+        with deadline(0.1):
+            assert remaining() <= 0.1
+        with deadline(None):
+            assert remaining() <= 0.5
+
+
+def test_expired_deadline_raises():
+    """Test that an exhausted budget raises DeadlineExceededError"""
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceededError) as excinfo:
+            check_deadline("send_message")
+        with pytest.raises(DeadlineExceededError):
+            clamp_timeout(1.0)
+    assert excinfo.value.code == "DEADLINE_EXCEEDED"
+
+
+def test_adapter_applies_configured_timeouts():
+    """Test that every request gets (connect, read) timeouts, clamped to the deadline"""
+    adapter = _TimeoutAdapter(2.0, 8.0)
+    with patch('requests.adapters.HTTPAdapter.send') as mock_send:
+        adapter.send("request", timeout=None)
+        assert mock_send.call_args.kwargs["timeout"] == (2.0, 8.0)
+
+        with deadline(1.0):
+            adapter.send("request")
+        connect, read = mock_send.call_args.kwargs["timeout"]
+        assert connect <= 1.0 and read <= 1.0
+
+
+def test_client_does_not_call_past_deadline(mock_twilio_config, mock_twilio_client):
+    """Test that the client fails fast once the caller's budget is gone"""
+    client = TwilioClient(mock_twilio_config)
+
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceededError):
+            client.send_message("+1987654321", "Test message")
+
+    mock_twilio_client.return_value.messages.create.assert_not_called()
+
+
+def test_retry_stops_at_deadline(mock_twilio_config, mock_twilio_client):
+    """Test that a retry whose backoff would overrun the deadline is not attempted"""
+    from twilio.base.exceptions import TwilioRestException
+    config = mock_twilio_config.model_copy(update={
+        "retry": RetryPolicy(max_attempts=5, base_delay=1.0, jitter=0),
+    })
+    mock_instance = mock_twilio_client.return_value
+    mock_instance.messages.create.side_effect = TwilioRestException(503, "/Messages.json", "Unavailable", 20503)
+
+    with deadline(0.5), patch('libs.twilio.sms.retry.time.sleep') as mock_sleep:
+        with pytest.raises(TwilioAPIError):
+            TwilioClient(config).send_message("+1987654321", "Test message")
+
+    assert mock_instance.messages.create.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_async_read_timeout(fake_twilio_config, fake_twilio_api):
+    """Test that a hung Twilio answer fails with TIMEOUT and is not retried"""
+    fake_twilio_api.latency = 0.5
+    config = fake_twilio_config.model_copy(update={"read_timeout": 0.05})
+
+    with pytest.raises(TwilioAPIError) as excinfo:
+        await get_async_client(config).send_message("+1987654321", "Test message")
+
+    assert excinfo.value.twilio_code == TIMEOUT
+    assert len(fake_twilio_api.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_deadline_exceeded(fake_twilio_config, fake_twilio_api):
+    """Test that the caller's deadline cuts an in-flight async call"""
+    fake_twilio_api.latency = 0.5
+    started_at = time.monotonic()
+
+    with deadline(0.1):
+        with pytest.raises(DeadlineExceededError):
+            await get_async_client(fake_twilio_config).send_message("+1987654321", "Test message")
+
+    assert time.monotonic() - started_at < 0.4
@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.config import VerificationDedupPolicy
+from libs.twilio.sms.dedup import get_dedup_stats, get_deduplicator
+from libs.twilio.sms.fake_server import FakeTwilioServer
+from libs.twilio.sms.types import VerificationChannel, VerificationStatus
+from libs.twilio.sms.verifier import async_start_verification, check_verification, start_verification
+
+PHONE = "+14155552671"
+
+
+@pytest.fixture
+def server():
+    """Fake Twilio API slow enough for concurrent calls to overlap"""
+    with FakeTwilioServer(latency=0.1) as server:
+        yield server
+
+
+@pytest.fixture(params=["redis", "local"])
+def config(request, server):
+    """Config with dedup enabled, backed by FakeRedis and by local state"""
+    config = server.config(verification_dedup=VerificationDedupPolicy(window=60, wait_timeout=2))
+    if request.param == "redis":
+        request.getfixturevalue("fake_redis")
+        yield config
+    else:
+        with patch('libs.twilio.sms.dedup.get_redis', return_value=None):
+            yield config
+
+
+def _verifications(server):
+    return [form for _, path, form in server.requests if path.endswith("/Verifications")]
+
+
+def test_disabled_by_default(server):
+    """Test that every call reaches Twilio when no dedup policy is set"""
+    config = server.config()
+    assert get_deduplicator(config) is None
+
+    start_verification(config, PHONE)
+    start_verification(config, PHONE)
+
+    assert len(_verifications(server)) == 2
+    assert get_dedup_stats(config) == {}
+
+
+def test_repeated_calls_are_suppressed(config, server):
+    """Test that a resend within the window returns the pending verification"""
+    first = start_verification(config, PHONE)
+    second = start_verification(config, "+1 (415) 555-2671")
+
+    assert second == first
+    assert second.status == VerificationStatus.PENDING
+    assert len(_verifications(server)) == 1
+    assert get_dedup_stats(config) == {"calls": 1, "suppressed": 1, "coalesced": 0}
+
+
+def test_channels_and_numbers_are_separate(config, server):
+    """Test that another channel or number still starts its own verification"""
+    start_verification(config, PHONE)
+    start_verification(config, PHONE, VerificationChannel.CALL)
+    start_verification(config, "+14155552672")
+
+    assert len(_verifications(server)) == 3
+
+
+def test_concurrent_calls_are_coalesced(config, server):
+    """Test that calls made while one is in flight wait for its result"""
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(executor.map(lambda _: start_verification(config, PHONE), range(5)))
+
+    assert all(result.status == VerificationStatus.PENDING for result in results)
+    assert len(_verifications(server)) == 1
+    stats = get_dedup_stats(config)
+    assert stats["calls"] == 1
+    assert stats["coalesced"] + stats["suppressed"] == 4
+
+
+def test_failures_are_not_reused(config, server):
+    """Test that a failed start lets the next call try again"""
+    server.errors.append((503, 20503, {}))
+
+    failed = start_verification(config.model_copy(update={"retry": config.retry.model_copy(
+        update={"max_attempts": 1})}), PHONE)
+    retried = start_verification(config, PHONE)
+
+    assert failed.success is False
+    assert retried.success is True
+    assert len(_verifications(server)) == 2
+
+
+def test_approved_check_ends_the_window(config, server):
+    """Test that a new code can be requested once the previous one is approved"""
+    start_verification(config, PHONE)
+    assert check_verification(config, PHONE, server.approved_code) == VerificationStatus.APPROVED
+
+    start_verification(config, PHONE)
+
+    assert len(_verifications(server)) == 2
+
+
+def test_window_expiry(server):
+    """Test that a pending verification is only reused within the window"""
+    config = server.config(verification_dedup=VerificationDedupPolicy(window=0.05))
+    with patch('libs.twilio.sms.dedup.get_redis', return_value=None):
+        start_verification(config, PHONE)
+        with patch('libs.twilio.sms.dedup.time.monotonic', side_effect=lambda: 1e12):
+            start_verification(config, PHONE)
+
+    assert len(_verifications(server)) == 2
+
+
+def test_wait_timeout_fails_open(server):
+    """Test that a caller stops waiting for a stuck call and calls Twilio itself"""
+    config = server.config(verification_dedup=VerificationDedupPolicy(wait_timeout=0))
+    with patch('libs.twilio.sms.dedup.get_redis', return_value=None):
+        deduplicator = get_deduplicator(config)
+        key = deduplicator._key(PHONE, VerificationChannel.SMS)
+        deduplicator._run(lambda store: store.set(f"{key}:lock", "1", 10, nx=True))
+
+        result = start_verification(config, PHONE)
+
+    assert result.success is True
+    assert len(_verifications(server)) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_start_is_deduplicated(fake_twilio_api):
+    """Test that async_start_verification shares the dedup window"""
+    config = fake_twilio_api.config(verification_dedup=VerificationDedupPolicy())
+    with patch('libs.twilio.sms.dedup.get_redis', return_value=None):
+        first = await async_start_verification(config, PHONE)
+        second = await async_start_verification(config, PHONE)
+
+    assert second == first
+    assert len(_verifications(fake_twilio_api)) == 1
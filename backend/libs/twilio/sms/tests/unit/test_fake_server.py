@@ -0,0 +1,73 @@
+import pytest
+import requests
+
+from libs.twilio.sms.config import RetryPolicy
+from libs.twilio.sms.fake_server import FakeTwilioServer
+from libs.twilio.sms.sender import send_sms
+from libs.twilio.sms.types import VerificationStatus
+from libs.twilio.sms.verifier import check_verification, start_verification
+
+
+@pytest.fixture
+def server():
+    with FakeTwilioServer() as server:
+        yield server
+
+
+def test_send_sms_against_fake_server(server):
+    """Test that the sync sender works end to end against the fake server"""
+    result = send_sms(server.config(), "+14155552671", "Hello")
+
+    assert result.success is True
+    assert result.message_sid.startswith("SM")
+    method, path, form = server.requests[0]
+    assert method == "POST"
+    assert path == f"/2010-04-01/Accounts/{server.config().account_sid}/Messages.json"
+    assert form == {"To": "+14155552671", "Body": "Hello", "From": "+15005550006"}
+
+
+def test_verification_flow_against_fake_server(server):
+    """Test that verifications start pending and approve the configured code"""
+    config = server.config()
+
+    assert start_verification(config, "+14155552671").status == VerificationStatus.PENDING
+    assert check_verification(config, "+14155552671", "000000") == VerificationStatus.PENDING
+    assert check_verification(config, "+14155552671", "123456") == VerificationStatus.APPROVED
+
+
+def test_injected_rate_limit_is_retried(server, monkeypatch):
+    """Test that injected 20429 errors carry Retry-After and are retried"""
+    sleeps = []
+    monkeypatch.setattr('libs.twilio.sms.retry.time.sleep', sleeps.append)
+    server.errors.append((429, 20429, {"Retry-After": "2"}))
+
+    result = send_sms(server.config(), "+14155552671", "Hello")
+
+    assert result.success is True
+    assert len(server.requests) == 2
+    assert sleeps == [2.0]
+
+
+def test_error_rate(server):
+    """Test that error_rate answers every request with the configured error"""
+    server.error_rate = 1.0
+    server.error = (503, 20503, {})
+
+    result = send_sms(server.config(retry=RetryPolicy(max_attempts=1)), "+14155552671", "Hello")
+
+    assert result.success is False
+    assert result.error_code == "TWILIO_API_ERROR"
+
+
+def test_services_and_unknown_routes(server):
+    """Test the Verify service endpoints and the 404 answer"""
+    created = requests.post(f"{server.base_url}/v2/Services", data={"FriendlyName": "Login"}, timeout=5)
+    assert created.status_code == 201
+    service_sid = created.json()["sid"]
+
+    fetched = requests.get(f"{server.base_url}/v2/Services/{service_sid}", timeout=5)
+    assert fetched.json()["sid"] == service_sid
+
+    missing = requests.get(f"{server.base_url}/v1/Unknown", timeout=5)
+    assert missing.status_code == 404
+    assert missing.json()["code"] == 20404
@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.config import VerificationGuardPolicy
+from libs.twilio.sms.exceptions import TokenExpiredError, VerificationFailedError
+from libs.twilio.sms.fake_server import FakeTwilioServer
+from libs.twilio.sms.guard import get_guard
+from libs.twilio.sms.types import VerificationStatus
+from libs.twilio.sms.verifier import async_check_verification, check_verification, start_verification
+
+PHONE = "+14155552671"
+
+
+@pytest.fixture
+def server():
+    with FakeTwilioServer() as server:
+        yield server
+
+
+@pytest.fixture
+def config(server, fake_redis):
+    """Config with the guard enabled, backed by FakeRedis"""
+    return server.config(verification_guard=VerificationGuardPolicy(max_attempts=3))
+
+
+def _checks(server):
+    return [form for _, path, form in server.requests if path.endswith("/VerificationCheck")]
+
+
+@pytest.mark.parametrize("code", ["12345", "1234567", "12a456", ""])
+def test_malformed_codes_are_rejected_locally(config, server, code):
+    """Test that codes of the wrong shape never reach Twilio"""
+    start_verification(config, PHONE)
+
+    with pytest.raises(VerificationFailedError) as excinfo:
+        check_verification(config, PHONE, code)
+
+    assert excinfo.value.reason == "malformed code"
+    assert _checks(server) == []
+
+
+def test_unknown_numbers_are_rejected_locally(config, server, fake_redis):
+    """Test that a check without a pending verification never reaches Twilio"""
+    with pytest.raises(TokenExpiredError):
+        check_verification(config, PHONE, "123456")
+
+    assert _checks(server) == []
+    assert fake_redis.data == {}
+
+
+def test_attempts_are_limited(config, server):
+    """Test that checks past max_attempts are refused, even after a resend"""
+    start_verification(config, PHONE)
+    for _ in range(2):
+        assert check_verification(config, PHONE, "000000") == VerificationStatus.PENDING
+    start_verification(config, PHONE)
+    assert check_verification(config, PHONE, "000000") == VerificationStatus.PENDING
+
+    with pytest.raises(VerificationFailedError) as excinfo:
+        check_verification(config, PHONE, server.approved_code)
+
+    assert excinfo.value.reason == "too many attempts"
+    assert len(_checks(server)) == 3
+
+
+def test_approval_clears_the_pending_record(config, server):
+    """Test that a number has to start a new verification after approval"""
+    start_verification(config, PHONE)
+    assert check_verification(config, PHONE, server.approved_code) == VerificationStatus.APPROVED
+
+    with pytest.raises(TokenExpiredError):
+        check_verification(config, PHONE, server.approved_code)
+
+
+def test_fails_open_without_redis(server):
+    """Test that only the code format is checked when Redis is unreachable"""
+    config = server.config(verification_guard=VerificationGuardPolicy())
+    with patch('libs.twilio.sms.guard.get_redis', return_value=None):
+        assert check_verification(config, PHONE, server.approved_code) == VerificationStatus.APPROVED
+        with pytest.raises(VerificationFailedError):
+            check_verification(config, PHONE, "abc")
+
+    assert len(_checks(server)) == 1
+
+
+def test_disabled_by_default(server):
+    """Test that every check reaches Twilio when no guard policy is set"""
+    config = server.config()
+    assert get_guard(config) is None
+
+    assert check_verification(config, PHONE, "12") == VerificationStatus.PENDING
+    assert len(_checks(server)) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_check_is_guarded(fake_twilio_api, fake_redis):
+    """Test that async_check_verification runs the same local checks"""
+    config = fake_twilio_api.config(verification_guard=VerificationGuardPolicy())
+
+    with pytest.raises(TokenExpiredError):
+        await async_check_verification(config, PHONE, "123456")
+    with pytest.raises(VerificationFailedError):
+        await async_check_verification(config, PHONE, "12")
+
+    assert _checks(fake_twilio_api) == []
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from libs.twilio.sms.client import close_async_clients
+from libs.twilio.sms.config import CheckHedgingPolicy
+from libs.twilio.sms.exceptions import TwilioAPIError
+from libs.twilio.sms.fake_server import FakeTwilioServer, _error
+from libs.twilio.sms.hedge import CheckHedger, get_check_hedger
+from libs.twilio.sms.types import VerificationStatus
+from libs.twilio.sms.verifier import async_check_verification, check_verification
+
+PHONE = "+14155552671"
+
+
+class _SlowFirstCheckServer(FakeTwilioServer):
+    """Fake server answering the first check late
+
+    With ``not_found``, later checks fail like Twilio's once the first check
+    approved the verification.
+    """
+
+    def __init__(self, not_found: bool = False):
+        super().__init__()
+        self.not_found = not_found
+        self.checks = 0
+
+    def _check_verification(self, form, service):
+        with self._lock:
+            self.checks += 1
+            first = self.checks == 1
+        if first:
+            time.sleep(0.5)
+        elif self.not_found:
+            return 404, _error(404, 20404, "The requested resource was not found")
+        return super()._check_verification(form, service)
+
+
+def _config(server, **policy):
+    policy = {"min_delay": 0.05, "max_delay": 0.05, **policy}
+    return server.config(service_sid="VA123", check_hedging=CheckHedgingPolicy(**policy))
+
+
+def _policy(**policy):
+    return CheckHedgingPolicy(**{"min_delay": 0.02, "max_delay": 0.02, **policy})
+
+
+def test_slow_check_is_hedged():
+    """Test that a check over the hedge delay is sent again and the first answer wins"""
+    with _SlowFirstCheckServer() as server:
+        started_at = time.monotonic()
+        status = check_verification(_config(server), PHONE, server.approved_code)
+
+        assert status == VerificationStatus.APPROVED
+        assert time.monotonic() - started_at < 0.4
+        assert server.checks == 2
+        time.sleep(0.5)  # let the losing check finish before the server stops
+
+
+def test_hedge_answers_when_the_check_fails():
+    """Test that the hedge's answer is used when the slow check fails"""
+    hedger = CheckHedger(_policy())
+    runs = []
+
+    def check():
+        runs.append(time.monotonic())
+        if len(runs) == 1:
+            time.sleep(0.1)
+            raise TwilioAPIError("read timeout", "TIMEOUT")
+        time.sleep(0.2)
+        return "approved"
+
+    assert hedger.call(check) == "approved"
+    assert len(runs) == 2
+
+
+def test_checks_share_the_pool():
+    """Test that checks run in the shared pool, with no thread started per check"""
+    hedger = CheckHedger(_policy(max_delay=1))
+    threads = set()
+
+    for _ in range(20):
+        assert hedger.call(lambda: threads.add(threading.current_thread()) or "approved") == "approved"
+
+    assert threading.current_thread() not in threads
+    assert all(thread.name.startswith("verify-hedge") for thread in threads)
+    assert len(hedger._latencies) == 20
+    assert list(hedger._checks) == [False] * 20
+
+
+def test_failed_hedge_waits_for_the_first_check():
+    """Test that the "not found" of a check racing an approval does not hide the approval"""
+    with _SlowFirstCheckServer(not_found=True) as server:
+        status = check_verification(_config(server), PHONE, server.approved_code)
+
+    assert status == VerificationStatus.APPROVED
+    assert server.checks == 2
+
+
+def test_fast_checks_are_not_hedged():
+    """Test that checks answering within the delay are sent once"""
+    with FakeTwilioServer() as server:
+        config = _config(server, max_delay=1)
+        for _ in range(5):
+            assert check_verification(config, PHONE, server.approved_code) == VerificationStatus.APPROVED
+
+    assert len(server.requests) == 5
+
+
+def test_delay_follows_the_percentile():
+    """Test that the delay is the percentile latency once measured, within its bounds"""
+    hedger = CheckHedger(CheckHedgingPolicy(percentile=0.9, min_delay=0.05, max_delay=0.5, min_samples=10))
+    assert hedger.delay() == 0.5
+
+    for latency in range(1, 11):
+        hedger._record(latency / 100)
+    assert hedger.delay() == pytest.approx(0.1)
+
+    for _ in range(100):
+        hedger._record(0.001)
+    assert hedger.delay() == 0.05
+
+
+def test_hedges_are_capped():
+    """Test that at most max_hedge_rate of recent checks are hedged"""
+    hedger = CheckHedger(_policy(max_hedge_rate=0.1))
+    runs = []
+
+    def slow():
+        runs.append(time.monotonic())
+        time.sleep(0.05)
+        return "approved"
+
+    for _ in range(10):
+        assert hedger.call(slow) == "approved"
+
+    assert len(runs) == 11
+
+
+def test_every_run_failing():
+    """Test that the first run's error is raised when the hedge fails too"""
+    hedger = CheckHedger(_policy())
+    errors = iter([TwilioAPIError("first", "20500"), TwilioAPIError("second", "20404")])
+
+    def failing():
+        error = next(errors)
+        time.sleep(0.05)
+        raise error
+
+    with pytest.raises(TwilioAPIError, match="first"):
+        hedger.call(failing)
+
+
+def test_hedger_is_shared_per_config():
+    """Test that checks of a config share one latency window"""
+    with FakeTwilioServer() as server:
+        config = _config(server)
+
+    assert get_check_hedger(config) is get_check_hedger(config)
+    assert get_check_hedger(server.config()) is None
+    with pytest.raises(ValidationError):
+        CheckHedgingPolicy(min_delay=2, max_delay=1)
+
+
+@pytest.mark.asyncio
+async def test_async_check_is_hedged():
+    """Test that async checks are hedged too"""
+    with _SlowFirstCheckServer() as server:
+        started_at = time.monotonic()
+        status = await async_check_verification(_config(server), PHONE, server.approved_code)
+
+        assert status == VerificationStatus.APPROVED
+        assert time.monotonic() - started_at < 0.4
+        await asyncio.sleep(0.5)  # let the losing check finish before closing the client
+        await close_async_clients()
@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from libs.twilio.sms.log import (
+    TwilioLogger, configure_logging, mask_event, mask_phone, mask_processor,
+)
+
+
+@pytest.fixture
+def backend():
+    return MagicMock()
+
+
+@pytest.fixture
+def logger(backend):
+    return TwilioLogger(backend)
+
+
+def test_debug_is_dropped_at_info_level(logger, backend):
+    """Test that disabled events never reach structlog"""
+    configure_logging("INFO")
+
+    logger.debug("Sending SMS", phone_number="+14155552671")
+
+    backend.debug.assert_not_called()
+    assert not logger.is_enabled(10)
+
+
+def test_debug_is_logged_until_configured(logger, backend):
+    """Test that nothing is dropped before configure_logging sets a level"""
+    logger.debug("Sending SMS")
+
+    backend.debug.assert_called_once_with("Sending SMS")
+
+
+def test_phones_and_secrets_are_masked(logger, backend):
+    """Test that phone numbers, secrets and configs never reach the logs in clear"""
+    logger.error("Failed", to="+14155552671", auth_token="abc", error=ValueError("boom"), code="20003")
+
+    backend.error.assert_called_once_with(
+        "Failed", to="+1415*****71", auth_token="***", error="boom", code="20003"
+    )
+
+
+def test_numbers_in_error_messages_are_masked():
+    """Test that numbers quoted by error messages are masked like phone fields"""
+    event = mask_event({
+        "error": "The 'To' number +14155552671 is not a valid phone number.",
+        "exception": ValueError("Invalid phone number: +447911123456"),
+    })
+
+    assert event == {
+        "error": "The 'To' number +1415*****71 is not a valid phone number.",
+        "exception": "Invalid phone number: +4479******56",
+    }
+
+
+def test_config_objects_are_summarized(mock_twilio_config):
+    """Test that a whole TwilioConfig is reduced to its account SID"""
+    event = mask_event({"config": mock_twilio_config})
+
+    assert event == {"config": "TwilioConfig(AC123456789)"}
+    assert "auth_token" not in str(mask_processor(None, "info", {"config": mock_twilio_config}))
+
+
+def test_mask_phone():
+    """Test that short values are fully masked"""
+    assert mask_phone("+447911123456") == "+4479******56"
+    assert mask_phone("+12345") == "******"
+
+
+def test_sampled_events(logger, backend):
+    """Test that success events follow success_sample_rate"""
+    logger.sampled("SMS sent successfully", sid="SM1")
+    backend.info.assert_called_once_with("SMS sent successfully", sid="SM1")
+
+    configure_logging(success_sample_rate=0)
+    logger.sampled("SMS sent successfully", sid="SM2")
+    assert backend.info.call_count == 1
+
+    configure_logging(success_sample_rate=0.999999)
+    logger.sampled("SMS sent successfully", sid="SM3")
+    backend.info.assert_called_with("SMS sent successfully", sid="SM3", sample_rate=0.999999)
+
+
+def test_warning_level_drops_info_and_sampled(logger, backend):
+    """Test that raising the level silences info and success events"""
+    configure_logging("WARNING")
+
+    logger.info("Verification checked")
+    logger.sampled("Verification checked")
+    logger.warn("Retrying Twilio call")
+
+    backend.info.assert_not_called()
+    backend.warning.assert_called_once_with("Retrying Twilio call")
+
+
+@pytest.mark.parametrize("level, rate", [("LOUD", 1.0), ("INFO", 1.5)])
+def test_invalid_policy(level, rate):
+    """Test that unknown levels and rates outside [0, 1] are refused"""
+    with pytest.raises(ValueError):
+        configure_logging(level, rate)
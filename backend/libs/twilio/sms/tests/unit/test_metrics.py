@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from prometheus_client import REGISTRY  # noqa: E402
+
+from libs.twilio.sms import metrics  # noqa: E402
+from libs.twilio.sms.config import CheckHedgingPolicy, RetryPolicy  # noqa: E402
+from libs.twilio.sms.exceptions import TwilioAPIError  # noqa: E402
+from libs.twilio.sms.fake_server import FakeTwilioServer  # noqa: E402
+from libs.twilio.sms.hedge import CheckHedger  # noqa: E402
+from libs.twilio.sms.sender import async_send_sms, send_sms  # noqa: E402
+from libs.twilio.sms.verifier import check_verification  # noqa: E402
+
+PHONE = "+14155552671"
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def server():
+    with FakeTwilioServer() as server:
+        yield server
+
+
+def test_successful_calls_are_timed(server):
+    """Test that a call is counted as a success and lands in the latency histogram"""
+    before = _sample("twilio_requests_total", operation="send_message", outcome="success")
+    observed = _sample("twilio_request_duration_seconds_count", operation="send_message")
+
+    send_sms(server.config(), PHONE, "Hello")
+
+    assert _sample("twilio_requests_total", operation="send_message", outcome="success") == before + 1
+    assert _sample("twilio_request_duration_seconds_count", operation="send_message") == observed + 1
+    assert _sample("twilio_requests_in_progress", operation="send_message") == 0
+
+
+def test_failures_are_labelled_by_error_code(server):
+    """Test that failed calls and their retries are counted by mapped error code"""
+    server.errors = [(429, 20429, {"Retry-After": "0"}), (429, 20429, {"Retry-After": "0"})]
+    config = server.config(retry=RetryPolicy(max_attempts=2, base_delay=0.01))
+    failed = _sample("twilio_requests_total", operation="send_message", outcome="RATE_LIMIT_EXCEEDED")
+    retried = _sample("twilio_retries_total", operation="send_message", code="RATE_LIMIT_EXCEEDED")
+
+    result = send_sms(config, PHONE, "Hello")
+
+    assert result.error_code == "RATE_LIMIT_EXCEEDED"
+    assert _sample("twilio_requests_total", operation="send_message", outcome="RATE_LIMIT_EXCEEDED") == failed + 1
+    assert _sample("twilio_retries_total", operation="send_message", code="RATE_LIMIT_EXCEEDED") == retried + 1
+
+
+def test_verification_checks_are_tracked(server):
+    """Test that Verify checks get their own operation label"""
+    before = _sample("twilio_requests_total", operation="create_verification_check", outcome="success")
+
+    check_verification(server.config(), PHONE, server.approved_code)
+
+    assert _sample("twilio_requests_total", operation="create_verification_check", outcome="success") == before + 1
+
+
+def test_hedges_are_counted():
+    """Test that a hedge answering for a slow call that failed counts as won"""
+    hedger = CheckHedger(CheckHedgingPolicy(min_delay=0.02, max_delay=0.02))
+    runs = iter([TwilioAPIError("read timeout", "TIMEOUT"), None])
+    before = _sample("twilio_hedges_total", operation="create_verification_check", outcome="won")
+
+    def check():
+        error = next(runs)
+        if error is not None:
+            time.sleep(0.1)
+            raise error
+        return "approved"
+
+    assert hedger.call(check) == "approved"
+
+    assert _sample("twilio_hedges_total", operation="create_verification_check", outcome="won") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_async_calls_are_tracked(fake_twilio_api):
+    """Test that the async client records the same metrics"""
+    before = _sample("twilio_requests_total", operation="send_message", outcome="success")
+
+    await async_send_sms(fake_twilio_api.config(), PHONE, "Hello")
+
+    assert _sample("twilio_requests_total", operation="send_message", outcome="success") == before + 1
+
+
+def test_collect_renders_the_exposition_format():
+    """Test that collect() returns every Twilio metric in text format"""
+    payload, content_type = metrics.collect()
+
+    assert content_type.startswith("text/plain")
+    assert b"twilio_request_duration_seconds" in payload
+    assert b"twilio_requests_in_progress" in payload
+
+
+def test_collect_in_multiprocess_mode(tmp_path, monkeypatch):
+    """Test that collect() aggregates the multiprocess directory when configured"""
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    payload, _ = metrics.collect()
+
+    assert isinstance(payload, bytes)
@@ -0,0 +1,142 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.config import OutboxPolicy
+from libs.twilio.sms.exceptions import OutboxUnavailableError, TwilioAPIError
+from libs.twilio.sms.outbox import OutboxWorker, enqueue_sms, get_outbox_state
+from libs.twilio.sms.sender import send_sms
+from libs.twilio.sms.types import OutboxStatus
+
+
+@pytest.fixture
+def outbox_config(mock_twilio_config):
+    """TwilioConfig whose outbox retries right away"""
+    return mock_twilio_config.model_copy(update={
+        "outbox": OutboxPolicy(retry_delay=0.001, max_attempts=2, block=0),
+    })
+
+
+@pytest.fixture
+def worker(outbox_config):
+    worker = OutboxWorker(outbox_config, consumer="test")
+    yield worker
+    worker.close()
+
+
+def test_enqueue_records_queued_state(fake_redis, outbox_config):
+    """Test that enqueuing stores the message and a queued state"""
+    message_id = enqueue_sms(outbox_config, "+14155552671", "Your code is 123456")
+
+    state = get_outbox_state(outbox_config, message_id)
+    assert state.status == OutboxStatus.QUEUED
+    assert state.to == "+14155552671"
+    assert state.attempts == 0
+    assert len(fake_redis.data["twilio:outbox"]) == 1
+    assert get_outbox_state(outbox_config, "unknown") is None
+
+
+def test_send_sms_enqueue_mode(fake_redis, outbox_config, mock_twilio_client_for_sender):
+    """Test that send_sms(enqueue=True) returns without calling Twilio"""
+    result = send_sms(outbox_config, "+14155552671", "Test message", enqueue=True)
+
+    assert result.success is True
+    assert result.outbox_id is not None
+    assert result.message_sid is None
+    mock_twilio_client_for_sender.return_value.send_message.assert_not_called()
+
+
+def test_send_sms_enqueue_falls_back_without_redis(outbox_config, mock_twilio_client_for_sender):
+    """Test that messages are sent right away when the outbox is unreachable"""
+    with patch('libs.twilio.sms.outbox.get_redis', return_value=None):
+        result = send_sms(outbox_config, "+14155552671", "Test message", enqueue=True)
+
+    assert result.success is True
+    assert result.outbox_id is None
+    assert result.message_sid == "SM123456"
+
+
+def test_worker_sends_and_acknowledges(fake_redis, outbox_config, worker, mock_twilio_client_for_sender):
+    """Test that the worker delivers queued messages and removes them from the stream"""
+    ids = [enqueue_sms(outbox_config, "+14155552671", f"Message {i}", sender_id="+1555000000") for i in range(3)]
+
+    assert worker.process_batch() == 3
+
+    for message_id in ids:
+        state = get_outbox_state(outbox_config, message_id)
+        assert state.status == OutboxStatus.SENT
+        assert state.message_sid == "SM123456"
+        assert state.attempts == 1
+    assert fake_redis.data["twilio:outbox"] == []
+    mock_twilio_client_for_sender.return_value.send_message.assert_any_call(
+        to="+14155552671", body="Message 0", from_="+1555000000"
+    )
+    assert worker.process_batch() == 0
+
+
+def test_worker_retries_transient_errors(fake_redis, outbox_config, worker, mock_twilio_client_for_sender):
+    """Test that transient failures are retried until max_attempts"""
+    send_message = mock_twilio_client_for_sender.return_value.send_message
+    send_message.side_effect = TwilioAPIError("Service unavailable", "20503", status=503)
+    message_id = enqueue_sms(outbox_config, "+14155552671", "Test message")
+
+    worker.process_batch()
+    state = get_outbox_state(outbox_config, message_id)
+    assert state.status == OutboxStatus.RETRYING
+    assert state.error_code == "TWILIO_API_ERROR"
+
+    fake_redis.data[f"twilio:outbox:msg:{message_id}"]["next_attempt_at"] = b"0"
+    time.sleep(0.01)  # let the entry go idle for retry_delay
+    worker.process_batch()
+
+    state = get_outbox_state(outbox_config, message_id)
+    assert state.status == OutboxStatus.FAILED
+    assert state.attempts == 2
+    assert send_message.call_count == 2
+    assert fake_redis.data["twilio:outbox"] == []
+
+
+def test_worker_does_not_retry_rejected_messages(fake_redis, outbox_config, worker, mock_twilio_client_for_sender):
+    """Test that 4xx rejections fail the message at once"""
+    mock_twilio_client_for_sender.return_value.send_message.side_effect = TwilioAPIError(
+        "Invalid To", "21211", status=400
+    )
+    message_id = enqueue_sms(outbox_config, "+14155552671", "Test message")
+
+    worker.process_batch()
+
+    state = get_outbox_state(outbox_config, message_id)
+    assert state.status == OutboxStatus.FAILED
+    assert state.attempts == 1
+
+
+def test_worker_without_redis(outbox_config, worker):
+    """Test that an unreachable outbox is reported to the caller"""
+    with patch('libs.twilio.sms.outbox.get_redis', return_value=None):
+        with pytest.raises(OutboxUnavailableError):
+            worker.process_batch()
+
+
+def test_worker_records_batch_despite_unexpected_error(
+    fake_redis, outbox_config, worker, mock_twilio_client_for_sender
+):
+    """Test that an unexpected send error fails its message only, without blaming Redis"""
+    def send_message(to, body, **kwargs):
+        if to == "+14155552672":
+            raise RuntimeError("boom")
+        return {"sid": "SM123", "status": "queued"}
+
+    mock_twilio_client_for_sender.return_value.send_message.side_effect = send_message
+    sent_id = enqueue_sms(outbox_config, "+14155552671", "Test message")
+    failed_id = enqueue_sms(outbox_config, "+14155552672", "Test message")
+
+    with patch('libs.twilio.sms.outbox.mark_redis_down') as mark_redis_down:
+        worker.process_batch()
+
+    mark_redis_down.assert_not_called()
+    assert get_outbox_state(outbox_config, sent_id).status == OutboxStatus.SENT
+    state = get_outbox_state(outbox_config, failed_id)
+    assert state.status == OutboxStatus.FAILED
+    assert "boom" in state.error_message
+    assert fake_redis.data["twilio:outbox"] == []
@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.exceptions import InvalidPhoneNumberError
+from libs.twilio.sms.phone import _to_e164, clear_phone_cache, normalize_many, normalize_phone
+from libs.twilio.sms.sender import send_sms
+from libs.twilio.sms.verifier import check_verification
+
+
+@pytest.fixture(autouse=True)
+def empty_phone_cache():
+    clear_phone_cache()
+    yield
+    clear_phone_cache()
+
+
+@pytest.mark.parametrize("phone_number", [
+    "+14155552671",
+    "+1 (415) 555-2671",
+    "+1-415-555-2671",
+    " +1 415 555 2671 ",
+])
+def test_normalize_phone_formats(phone_number):
+    """Test that formatted numbers are normalized to E.164"""
+    assert normalize_phone(phone_number) == "+14155552671"
+
+
+def test_normalize_phone_with_region():
+    """Test that national numbers are accepted when a region is given"""
+    assert normalize_phone("(415) 555-2671", region="US") == "+14155552671"
+    assert normalize_phone("07911 123456", region="GB") == "+447911123456"
+
+
+@pytest.mark.parametrize("phone_number", ["4155552671", "+1987654321", "+1", "not a number", ""])
+def test_normalize_phone_rejects_invalid(phone_number):
+    """Test that unparsable or invalid numbers raise InvalidPhoneNumberError"""
+    with pytest.raises(InvalidPhoneNumberError) as excinfo:
+        normalize_phone(phone_number)
+    assert excinfo.value.phone == phone_number
+
+
+def test_normalize_phone_is_cached():
+    """Test that repeated numbers are parsed once"""
+    for _ in range(5):
+        normalize_phone("+14155552671")
+        with pytest.raises(InvalidPhoneNumberError):
+            normalize_phone("+1987654321")
+
+    info = _to_e164.cache_info()
+    assert info.misses == 2
+    assert info.hits == 8
+
+
+def test_normalize_many():
+    """Test batch normalization keeps order and flags invalid numbers"""
+    assert normalize_many(["+1 415 555 2671", "12345", "+447911123456"]) == [
+        "+14155552671", None, "+447911123456"
+    ]
+
+
+def test_invalid_numbers_never_reach_twilio(mock_twilio_config_with_service, mock_twilio_client_for_sender):
+    """Test that validation happens before any network call"""
+    with pytest.raises(InvalidPhoneNumberError):
+        send_sms(mock_twilio_config_with_service, "+1987654321", "Test message")
+    with patch('libs.twilio.sms.backends.get_client') as mock_get_client:
+        with pytest.raises(InvalidPhoneNumberError):
+            check_verification(mock_twilio_config_with_service, "+1987654321", "123456")
+
+    mock_twilio_client_for_sender.return_value.send_message.assert_not_called()
+    mock_get_client.assert_not_called()
+
+
+def test_send_sms_sends_normalized_number(mock_twilio_config, mock_twilio_client_for_sender):
+    """Test that Twilio receives the E.164 form of the number"""
+    result = send_sms(mock_twilio_config, "+1 (415) 555-2671", "Test message")
+
+    assert result.to == "+14155552671"
+    mock_twilio_client_for_sender.return_value.send_message.assert_called_once_with(
+        to="+14155552671", body="Test message", from_="+1234567890"
+    )
@@ -0,0 +1,187 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from libs.twilio.sms.config import FailoverPolicy
+from libs.twilio.sms.exceptions import TwilioAPIError
+from libs.twilio.sms.fake_server import FakeTwilioServer
+from libs.twilio.sms.providers import (
+    FailoverProvider, StubProvider, TwilioProvider, get_sms_provider, register_provider,
+)
+from libs.twilio.sms.sender import async_send_sms, send_sms
+
+PHONE = "+14155552671"
+
+
+@pytest.fixture
+def stubs():
+    """Primary and secondary stub providers registered for the test only"""
+    primary, secondary = StubProvider("primary"), StubProvider("secondary", sender="+15005550007")
+    with patch.dict('libs.twilio.sms.providers._factories'):
+        register_provider("primary", lambda config: primary)
+        register_provider("secondary", lambda config: secondary)
+        yield primary, secondary
+
+
+def _config(mock_twilio_config, **policy):
+    policy = {"providers": ("primary", "secondary"), "latency_budget": 0.1, **policy}
+    return mock_twilio_config.model_copy(update={"failover": FailoverPolicy(**policy)})
+
+
+def test_twilio_is_the_default_provider():
+    """Test that without a failover policy messages go to Twilio"""
+    with FakeTwilioServer() as server:
+        config = server.config()
+        result = send_sms(config, PHONE, "Hello")
+
+    assert isinstance(get_sms_provider(config), TwilioProvider)
+    assert result.success is True
+    assert result.sender == config.from_number
+    assert server.requests[0][2]["To"] == PHONE
+
+
+def test_primary_is_used_first(mock_twilio_config, stubs):
+    """Test that a healthy primary gets the message alone"""
+    primary, secondary = stubs
+
+    result = send_sms(_config(mock_twilio_config), PHONE, "Hello")
+
+    assert result.success is True
+    assert result.sender == primary.sender
+    assert primary.sent == [(PHONE, "Hello")]
+    assert secondary.sent == []
+
+
+def test_errors_fail_over(mock_twilio_config, stubs):
+    """Test that a failing primary hands the message to the secondary at once"""
+    primary, secondary = stubs
+    primary.errors.append(TwilioAPIError("Service unavailable", "20500", status=503))
+
+    started_at = time.monotonic()
+    result = send_sms(_config(mock_twilio_config, latency_budget=5), PHONE, "Hello")
+
+    assert result.success is True
+    assert result.sender == secondary.sender
+    assert time.monotonic() - started_at < 1
+
+
+def test_message_errors_do_not_fail_over(mock_twilio_config, stubs):
+    """Test that an error about the message itself is returned without trying the secondary"""
+    primary, secondary = stubs
+    primary.errors.append(TwilioAPIError("Invalid 'To' Phone Number", "21211", status=400))
+    config = _config(mock_twilio_config, latency_budget=5)
+
+    result = send_sms(config, PHONE, "Hello")
+
+    assert result.success is False
+    assert "Invalid 'To' Phone Number" in result.error_message
+    assert secondary.sent == []
+    assert get_sms_provider(config).health()["primary"] < 5  # not scored as a provider failure
+
+
+def test_slow_primary_is_hedged(mock_twilio_config, stubs):
+    """Test that the secondary is started once the primary exceeds the budget, first answer winning"""
+    primary, secondary = stubs
+    primary.latency = 0.5
+
+    started_at = time.monotonic()
+    result = send_sms(_config(mock_twilio_config, latency_budget=0.05), PHONE, "Hello")
+
+    assert result.sender == secondary.sender
+    assert time.monotonic() - started_at < 0.4
+    time.sleep(0.6)
+    assert primary.sent == [(PHONE, "Hello")]  # the slow call still went through
+
+
+def test_slow_provider_is_routed_around(mock_twilio_config, stubs):
+    """Test that a provider over budget goes last until it is due for a probe"""
+    primary, secondary = stubs
+    config = _config(mock_twilio_config, latency_budget=0.05, ewma_alpha=1, probe_interval=0.3)
+    primary.latency = 0.1
+    send_sms(config, PHONE, "Hello")
+    time.sleep(0.1)
+    primary.latency = 0
+
+    send_sms(config, PHONE, "Again")
+    assert primary.sent == [(PHONE, "Hello")]
+    assert get_sms_provider(config).health()["primary"] > 0.05
+
+    time.sleep(0.3)
+    assert send_sms(config, PHONE, "Probe").sender == primary.sender
+
+
+def test_every_provider_failing(mock_twilio_config, stubs):
+    """Test that the last error is returned when no provider accepts the message"""
+    primary, secondary = stubs
+    primary.errors.append(TwilioAPIError("down", "20500", status=503))
+    secondary.errors.append(RuntimeError("boom"))
+
+    result = send_sms(_config(mock_twilio_config), PHONE, "Hello")
+
+    assert result.success is False
+    assert result.error_code == "TWILIO_API_ERROR"
+    assert "boom" in result.error_message
+
+
+def test_unknown_provider(mock_twilio_config):
+    """Test that a policy naming an unregistered provider is reported"""
+    with pytest.raises(ValueError):
+        get_sms_provider(_config(mock_twilio_config, providers=("twilio", "nope")))
+
+
+def test_failover_keeps_the_caller_deadline(mock_twilio_config, stubs):
+    """Test that deadline() blocks reach providers running in failover threads"""
+    from libs.twilio.sms.deadline import deadline, remaining
+
+    seen = []
+    primary, secondary = stubs
+    primary.send = lambda to, body, sender_id=None: seen.append(remaining()) or {"sid": "SM1"}
+    provider = FailoverProvider([primary, secondary], FailoverPolicy(providers=("primary", "secondary")))
+
+    with deadline(5):
+        provider.send(PHONE, "Hello")
+
+    assert seen and 0 < seen[0] <= 5
+
+
+def test_single_provider_runs_on_the_calling_thread(mock_twilio_config, stubs):
+    """Test that a chain of one provider is called inline, without the failover pool"""
+    threads = []
+    primary, _ = stubs
+    primary.send = lambda to, body, sender_id=None: threads.append(threading.current_thread()) or {"sid": "SM1"}
+    provider = FailoverProvider([primary], FailoverPolicy(providers=("primary",)))
+
+    with patch('libs.twilio.sms.providers._get_executor') as executor:
+        assert provider.send(PHONE, "Hello") == {"sid": "SM1"}
+
+    assert threads == [threading.current_thread()]
+    executor.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_async_hedging(mock_twilio_config, stubs):
+    """Test that async sends hedge and fail over too"""
+    primary, secondary = stubs
+    primary.latency = 0.5
+    config = _config(mock_twilio_config, latency_budget=0.05)
+
+    result = await async_send_sms(config, PHONE, "Hello")
+
+    assert result.sender == secondary.sender
+    primary.latency = 0
+    primary.errors.append(TwilioAPIError("down", "20500", status=503))
+    assert (await async_send_sms(config, "+14155552672", "Hello")).sender == secondary.sender
+
+
+@pytest.mark.asyncio
+async def test_async_message_errors_do_not_fail_over(mock_twilio_config, stubs):
+    """Test that async sends return errors about the message without trying the secondary"""
+    primary, secondary = stubs
+    primary.errors.append(TwilioAPIError("Attempt to send to unsubscribed recipient", "21610", status=400))
+
+    result = await async_send_sms(_config(mock_twilio_config, latency_budget=5), PHONE, "Hello")
+
+    assert result.success is False
+    assert secondary.sent == []
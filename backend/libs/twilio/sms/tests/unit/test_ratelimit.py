@@ -0,0 +1,135 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from libs.twilio.sms.client import TwilioClient
+from libs.twilio.sms.config import RateLimitPolicy
+from libs.twilio.sms.exceptions import ThrottledError
+from libs.twilio.sms.ratelimit import LocalTokenBucket, RateLimiter
+
+
+@pytest.fixture
+def no_redis():
+    with patch('libs.twilio.sms.ratelimit.get_redis', return_value=None):
+        yield
+
+
+def test_local_bucket_allows_burst_then_waits():
+    """Test that the local bucket grants `burst` tokens then reports the wait"""
+    bucket = LocalTokenBucket()
+
+    assert bucket.take("key", rate=2, burst=2) == 0
+    assert bucket.take("key", rate=2, burst=2) == 0
+    assert bucket.take("key", rate=2, burst=2) == pytest.approx(0.5, abs=0.01)
+
+
+def test_local_bucket_refills_over_time():
+    """Test that tokens come back at `rate` per second"""
+    bucket = LocalTokenBucket()
+    with patch('libs.twilio.sms.ratelimit.time.monotonic', side_effect=[0.0, 0.0, 1.0]):
+        assert bucket.take("key", rate=1, burst=1) == 0
+        assert bucket.take("key", rate=1, burst=1) == pytest.approx(1.0)
+        assert bucket.take("key", rate=1, burst=1) == 0
+
+
+def test_fail_fast_raises_throttled(no_redis):
+    """Test that fail-fast mode raises as soon as the bucket is empty"""
+    limiter = RateLimiter(RateLimitPolicy(account_rate=1, mode="fail_fast"))
+
+    limiter.acquire("AC123")
+    with pytest.raises(ThrottledError) as excinfo:
+        limiter.acquire("AC123")
+
+    assert excinfo.value.code == "THROTTLED"
+    assert excinfo.value.retry_after > 0
+
+
+def test_block_mode_waits_for_token(no_redis):
+    """Test that block mode sleeps until a token is available"""
+    limiter = RateLimiter(RateLimitPolicy(account_rate=1, timeout=2))
+    limiter.acquire("AC123")
+
+    with patch('libs.twilio.sms.ratelimit.time.sleep') as mock_sleep, \
+            patch.object(limiter, 'try_acquire', side_effect=[("bucket", 0.5), ("", 0.0)]):
+        limiter.acquire("AC123")
+
+    mock_sleep.assert_called_once_with(0.5)
+
+
+def test_block_mode_times_out(no_redis):
+    """Test that block mode gives up when the wait exceeds the timeout"""
+    limiter = RateLimiter(RateLimitPolicy(account_rate=0.1, timeout=1))
+    limiter.acquire("AC123")
+
+    with pytest.raises(ThrottledError):
+        limiter.acquire("AC123")
+
+
+def test_sender_bucket(no_redis):
+    """Test that each sender number has its own bucket on top of the account one"""
+    limiter = RateLimiter(RateLimitPolicy(account_rate=100, sender_rate=1, mode="fail_fast"))
+
+    limiter.acquire("AC123", "+15550001")
+    limiter.acquire("AC123", "+15550002")
+    with pytest.raises(ThrottledError) as excinfo:
+        limiter.acquire("AC123", "+15550001")
+
+    assert excinfo.value.bucket == "twilio:ratelimit:AC123:+15550001"
+
+
+def test_redis_bucket_is_used():
+    """Test that tokens are taken through the Redis script, registered once, when Redis is up"""
+    redis = MagicMock()
+    script = redis.register_script.return_value
+    script.registered_client = redis
+    script.return_value = [1, b"0.25"]
+    limiter = RateLimiter(RateLimitPolicy(account_rate=4, account_burst=8, sender_rate=1))
+
+    with patch('libs.twilio.sms.ratelimit.get_redis', return_value=redis):
+        assert limiter.try_acquire("AC123", "+15550001") == ("twilio:ratelimit:AC123", 0.25)
+        script.return_value = [0, b"0"]
+        assert limiter.try_acquire("AC123", "+15550001") == ("", 0.0)
+
+    redis.register_script.assert_called_once()
+    script.assert_called_with(
+        keys=["twilio:ratelimit:AC123", "twilio:ratelimit:AC123:+15550001"], args=[4, 8, 1, 1], client=redis,
+    )
+
+
+def test_empty_sender_bucket_spares_the_account(no_redis):
+    """Test that a call refused by its sender bucket takes no account token"""
+    limiter = RateLimiter(RateLimitPolicy(account_rate=0.01, account_burst=2, sender_rate=0.01, mode="fail_fast"))
+    limiter.acquire("AC123", "+15550001")
+
+    for _ in range(3):
+        with pytest.raises(ThrottledError):
+            limiter.acquire("AC123", "+15550001")
+    limiter.acquire("AC123", "+15550002")
+
+
+def test_redis_failure_falls_back_to_local():
+    """Test that a Redis error falls back to the in-process bucket"""
+    redis = MagicMock()
+    redis.register_script.return_value.side_effect = ConnectionError("Redis down")
+    limiter = RateLimiter(RateLimitPolicy(account_rate=1))
+
+    with patch('libs.twilio.sms.ratelimit.get_redis', return_value=redis), \
+            patch('libs.twilio.sms.ratelimit.mark_redis_down') as mock_mark_down:
+        assert limiter.try_acquire("AC123") == ("", 0.0)
+
+    mock_mark_down.assert_called_once()
+
+
+def test_client_consults_limiter(mock_twilio_config, mock_twilio_client, no_redis):
+    """Test that TwilioClient takes a token before calling the API"""
+    config = mock_twilio_config.model_copy(
+        update={"rate_limit": RateLimitPolicy(account_rate=1, mode="fail_fast")}
+    )
+    client = TwilioClient(config)
+    client.send_message("+1987654321", "First")
+
+    with pytest.raises(ThrottledError):
+        client.send_message("+1987654321", "Second")
+
+    mock_instance = mock_twilio_client.return_value
+    assert mock_instance.messages.create.call_count == 1
@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from libs.twilio.sms.client import TwilioClient
+from libs.twilio.sms.config import RetryPolicy
+from libs.twilio.sms.exceptions import (
+    InvalidPhoneNumberError, RateLimitError, TwilioAPIError,
+)
+from libs.twilio.sms.retry import call_with_retry, compute_delay, is_retryable
+
+
+@pytest.fixture
+def no_sleep():
+    with patch('libs.twilio.sms.retry.time.sleep') as mock_sleep:
+        yield mock_sleep
+
+
+def test_is_retryable():
+    """Test which errors are considered transient"""
+    assert is_retryable(RateLimitError("Too many requests", retry_after=1))
+    assert is_retryable(TwilioAPIError("Service unavailable", "20503", status=503))
+    assert is_retryable(TwilioAPIError("Connection reset", "CONNECTION_ERROR"))
+    assert not is_retryable(TwilioAPIError("Invalid To", "21211", status=400))
+    assert not is_retryable(TwilioAPIError("Unexpected", "UNKNOWN"))
+    assert not is_retryable(InvalidPhoneNumberError("123"))
+
+
+def test_compute_delay_backoff_and_retry_after():
+    """Test exponential backoff, its cap, and the Retry-After floor"""
+    policy = RetryPolicy(base_delay=0.5, max_delay=1.5, jitter=0)
+    error = TwilioAPIError("Service unavailable", "20503", status=503)
+
+    assert compute_delay(policy, 1, error) == 0.5
+    assert compute_delay(policy, 2, error) == 1.0
+    assert compute_delay(policy, 3, error) == 1.5
+    assert compute_delay(policy, 1, RateLimitError("Slow down", retry_after=4)) == 4
+
+
+def test_compute_delay_jitter():
+    """Test that jitter only ever shortens the delay"""
+    policy = RetryPolicy(base_delay=1, jitter=0.5)
+    error = TwilioAPIError("Service unavailable", "20503", status=503)
+
+    delays = [compute_delay(policy, 1, error) for _ in range(50)]
+    assert all(0.5 <= delay <= 1 for delay in delays)
+
+
+def test_call_with_retry_recovers(no_sleep):
+    """Test that a transient error is retried until success"""
+    func = MagicMock(side_effect=[
+        TwilioAPIError("Service unavailable", "20503", status=503),
+        "ok",
+    ])
+
+    assert call_with_retry(RetryPolicy(), "send_message", func) == "ok"
+    assert func.call_count == 2
+    no_sleep.assert_called_once()
+
+
+def test_call_with_retry_gives_up_after_max_attempts(no_sleep):
+    """Test that the last error is raised once attempts are exhausted"""
+    func = MagicMock(side_effect=TwilioAPIError("Service unavailable", "20503", status=503))
+
+    with pytest.raises(TwilioAPIError):
+        call_with_retry(RetryPolicy(max_attempts=3), "send_message", func)
+    assert func.call_count == 3
+
+
+def test_call_with_retry_does_not_retry_permanent_errors(no_sleep):
+    """Test that non-transient errors are raised immediately"""
+    func = MagicMock(side_effect=TwilioAPIError("Invalid To", "21211", status=400))
+
+    with pytest.raises(TwilioAPIError):
+        call_with_retry(RetryPolicy(), "send_message", func)
+    func.assert_called_once()
+    no_sleep.assert_not_called()
+
+
+def test_call_with_retry_respects_deadline(no_sleep):
+    """Test that a Retry-After longer than the deadline is not waited for"""
+    func = MagicMock(side_effect=RateLimitError("Slow down", retry_after=60))
+
+    with pytest.raises(RateLimitError):
+        call_with_retry(RetryPolicy(deadline=5), "send_message", func)
+    func.assert_called_once()
+    no_sleep.assert_not_called()
+
+
+def test_client_retries_server_errors(mock_twilio_config, mock_twilio_client, no_sleep):
+    """Test that TwilioClient retries 5xx answers from the SDK"""
+    from twilio.base.exceptions import TwilioRestException
+    mock_instance = mock_twilio_client.return_value
+    message = MagicMock(sid="SM123456", status="queued", to="+1987654321")
+    mock_instance.messages.create.side_effect = [
+        TwilioRestException(503, "/Messages.json", "Service unavailable", 20503),
+        message,
+    ]
+
+    response = TwilioClient(mock_twilio_config).send_message("+1987654321", "Test message")
+
+    assert response["sid"] == "SM123456"
+    assert mock_instance.messages.create.call_count == 2
+
+
+def test_client_retries_connection_errors(mock_twilio_config, mock_twilio_client, no_sleep):
+    """Test that TwilioClient retries connection resets"""
+    mock_instance = mock_twilio_client.return_value
+    mock_instance.messages.create.side_effect = ConnectionResetError("Connection reset by peer")
+
+    with pytest.raises(TwilioAPIError) as excinfo:
+        TwilioClient(mock_twilio_config).send_message("+1987654321", "Test message")
+
+    assert excinfo.value.twilio_code == "CONNECTION_ERROR"
+    assert mock_instance.messages.create.call_count == mock_twilio_config.retry.max_attempts
@@ -0,0 +1,168 @@
+from collections import Counter
+
+import pytest
+from pydantic import ValidationError
+
+from libs.twilio.sms.config import SenderPoolPolicy, SenderRoute
+from libs.twilio.sms.fake_server import FakeTwilioServer, _error
+from libs.twilio.sms.routing import get_sender_pool
+from libs.twilio.sms.sender import async_send_sms, send_sms
+
+A = "+14155550001"
+B = "+14155550002"
+
+
+@pytest.fixture
+def server():
+    with FakeTwilioServer() as server:
+        yield server
+
+
+def _pool_config(server, *senders, **policy):
+    return server.config(sender_pool=SenderPoolPolicy(senders=senders, **policy))
+
+
+def _senders(server):
+    return Counter(form.get("From") or form.get("MessagingServiceSid") for _, _, form in server.requests)
+
+
+def test_weighted_round_robin(server):
+    """Test that senders get traffic in proportion to their weight"""
+    config = _pool_config(server, SenderRoute(from_number=A), SenderRoute(from_number=B, weight=2), sticky=False)
+
+    results = [send_sms(config, f"+1415555{i:04d}", "Hello") for i in range(30)]
+
+    assert all(result.success for result in results)
+    assert _senders(server) == {A: 10, B: 20}
+    assert [result.sender for result in results[:3]] == [B, A, B]
+
+
+def test_sticky_routing(server):
+    """Test that a recipient keeps the same sender and recipients spread over all senders"""
+    config = _pool_config(server, SenderRoute(from_number=A), SenderRoute(from_number=B))
+
+    first = send_sms(config, "+14155552671", "Hello").sender
+    assert all(send_sms(config, "+14155552671", "Hello").sender == first for _ in range(5))
+
+    spread = {send_sms(config, f"+1415555{i:04d}", "Hello").sender for i in range(40)}
+    assert spread == {A, B}
+
+
+def test_messaging_service_sender(server):
+    """Test that a messaging service route sends with MessagingServiceSid instead of From"""
+    config = _pool_config(server, SenderRoute(messaging_service_sid="MG123"))
+
+    result = send_sms(config, "+14155552671", "Hello")
+
+    form = server.requests[0][2]
+    assert result.sender == "MG123"
+    assert form["MessagingServiceSid"] == "MG123"
+    assert "From" not in form
+
+
+def test_other_account_route(server):
+    """Test that a route of another account sends with that account"""
+    other = "AC" + "1" * 32
+    config = _pool_config(server, SenderRoute(from_number=A, account_sid=other, auth_token="other_token"))
+
+    assert send_sms(config, "+14155552671", "Hello").success is True
+    assert f"/Accounts/{other}/Messages.json" in server.requests[0][1]
+
+
+def test_rate_spills_to_the_next_sender(server):
+    """Test that a sender out of its rate hands messages to the next one, then throttles"""
+    config = _pool_config(
+        server, SenderRoute(from_number=A, rate=0.01, burst=1), SenderRoute(from_number=B, rate=0.01, burst=1),
+    )
+
+    senders = {send_sms(config, "+14155552671", "Hello").sender for _ in range(2)}
+    throttled = send_sms(config, "+14155552671", "Hello")
+
+    assert senders == {A, B}
+    assert throttled.success is False
+    assert throttled.error_code == "THROTTLED"
+    assert throttled.retry_after > 0
+    assert len(server.requests) == 2
+
+
+class _RefusingServer(FakeTwilioServer):
+    """Fake server refusing every message sent from A as not SMS-capable"""
+
+    def _create_message(self, form, account):
+        if form.get("From") == A:
+            return 400, _error(400, 21606, "The From phone number is not a valid, SMS-capable number")
+        return super()._create_message(form, account)
+
+
+@pytest.mark.parametrize("redis", [True, False])
+def test_failing_sender_is_taken_out(request, redis):
+    """Test that sender errors fail over to another sender and take the sender out"""
+    if redis:
+        request.getfixturevalue("fake_redis")
+    with _RefusingServer() as server:
+        config = _pool_config(
+            server, SenderRoute(from_number=A), SenderRoute(from_number=B), sticky=False, failure_threshold=2,
+        )
+        results = [send_sms(config, f"+1415555{i:04d}", "Hello") for i in range(6)]
+
+    assert all(result.success and result.sender == B for result in results)
+    assert get_sender_pool(config).down() == [SenderRoute(from_number=A)]
+    assert _senders(server) == {A: 2, B: 6}
+
+
+def test_message_errors_are_not_failed_over(server):
+    """Test that errors about the message itself are returned without trying other senders"""
+    config = _pool_config(server, SenderRoute(from_number=A), SenderRoute(from_number=B))
+    server.errors.append((400, 21610, {}))
+
+    result = send_sms(config, "+14155552671", "Hello")
+
+    assert result.success is False
+    assert len(server.requests) == 1
+    assert get_sender_pool(config).down() == []
+
+
+def test_every_sender_failing(server):
+    """Test that the error is returned once every sender refused the message"""
+    config = _pool_config(server, SenderRoute(from_number=A), SenderRoute(from_number=B))
+    server.errors.extend([(400, 21212, {}), (400, 21212, {})])
+
+    result = send_sms(config, "+14155552671", "Hello")
+
+    assert result.success is False
+    assert result.error_code == "TWILIO_API_ERROR"
+    assert _senders(server) == {A: 1, B: 1}
+
+
+def test_sender_id_bypasses_the_pool(server):
+    """Test that an explicit sender_id is used as is"""
+    config = _pool_config(server, SenderRoute(from_number=A))
+
+    assert send_sms(config, "+14155552671", "Hello", sender_id=B).sender == B
+    assert _senders(server) == {B: 1}
+
+
+def test_route_validation():
+    """Test that routes need exactly one sender and complete credentials"""
+    with pytest.raises(ValidationError):
+        SenderRoute()
+    with pytest.raises(ValidationError):
+        SenderRoute(from_number=A, messaging_service_sid="MG123")
+    with pytest.raises(ValidationError):
+        SenderRoute(from_number="14155550001")
+    with pytest.raises(ValidationError):
+        SenderRoute(from_number=A, account_sid="AC1")
+    with pytest.raises(ValidationError):
+        SenderPoolPolicy(senders=())
+
+
+@pytest.mark.asyncio
+async def test_async_send_uses_the_pool(fake_twilio_api):
+    """Test that async_send_sms routes through the pool too"""
+    config = fake_twilio_api.config(sender_pool=SenderPoolPolicy(senders=(SenderRoute(from_number=B),)))
+
+    result = await async_send_sms(config, "+14155552671", "Hello")
+
+    assert result.success is True
+    assert result.sender == B
+    assert fake_twilio_api.requests[0][2]["From"] == B
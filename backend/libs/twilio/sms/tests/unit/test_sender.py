@@ -1,7 +1,9 @@
+from unittest.mock import patch
+
 import pytest
 
-from libs.twilio.sms.sender import send_sms
-from libs.twilio.sms.types import SMSDeliveryResult
+from libs.twilio.sms.sender import async_send_sms, send_sms, send_sms_bulk
+from libs.twilio.sms.types import SMSDeliveryResult, SMSMessage
 from libs.twilio.sms.exceptions import InvalidPhoneNumberError, TwilioAPIError
 
 
@@ -9,7 +11,7 @@ def test_send_sms_success(mock_twilio_config, mock_twilio_client_for_sender):
     """Test that send_sms successfully sends an SMS"""
     result = send_sms(
         config=mock_twilio_config,
-        phone_number="+1987654321",
+        phone_number="+14155552671",
         message="Test message"
     )
     
@@ -19,7 +21,7 @@ def test_send_sms_success(mock_twilio_config, mock_twilio_client_for_sender):
     # Verify send_message was called with correct parameters
     mock_instance = mock_twilio_client_for_sender.return_value
     mock_instance.send_message.assert_called_once_with(
-        to="+1987654321",
+        to="+14155552671",
         body="Test message",
         from_=mock_twilio_config.from_number
     )
@@ -28,7 +30,7 @@ def test_send_sms_success(mock_twilio_config, mock_twilio_client_for_sender):
     assert isinstance(result, SMSDeliveryResult)
     assert result.success is True
     assert result.message_sid == "SM123456"
-    assert result.to == "+1987654321"
+    assert result.to == "+14155552671"
     assert result.error_code is None
     assert result.error_message is None
 
@@ -37,7 +39,7 @@ def test_send_sms_custom_sender(mock_twilio_config, mock_twilio_client_for_sende
     """Test that send_sms can use a custom sender ID"""
     result = send_sms(
         config=mock_twilio_config,
-        phone_number="+1987654321",
+        phone_number="+14155552671",
         message="Test message",
         sender_id="+1555123456"
     )
@@ -45,7 +47,7 @@ def test_send_sms_custom_sender(mock_twilio_config, mock_twilio_client_for_sende
     # Verify send_message was called with custom sender ID
     mock_instance = mock_twilio_client_for_sender.return_value
     mock_instance.send_message.assert_called_once_with(
-        to="+1987654321",
+        to="+14155552671",
         body="Test message",
         from_="+1555123456"
     )
@@ -71,7 +73,7 @@ def test_send_sms_twilio_api_error(mock_twilio_config, mock_twilio_client_for_se
     mock_instance.send_message.side_effect = TwilioAPIError("Twilio error", "30001")
     result = send_sms(
         config=mock_twilio_config,
-        phone_number="+1987654321",
+        phone_number="+14155552671",
         message="Test message"
     )
     assert result.success is False
@@ -85,7 +87,7 @@ def test_send_sms_generic_exception(mock_twilio_config, mock_twilio_client_for_s
     mock_instance.send_message.side_effect = Exception("Generic error")
     result = send_sms(
         config=mock_twilio_config,
-        phone_number="+1987654321",
+        phone_number="+14155552671",
         message="Test message"
     )
     assert result.success is False
@@ -101,14 +103,164 @@ def test_send_sms_api_error(mock_twilio_config, mock_twilio_client_for_sender):
     
     result = send_sms(
         config=mock_twilio_config,
-        phone_number="+1987654321",
+        phone_number="+14155552671",
         message="Test message"
     )
     
     # Verify error result
     assert isinstance(result, SMSDeliveryResult)
     assert result.success is False
-    assert result.to == "+1987654321"
+    assert result.to == "+14155552671"
     assert result.message_sid is None
     assert result.error_code == "TWILIO_API_ERROR"
     assert "api error" in result.error_message.lower()
+
+
+@pytest.mark.asyncio
+async def test_async_send_sms_success(fake_twilio_config, fake_twilio_api):
+    """Test that async_send_sms sends an SMS through the async HTTP client"""
+    result = await async_send_sms(
+        config=fake_twilio_config,
+        phone_number="+14155552671",
+        message="Test message"
+    )
+
+    assert isinstance(result, SMSDeliveryResult)
+    assert result.success is True
+    assert result.message_sid.startswith("SM")
+    _, path, form = fake_twilio_api.requests[0]
+    assert path == "/2010-04-01/Accounts/AC123456789/Messages.json"
+    assert form == {"To": "+14155552671", "Body": "Test message", "From": "+1234567890"}
+
+
+@pytest.mark.asyncio
+async def test_async_send_sms_api_error(fake_twilio_config, fake_twilio_api):
+    """Test that async_send_sms converts API errors into a failed result"""
+    fake_twilio_api.errors = [(400, 21211, {})]
+
+    result = await async_send_sms(
+        config=fake_twilio_config,
+        phone_number="+14155552671",
+        message="Test message"
+    )
+
+    assert result.success is False
+    assert result.error_code == "TWILIO_API_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_async_send_sms_invalid_phone(mock_twilio_config):
+    """Test that async_send_sms validates phone numbers"""
+    with pytest.raises(InvalidPhoneNumberError):
+        await async_send_sms(
+            config=mock_twilio_config,
+            phone_number="1987654321",
+            message="Test message"
+        )
+
+
+@pytest.mark.asyncio
+async def test_async_send_sms_shares_pool_per_loop(fake_twilio_config, fake_twilio_api):
+    """Test that concurrent async sends reuse the loop's shared client"""
+    import asyncio
+    from libs.twilio.sms.client import get_async_client
+
+    results = await asyncio.gather(*[
+        async_send_sms(fake_twilio_config, "+14155552671", f"Message {i}") for i in range(5)
+    ])
+
+    assert all(result.success for result in results)
+    assert get_async_client(fake_twilio_config) is get_async_client(fake_twilio_config)
+
+
+def test_send_sms_bulk_yields_every_result(mock_twilio_config, mock_twilio_client_for_sender):
+    """Test that send_sms_bulk sends every message and reports a summary"""
+    summaries = []
+    messages = [SMSMessage(to="+14155552671", body=f"Message {i}") for i in range(20)]
+
+    results = list(send_sms_bulk(
+        mock_twilio_config, messages, concurrency=4, on_complete=summaries.append
+    ))
+
+    assert len(results) == 20
+    assert all(result.success for result in results)
+    mock_instance = mock_twilio_client_for_sender.return_value
+    assert mock_instance.send_message.call_count == 20
+    summary = summaries[0]
+    assert summary.total == 20
+    assert summary.succeeded == 20
+    assert summary.failed == 0
+    assert summary.throughput > 0
+
+
+def test_send_sms_bulk_accepts_tuples_and_reports_invalid(mock_twilio_config, mock_twilio_client_for_sender):
+    """Test that send_sms_bulk accepts tuples and turns invalid numbers into failed results"""
+    summaries = []
+    results = list(send_sms_bulk(
+        mock_twilio_config,
+        [("+14155552671", "Hello"), ("1987654321", "Hello")],
+        on_complete=summaries.append
+    ))
+
+    failed = [result for result in results if not result.success]
+    assert len(results) == 2
+    assert len(failed) == 1
+    assert failed[0].error_code == "INVALID_PHONE"
+    assert summaries[0].failed == 1
+
+
+def test_send_sms_bulk_streams_lazily(mock_twilio_config, mock_twilio_client_for_sender):
+    """Test that send_sms_bulk never pulls more than `concurrency` messages ahead"""
+    consumed = []
+
+    def messages():
+        for i in range(1000):
+            consumed.append(i)
+            yield ("+14155552671", f"Message {i}")
+
+    bulk = send_sms_bulk(mock_twilio_config, messages(), concurrency=3)
+    first = next(bulk)
+    bulk.close()
+
+    assert first.success is True
+    assert len(consumed) <= 4
+
+
+def test_send_sms_bulk_pauses_on_rate_limit(mock_twilio_config, mock_twilio_client_for_sender):
+    """Test that send_sms_bulk stops dispatching for retry_after seconds when rate limited"""
+    from libs.twilio.sms.exceptions import RateLimitError
+    mock_instance = mock_twilio_client_for_sender.return_value
+    mock_instance.send_message.side_effect = [
+        RateLimitError("Too many requests", retry_after=2),
+        {"sid": "SM123456"},
+    ]
+
+    with patch('libs.twilio.sms.sender.time.sleep') as mock_sleep:
+        results = list(send_sms_bulk(
+            mock_twilio_config, [("+14155552671", "A"), ("+14155552671", "B")], concurrency=1
+        ))
+
+    assert [result.success for result in results] == [False, True]
+    assert results[0].error_code == "RATE_LIMIT_EXCEEDED"
+    assert results[0].retry_after == 2
+    mock_sleep.assert_called_once()
+    assert 0 < mock_sleep.call_args.args[0] <= 2
+
+
+def test_send_sms_bulk_invalid_concurrency(mock_twilio_config):
+    """Test that send_sms_bulk rejects a non-positive concurrency"""
+    with pytest.raises(ValueError):
+        list(send_sms_bulk(mock_twilio_config, [], concurrency=0))
+
+
+@pytest.mark.asyncio
+async def test_async_send_sms_retries_rate_limit(fake_twilio_config, fake_twilio_api):
+    """Test that async_send_sms retries a 20429 honoring the Retry-After header"""
+    fake_twilio_api.errors = [(429, 20429, {"Retry-After": "1"})]
+
+    with patch('libs.twilio.sms.retry.asyncio.sleep') as mock_sleep:
+        result = await async_send_sms(fake_twilio_config, "+14155552671", "Test message")
+
+    assert result.success is True
+    assert len(fake_twilio_api.requests) == 2
+    assert mock_sleep.call_args.args[0] >= 1
@@ -1,12 +1,14 @@
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 import pytest
 
-from libs.twilio.sms.exceptions import InvalidPhoneNumberError
+from libs.twilio.sms.exceptions import CircuitOpenError, InvalidPhoneNumberError, TwilioAPIError
 from libs.twilio.sms.types import (
     VerificationChannel, VerificationStatus, VerificationResult,
 )
-from libs.twilio.sms.verifier import start_verification, check_verification
+from libs.twilio.sms.verifier import (
+    async_check_verification, async_start_verification, check_verification, start_verification,
+)
 
 
 def test_start_verification_success(mock_twilio_config_with_service, mock_twilio_client):
@@ -15,16 +17,17 @@ def test_start_verification_success(mock_twilio_config_with_service, mock_twilio
     mock_instance = mock_twilio_client.return_value
     verification = mock_instance.verify.v2.services.return_value.verifications.create.return_value
     verification.status = "pending"
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         result = start_verification(
             config=mock_twilio_config_with_service,
-            phone_number="+1987654321"
+            phone_number="+14155552671"
         )
 
         # Verify client was initialized with correct credentials
         mock_twilio_client.assert_called_once_with(
             mock_twilio_config_with_service.account_sid,
-            mock_twilio_config_with_service.auth_token
+            mock_twilio_config_with_service.auth_token,
+            http_client=ANY,
         )
 
         # Verify service was accessed with correct SID
@@ -35,14 +38,14 @@ def test_start_verification_success(mock_twilio_config_with_service, mock_twilio
         # Verify verification was created with correct parameters
         service = mock_instance.verify.v2.services.return_value
         service.verifications.create.assert_called_once_with(
-            to="+1987654321",
+            to="+14155552671",
             channel="sms"
         )
 
         # Verify result
         assert isinstance(result, VerificationResult)
         assert result.success is True
-        assert result.to == "+1987654321"
+        assert result.to == "+14155552671"
         assert result.status == VerificationStatus.PENDING
         assert result.error_code is None
         assert result.error_message is None
@@ -50,10 +53,10 @@ def test_start_verification_success(mock_twilio_config_with_service, mock_twilio
 
 def test_start_verification_custom_channel(mock_twilio_config_with_service, mock_twilio_client):
     """Test that start_verification can use a custom channel"""
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         result = start_verification(
             config=mock_twilio_config_with_service,
-            phone_number="+1987654321",
+            phone_number="+14155552671",
             channel=VerificationChannel.CALL
         )
 
@@ -61,7 +64,7 @@ def test_start_verification_custom_channel(mock_twilio_config_with_service, mock
         mock_instance = mock_twilio_client.return_value
         service = mock_instance.verify.v2.services.return_value
         service.verifications.create.assert_called_once_with(
-            to="+1987654321",
+            to="+14155552671",
             channel="call"
         )
 
@@ -82,7 +85,7 @@ def test_start_verification_missing_service_sid(mock_twilio_config):
     with pytest.raises(ValueError) as excinfo:
         start_verification(
             config=mock_twilio_config,  # No service_sid
-            phone_number="+1987654321"
+            phone_number="+14155552671"
         )
     assert "service sid" in str(excinfo.value).lower()
 
@@ -94,10 +97,10 @@ def test_start_verification_twilio_exception(mock_twilio_config_with_service, mo
     rate_limit_exc = TwilioRestException("429 Too Many Requests", 20429)
     mock_instance = mock_twilio_client.return_value
     mock_instance.verify.v2.services.return_value.verifications.create.side_effect = rate_limit_exc
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         result = start_verification(
             config=mock_twilio_config_with_service,
-            phone_number="+1987654321"
+            phone_number="+14155552671"
         )
         assert result.success is False
         assert result.error_code == "TWILIO_API_ERROR"
@@ -105,10 +108,10 @@ def test_start_verification_twilio_exception(mock_twilio_config_with_service, mo
     # Mock TwilioRestException for other error
     other_exc = TwilioRestException("Twilio error", 99999)
     mock_instance.verify.v2.services.return_value.verifications.create.side_effect = other_exc
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         result = start_verification(
             config=mock_twilio_config_with_service,
-            phone_number="+1987654321"
+            phone_number="+14155552671"
         )
         assert result.success is False
         assert result.error_code == "TWILIO_API_ERROR"
@@ -118,10 +121,10 @@ def test_start_verification_generic_exception(mock_twilio_config_with_service, m
     """Test that start_verification handles unexpected exceptions"""
     mock_instance = mock_twilio_client.return_value
     mock_instance.verify.v2.services.return_value.verifications.create.side_effect = Exception("Generic error")
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         result = start_verification(
             config=mock_twilio_config_with_service,
-            phone_number="+1987654321"
+            phone_number="+14155552671"
         )
         assert result.success is False
         assert result.error_code == "TWILIO_API_ERROR"
@@ -133,10 +136,10 @@ def test_check_verification_success(mock_twilio_config_with_service, mock_twilio
     mock_instance = mock_twilio_client.return_value
     verification_check = mock_instance.verify.v2.services.return_value.verification_checks.create.return_value
     verification_check.status = "approved"
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         status = check_verification(
             config=mock_twilio_config_with_service,
-            phone_number="+1987654321",
+            phone_number="+14155552671",
             code="123456"
         )
 
@@ -144,7 +147,7 @@ def test_check_verification_success(mock_twilio_config_with_service, mock_twilio
         mock_instance = mock_twilio_client.return_value
         service = mock_instance.verify.v2.services.return_value
         service.verification_checks.create.assert_called_once_with(
-            to="+1987654321",
+            to="+14155552671",
             code="123456"
         )
 
@@ -157,7 +160,7 @@ def test_check_verification_missing_service_sid(mock_twilio_config):
     with pytest.raises(ValueError) as excinfo:
         check_verification(
             config=mock_twilio_config,  # No service_sid
-            phone_number="+1987654321",
+            phone_number="+14155552671",
             code="123456"
         )
     assert "service sid" in str(excinfo.value).lower()
@@ -170,11 +173,11 @@ def test_check_verification_twilio_exception(mock_twilio_config_with_service, mo
     rate_limit_exc = TwilioRestException("429 Too Many Requests", 20429)
     mock_instance = mock_twilio_client.return_value
     mock_instance.verify.v2.services.return_value.verification_checks.create.side_effect = rate_limit_exc
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         with pytest.raises(Exception) as excinfo:
             check_verification(
                 config=mock_twilio_config_with_service,
-                phone_number="+1987654321",
+                phone_number="+14155552671",
                 code="123456"
             )
         assert "429" in str(excinfo.value) or "rate limit" in str(excinfo.value).lower()
@@ -182,11 +185,11 @@ def test_check_verification_twilio_exception(mock_twilio_config_with_service, mo
     # Mock TwilioRestException for other error
     other_exc = TwilioRestException("Twilio error", 99999)
     mock_instance.verify.v2.services.return_value.verification_checks.create.side_effect = other_exc
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         with pytest.raises(Exception) as excinfo:
             check_verification(
                 config=mock_twilio_config_with_service,
-                phone_number="+1987654321",
+                phone_number="+14155552671",
                 code="123456"
             )
         assert "twilio error" in str(excinfo.value).lower()
@@ -197,17 +200,28 @@ def test_check_verification_generic_exception(mock_twilio_config_with_service, m
     from libs.twilio.sms.exceptions import TwilioAPIError
     mock_instance = mock_twilio_client.return_value
     mock_instance.verify.v2.services.return_value.verification_checks.create.side_effect = Exception("Generic error")
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         with pytest.raises(TwilioAPIError) as excinfo:
             check_verification(
                 config=mock_twilio_config_with_service,
-                phone_number="+1987654321",
+                phone_number="+14155552671",
                 code="123456"
             )
         assert excinfo.value.code == "TWILIO_API_ERROR"
         assert "generic error" in str(excinfo.value).lower()
 
 
+def test_check_verification_wraps_client_errors(mock_twilio_config_with_service):
+    """Test that errors raised by the client, breaker included, surface as VERIFICATION_CHECK_ERROR"""
+    with patch('libs.twilio.sms.backends.get_client') as get_client:
+        get_client.return_value.create_verification_check.side_effect = CircuitOpenError("verification_check", 5)
+        with pytest.raises(TwilioAPIError) as excinfo:
+            check_verification(mock_twilio_config_with_service, "+14155552671", "123456")
+
+    assert excinfo.value.twilio_code == "VERIFICATION_CHECK_ERROR"
+    assert "circuit open" in str(excinfo.value).lower()
+
+
 def test_check_verification_failed(mock_twilio_config_with_service, mock_twilio_client):
     """Test that check_verification handles failed verification"""
     # Setup mock to return failed status
@@ -215,12 +229,75 @@ def test_check_verification_failed(mock_twilio_config_with_service, mock_twilio_
     verification_check = mock_instance.verify.v2.services.return_value.verification_checks.create.return_value
     verification_check.status = "canceled"
 
-    with patch('libs.twilio.sms.verifier.twilio.rest.Client', mock_twilio_client):
+    with patch('libs.twilio.sms.client.twilio.rest.Client', mock_twilio_client):
         status = check_verification(
             config=mock_twilio_config_with_service,
-            phone_number="+1987654321",
+            phone_number="+14155552671",
             code="123456"
         )
 
         # Verify status
         assert status == VerificationStatus.CANCELED
+
+
+@pytest.mark.asyncio
+async def test_async_start_verification_success(fake_twilio_config, fake_twilio_api):
+    """Test that async_start_verification creates a verification via the async client"""
+    result = await async_start_verification(
+        config=fake_twilio_config,
+        phone_number="+14155552671"
+    )
+
+    assert isinstance(result, VerificationResult)
+    assert result.success is True
+    assert result.status == VerificationStatus.PENDING
+    _, path, form = fake_twilio_api.requests[0]
+    assert path == "/v2/Services/VA123456789/Verifications"
+    assert form == {"To": "+14155552671", "Channel": "sms"}
+
+
+@pytest.mark.asyncio
+async def test_async_start_verification_api_error(fake_twilio_config, fake_twilio_api):
+    """Test that async_start_verification returns a failed result on API errors"""
+    fake_twilio_api.errors = [(400, 60200, {})]
+
+    result = await async_start_verification(
+        config=fake_twilio_config,
+        phone_number="+14155552671"
+    )
+
+    assert result.success is False
+    assert result.status == VerificationStatus.FAILED
+    assert result.error_code == "TWILIO_API_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_async_start_verification_missing_service_sid(mock_twilio_config):
+    """Test that async_start_verification requires a service SID"""
+    with pytest.raises(ValueError):
+        await async_start_verification(
+            config=mock_twilio_config,
+            phone_number="+14155552671"
+        )
+
+
+@pytest.mark.asyncio
+async def test_async_check_verification(fake_twilio_config, fake_twilio_api):
+    """Test that async_check_verification maps the check status"""
+    approved = await async_check_verification(fake_twilio_config, "+14155552671", "123456")
+    pending = await async_check_verification(fake_twilio_config, "+14155552671", "000000")
+
+    assert approved == VerificationStatus.APPROVED
+    assert pending == VerificationStatus.PENDING
+    _, path, form = fake_twilio_api.requests[0]
+    assert path == "/v2/Services/VA123456789/VerificationCheck"
+    assert form == {"To": "+14155552671", "Code": "123456"}
+
+
+@pytest.mark.asyncio
+async def test_async_check_verification_api_error(fake_twilio_config, fake_twilio_api):
+    """Test that async_check_verification raises domain errors"""
+    fake_twilio_api.errors = [(404, 20404, {})]
+
+    with pytest.raises(TwilioAPIError):
+        await async_check_verification(fake_twilio_config, "+14155552671", "123456")
@@ -26,10 +26,56 @@ class SMSDeliveryResult(BaseModel):
     message_sid: Optional[str] = Field(
         None, description="Twilio message SID if successful"
     )
+    sender: Optional[str] = Field(
+        None, description="Number or messaging service SID the SMS was sent from"
+    )
     error_code: Optional[str] = Field(None, description="Error code if unsuccessful")
     error_message: Optional[str] = Field(
         None, description="Error message if unsuccessful"
     )
+    retry_after: Optional[float] = Field(
+        None, description="Seconds to wait before retrying when rate limited"
+    )
+    outbox_id: Optional[str] = Field(
+        None, description="Outbox message ID when the SMS was queued instead of sent"
+    )
+
+
+class OutboxStatus(str, Enum):
+    """Delivery states of a message queued in the outbox"""
+    QUEUED = "queued"
+    RETRYING = "retrying"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class OutboxMessageState(BaseModel):
+    """Delivery state of a queued message"""
+    id: str = Field(..., description="Outbox message ID")
+    status: OutboxStatus = Field(..., description="Current delivery state")
+    to: str = Field(..., description="Recipient phone number")
+    attempts: int = Field(0, description="Delivery attempts made so far")
+    message_sid: Optional[str] = Field(None, description="Twilio message SID once sent")
+    error_code: Optional[str] = Field(None, description="Error code of the last failed attempt")
+    error_message: Optional[str] = Field(None, description="Error message of the last failed attempt")
+    created_at: float = Field(..., description="Enqueue time (epoch seconds)")
+    updated_at: float = Field(..., description="Last state change (epoch seconds)")
+
+
+class SMSMessage(BaseModel):
+    """A single message of a bulk send"""
+    to: str = Field(..., description="Recipient phone number")
+    body: str = Field(..., description="SMS message content")
+    sender_id: Optional[str] = Field(None, description="Optional custom sender ID")
+
+
+class BulkSendSummary(BaseModel):
+    """Aggregate outcome of a bulk send"""
+    total: int = Field(..., description="Number of messages processed")
+    succeeded: int = Field(..., description="Number of messages accepted by Twilio")
+    failed: int = Field(..., description="Number of messages that failed")
+    elapsed_seconds: float = Field(..., description="Wall time of the whole send")
+    throughput: float = Field(..., description="Processed messages per second")
 
 
 class VerificationResult(BaseModel):
@@ -1,12 +1,12 @@
-import structlog
-
-import twilio.rest
-
+from .backends import get_verification_backend
 from .config import TwilioConfig
-from .exceptions import InvalidPhoneNumberError, TwilioAPIError, TwilioError
+from .dedup import get_deduplicator
+from .guard import get_guard
+from .log import get_logger
+from .phone import normalize_phone
 from .types import VerificationChannel, VerificationStatus, VerificationResult
 
-logger = structlog.get_logger()
+logger = get_logger()
 
 
 def start_verification(
@@ -14,74 +14,32 @@ def start_verification(
     phone_number: str,
     channel: VerificationChannel = VerificationChannel.SMS
 ) -> VerificationResult:
-    """Start a verification process using Twilio Verify
-    
+    """Start a verification process using Twilio Verify or local codes
+
     Args:
         config: TwilioConfig instance with account credentials
-        phone_number: Recipient phone number (must start with +)
+        phone_number: Recipient phone number, normalized to E.164
         channel: Verification channel (SMS, call, or email)
         
     Returns:
         VerificationResult with status and metadata
         
     Raises:
-        InvalidPhoneNumberError: If phone number format is invalid
-        TwilioAPIError: If the Twilio API returns an error
+        InvalidPhoneNumberError: If the phone number is not a valid number
+        OTPUnavailableError: If local codes are used and Redis is unreachable
     """
-    logger.info("Starting verification", phone_number=phone_number, channel=channel.value)
-    # Validate phone number
-    if not phone_number.startswith('+'):
-        logger.warn("Invalid phone number format", phone_number=phone_number)
-        raise InvalidPhoneNumberError(phone_number)  # pragma: no cover
-
-    # Validate service SID
-    if not config.service_sid:
-        logger.error("Missing service SID in config", config=config)
-        raise ValueError("Service SID is required for verification")
-
-    try:
-        logger.debug("Initializing Twilio client", account_sid=config.account_sid)
-        client = twilio.rest.Client(config.account_sid, config.auth_token)
-        service = client.verify.v2.services(config.service_sid)
-
-        logger.debug("Creating verification via Twilio API", to=phone_number, channel=channel.value)
-        verification = service.verifications.create(
-            to=phone_number, channel=channel.value
-        )
-
-        # Map status to enum
-        status = _map_verification_status(verification.status)
-        logger.info("Verification started", phone_number=phone_number, status=verification.status)
-
-        # Return result
-        return VerificationResult(
-            success=True,
-            to=phone_number,
-            status=status
-        )
-
-    except TwilioError as e:
-        # Handle domain-specific errors
-        logger.error("Error starting verification", phone_number=phone_number, error=str(e), code=getattr(e, 'code', None)) # pragma: no cover
-        return VerificationResult(
-            success=False,
-            to=phone_number,
-            status=VerificationStatus.FAILED,
-            error_code=e.code,
-            error_message=str(e)
-        )  # pragma: no cover
-
-    except Exception as e:
-        # Handle unexpected errors
-        logger.error("Unexpected error starting verification", phone_number=phone_number, error=str(e))  # pragma: no cover
-        error = TwilioAPIError(str(e), "UNKNOWN")  # pragma: no cover
-        return VerificationResult(
-            success=False,
-            to=phone_number,
-            status=VerificationStatus.FAILED,
-            error_code=error.code,
-            error_message=str(error)
-        )
+    logger.debug("Starting verification", phone_number=phone_number, channel=channel.value)
+    # Validate and normalize phone number before any network call
+    phone_number = normalize_phone(phone_number)
+    backend = get_verification_backend(config)
+
+    def start() -> VerificationResult:
+        return _started(config, backend.start(phone_number, channel))
+
+    deduplicator = get_deduplicator(config)
+    if deduplicator is None:
+        return start()
+    return deduplicator.start(phone_number, channel, start)
 
 
 def check_verification(
@@ -89,58 +47,126 @@ def check_verification(
         phone_number: str,
         code: str
 ) -> VerificationStatus:
-    """Check a verification code using Twilio Verify
+    """Check a verification code using Twilio Verify or local codes
     
     Args:
         config: TwilioConfig instance with account credentials
-        phone_number: Recipient phone number (must start with +)
+        phone_number: Recipient phone number, normalized to E.164
         code: Verification code to check
         
     Returns:
         VerificationStatus indicating the result
         
     Raises:
-        InvalidPhoneNumberError: If phone number format is invalid
+        InvalidPhoneNumberError: If the phone number is not a valid number
+        VerificationFailedError: If the guard rejects the code or the number
+            used up its attempts
+        TokenExpiredError: If no verification is known to be pending
+        TwilioAPIError: If the Twilio API returns an error
+        OTPUnavailableError: If local codes are used and Redis is unreachable
+    """
+    logger.debug("Checking verification", phone_number=phone_number)
+    # Validate and normalize phone number before any network call
+    phone_number = normalize_phone(phone_number)
+    backend = get_verification_backend(config)
+
+    # Refuse malformed codes, unknown numbers and brute force without an API call
+    guard = get_guard(config)
+    if guard is not None:
+        guard.before_check(phone_number, code)
+
+    status = backend.check(phone_number, code)
+    _forget_settled(config, phone_number, status)
+    return status
+
+
+async def async_start_verification(
+    config: TwilioConfig,
+    phone_number: str,
+    channel: VerificationChannel = VerificationChannel.SMS
+) -> VerificationResult:
+    """Start a verification process without blocking
+
+    Async counterpart of ``start_verification`` for ASGI views.
+
+    Args:
+        config: TwilioConfig instance with account credentials
+        phone_number: Recipient phone number, normalized to E.164
+        channel: Verification channel (SMS, call, or email)
+
+    Returns:
+        VerificationResult with status and metadata
+
+    Raises:
+        InvalidPhoneNumberError: If the phone number is not a valid number
+        OTPUnavailableError: If local codes are used and Redis is unreachable
+    """
+    logger.debug("Starting verification", phone_number=phone_number, channel=channel.value)
+    phone_number = normalize_phone(phone_number)
+    backend = get_verification_backend(config)
+
+    async def start() -> VerificationResult:
+        return _started(config, await backend.async_start(phone_number, channel))
+
+    deduplicator = get_deduplicator(config)
+    if deduplicator is None:
+        return await start()
+    return await deduplicator.async_start(phone_number, channel, start)
+
+
+async def async_check_verification(
+        config: TwilioConfig,
+        phone_number: str,
+        code: str
+) -> VerificationStatus:
+    """Check a verification code without blocking
+
+    Async counterpart of ``check_verification`` for ASGI views.
+
+    Args:
+        config: TwilioConfig instance with account credentials
+        phone_number: Recipient phone number, normalized to E.164
+        code: Verification code to check
+
+    Returns:
+        VerificationStatus indicating the result
+
+    Raises:
+        InvalidPhoneNumberError: If the phone number is not a valid number
+        VerificationFailedError: If the guard rejects the code or the number
+            used up its attempts
+        TokenExpiredError: If no verification is known to be pending
         TwilioAPIError: If the Twilio API returns an error
+        OTPUnavailableError: If local codes are used and Redis is unreachable
     """
-    logger.info("Checking verification", phone_number=phone_number)
-    # Validate phone number
-    if not phone_number.startswith('+'):
-        logger.warn("Invalid phone number format", phone_number=phone_number)   # pragma: no cover
-        raise InvalidPhoneNumberError(phone_number)  # pragma: no cover
-
-    # Validate service SID
-    if not config.service_sid:
-        logger.error("Missing service SID in config", config=config)
-        raise ValueError("Service SID is required for verification")
-
-    try:
-        logger.debug("Initializing Twilio client for verification check", account_sid=config.account_sid)
-        client = twilio.rest.Client(config.account_sid, config.auth_token)
-
-        logger.debug("Checking verification via Twilio API", to=phone_number, code=code)
-        verification_check = client.verify.v2.services(
-            config.service_sid).verification_checks.create(
-            to=phone_number,
-            code=code
-        )
-
-        # Map status to enum and return
-        logger.info("Verification checked", phone_number=phone_number, status=verification_check.status)
-        return _map_verification_status(verification_check.status)
-
-    except Exception as e:
-        # Handle errors
-        logger.error("Error checking verification", phone_number=phone_number, error=str(e))  # pragma: no cover
-        raise TwilioAPIError(str(e), "VERIFICATION_CHECK_ERROR")  # pragma: no cover
-
-
-def _map_verification_status(status: str) -> VerificationStatus:
-    """Map Twilio status string to VerificationStatus enum"""
-    status_map = {
-        "pending": VerificationStatus.PENDING,
-        "approved": VerificationStatus.APPROVED,
-        "canceled": VerificationStatus.CANCELED,
-        "failed": VerificationStatus.FAILED
-    }
-    return status_map.get(status, VerificationStatus.FAILED)
+    logger.debug("Checking verification", phone_number=phone_number)
+    phone_number = normalize_phone(phone_number)
+    backend = get_verification_backend(config)
+
+    guard = get_guard(config)
+    if guard is not None:
+        guard.before_check(phone_number, code)
+
+    status = await backend.async_check(phone_number, code)
+    _forget_settled(config, phone_number, status)
+    return status
+
+
+def _started(config: TwilioConfig, result: VerificationResult) -> VerificationResult:
+    """Let the guard accept checks for a verification that was just started"""
+    guard = get_guard(config)
+    if guard is not None and result.success and result.status == VerificationStatus.PENDING:
+        guard.register(result.to)
+    return result
+
+
+def _forget_settled(config: TwilioConfig, phone_number: str, status: VerificationStatus) -> None:
+    """Let the next start_verification send a new code once this one is settled"""
+    if status not in (VerificationStatus.APPROVED, VerificationStatus.CANCELED):
+        return
+    deduplicator = get_deduplicator(config)
+    if deduplicator is not None:
+        deduplicator.forget(phone_number)
+    guard = get_guard(config)
+    if guard is not None:
+        guard.clear(phone_number)
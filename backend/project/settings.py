@@ -56,7 +56,8 @@ INSTALLED_APPS = [
     "django_filters",
     "drf_yasg",
     # apps
-
+    "apps.auth",
+    "apps.twilio",
 ]
 
 MIDDLEWARE = [
@@ -212,6 +213,30 @@ CACHES = {
     }
 }
 
+# ========================== TWILIO ===========================================
+TWILIO_SMS_CONFIG = {
+    "account_sid": env("TWILIO_ACCOUNT_SID", default=""),
+    "auth_token": env("TWILIO_AUTH_TOKEN", default=""),
+    "from_number": env("TWILIO_FROM_NUMBER", default="+10000000000"),
+    "service_sid": env("TWILIO_VERIFY_SERVICE_SID", default=None),
+    # e.g. https://auth.example.com/twilio/status-callback; also the URL webhook signatures are checked against
+    "status_callback": env("TWILIO_STATUS_CALLBACK_URL", default=None),
+}
+# Extra named accounts (e.g. per realm), same fields as TWILIO_SMS_CONFIG
+TWILIO_SMS_ACCOUNTS = {}
+# Level of the Twilio library events and share of success events kept
+TWILIO_SMS_LOGGING = {
+    "level": env("TWILIO_LOG_LEVEL", default="INFO"),
+    "success_sample_rate": env("TWILIO_LOG_SUCCESS_SAMPLE_RATE", cast=float, default=1.0),
+}
+# Batching of status callback writes (apps.twilio.delivery)
+TWILIO_STATUS_CALLBACKS = {
+    "batch_size": env("TWILIO_STATUS_CALLBACK_BATCH_SIZE", cast=int, default=500),
+    "flush_interval": env("TWILIO_STATUS_CALLBACK_FLUSH_INTERVAL", cast=float, default=2.0),
+}
+# Bearer token required by /metrics, closed without it unless DEBUG
+METRICS_TOKEN = env("METRICS_TOKEN", default=None)
+
 # ========================== REST FRAMEWORK ===================================
 # LOGIN_URL = reverse_lazy("admin:login")
 # LOGOUT_URL = reverse_lazy("admin:logout")
@@ -223,15 +248,15 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly",
     ],
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
-    ),
+    # Bearer JWTs, then Token keys (cached), then the session, picked by the Authorization scheme
+    "DEFAULT_AUTHENTICATION_CLASSES": ("apps.auth.authentication.DispatchingAuthentication",),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 100,
 }
 
+# Seconds a Token key's user is cached by DispatchingAuthentication (apps.auth.authentication)
+TOKEN_AUTHENTICATION_CACHE_TTL = env("TOKEN_AUTHENTICATION_CACHE_TTL", cast=int, default=300)
+
 SWAGGER_SETTINGS = {
     # "DEFAULT_AUTO_SCHEMA_CLASS": "project.swagger.CustomSwaggerAutoSchema",
     "SECURITY_DEFINITIONS": {
@@ -243,6 +268,41 @@ SWAGGER_SETTINGS = {
     "PROTOCOLS": ['https', 'http'],  # Prefer HTTPS over HTTP
 }
 
+# Asymmetric JWT signing (apps.auth.keys): PEM private keys named <kid>.pem, the active one signs
+# (JWT_ACTIVE_KID, required with more than one key), all are published at /.well-known/jwks.json.
+# Without keys, tokens stay HS256 with SIGNING_KEY below.
+JWT_SIGNING_KEYS = {
+    "keys_dir": env("JWT_SIGNING_KEYS_DIR", default=None),
+    "active_kid": env("JWT_ACTIVE_KID", default=None),
+    # Seconds consumers and proxies may cache the JWKS
+    "jwks_max_age": env("JWT_JWKS_MAX_AGE", cast=int, default=3600),
+}
+
+# Token introspection at /api/auth/token/introspect/ (apps.auth.introspection)
+TOKEN_INTROSPECTION = {
+    # Bearer keys relying applications must send; nobody may introspect when empty
+    "api_keys": env("TOKEN_INTROSPECTION_API_KEYS", cast=Csv(), default=""),
+    # Let callers in without a key, for local development only
+    "allow_anonymous": env("TOKEN_INTROSPECTION_ALLOW_ANONYMOUS", cast=bool, default=False),
+    # Longest time an active result is cached, i.e. how long a revoked token may still introspect as active
+    "cache_ttl": env("TOKEN_INTROSPECTION_CACHE_TTL", cast=int, default=60),
+    "negative_ttl": env("TOKEN_INTROSPECTION_NEGATIVE_TTL", cast=int, default=300),
+    "local_cache_size": 10000,
+    "max_batch": 100,
+}
+
+# Blacklisted refresh token JTIs in Redis, screened by a Bloom filter per process (apps.auth.revocation)
+TOKEN_REVOCATION_INDEX = {
+    "key": "auth:revoked_jtis",
+    # JTIs the Bloom filter is first sized for, and its false positive rate
+    "capacity": env("TOKEN_REVOCATION_CAPACITY", cast=int, default=100000),
+    "error_rate": 0.001,
+    # Seconds between filter refreshes, i.e. how long a token revoked by another process may still be accepted
+    "refresh_interval": env("TOKEN_REVOCATION_REFRESH_INTERVAL", cast=float, default=1.0),
+    # Revocations kept in the Redis log the filters refresh from; a filter further behind reloads the set
+    "log_size": env("TOKEN_REVOCATION_LOG_SIZE", cast=int, default=100000),
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -251,6 +311,10 @@ SIMPLE_JWT = {
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "apps.auth.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.auth.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "apps.auth.serializers.TokenVerifySerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "apps.auth.serializers.TokenBlacklistSerializer",
 }
 
 # Sentry
@@ -6,6 +6,9 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from apps.auth.views import introspect_view, jwks_view
+from apps.twilio.views import metrics_view, status_callback_view
+
 admin.site.site_header = settings.ADMIN_SITE_HEADER
 admin.sites.AdminSite.index_title = "Auth Server Platform administration"
 
@@ -31,10 +34,15 @@ swagger_urlpatterns = [
 ]
 
 api_urlpatterns = [
+    path("auth/token/introspect/", introspect_view, name="token-introspect"),
     # path("", include(("apps.data_models.api.urls", "data_models"))),
 ]
 
-django_views = []
+django_views = [
+    path(".well-known/jwks.json", jwks_view, name="jwks"),
+    path("metrics", metrics_view, name="metrics"),
+    path("twilio/status-callback", status_callback_view, name="twilio-status-callback"),
+]
 
 urlpatterns = swagger_urlpatterns
 urlpatterns += django_views